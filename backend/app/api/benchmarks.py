@@ -1,44 +1,47 @@
-from fastapi import APIRouter, HTTPException, Query
-from typing import List, Optional
+import asyncio
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import Response
+from typing import Any, Awaitable, List, Optional
 from pydantic import BaseModel
 
 from app.scrapers.benchmark_scraper import BenchmarkScraper
 from app.analyzers.bottleneck_analyzer import BottleneckAnalyzer
+from app.api.responses import FastJSONResponse
+from app.services.benchmark_record import BenchmarkRecord, parse_usage_note
+from app.services.request_budget import Deadline
 
 router = APIRouter()
 
-def _extract_usage_from_notes(notes: str) -> dict:
-    """
-    從 notes 解析 GPU/CPU/RAM 使用率。
-    相容格式：
-    - GPU: 63%, CPU: 99%, RAM: 80%
-    - GPU：63％ CPU：99％ RAM：80％
-    - 多段 notes（以 | / ； 等分隔）→ 取第一組（BenchmarkScraper 會把當前結果放在最前面）
-    """
-    import re
+# nginx 慣例：client 在伺服器回應前關閉連線
+CLIENT_CLOSED_REQUEST = 499
 
-    if not notes:
-        return {"gpu_usage": None, "cpu_usage": None, "memory_usage": None}
 
-    text = str(notes)
-    # 取最前段，避免 v2 汙染或多 CPU 疊加造成解析到錯段
-    head = re.split(r"[|；;\n\r]+", text, maxsplit=1)[0]
+class ClientDisconnected(Exception):
+    """HTTP client 在處理途中斷線"""
 
-    def first_num(pattern: str) -> Optional[float]:
-        m = re.search(pattern, head, re.IGNORECASE)
-        if not m:
-            return None
-        try:
-            return float(m.group(1))
-        except Exception:
-            return None
 
-    # 同時支援半形/全形冒號與百分比
-    gpu = first_num(r"GPU[:：\s]+(\d+(?:\.\d+)?)\s*(?:%|％)?")
-    cpu = first_num(r"CPU[:：\s]+(\d+(?:\.\d+)?)\s*(?:%|％)?")
-    mem = first_num(r"(?:RAM|Memory|記憶體)[:：\s]+(\d+(?:\.\d+)?)\s*(?:%|％)?")
+async def _run_until_disconnected(http_request: Request, aw: Awaitable[Any], poll_interval: float = 0.5) -> Any:
+    """
+    執行 aw，同時定期檢查 client 是否已斷線；斷線就取消 aw（連帶取消進行中的 HTTP 呼叫）。
+    快取寫入在 store 的 lock 內同步完成，已寫入的資料不受取消影響。
+    """
+    task = asyncio.ensure_future(aw)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=poll_interval)
+            if done:
+                return task.result()
+            if await http_request.is_disconnected():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+                raise ClientDisconnected()
+    finally:
+        if not task.done():
+            task.cancel()
 
-    return {"gpu_usage": gpu, "cpu_usage": cpu, "memory_usage": mem}
 
 class HardwareSpec(BaseModel):
     category: str  # gpu, cpu, ram, storage
@@ -71,6 +74,7 @@ class BenchmarkResult(BaseModel):
     notes: Optional[str] = None
     confidence_score: float
     is_incomplete: bool = False
+    is_degraded: bool = False  # 網路來源超出請求預算，暫以預測模型回應
     bottleneck_analysis: Optional[dict] = None  # 瓶頸分析結果
     vram_required_gb: Optional[float] = None
     vram_selected_gb: Optional[float] = None
@@ -98,12 +102,29 @@ class BenchmarkSearchResponse(BaseModel):
     results: List[BenchmarkResult]
     total: int
 
+async def _collect_benchmarks(scraper: BenchmarkScraper, request: BenchmarkSearchRequest, games: List[str]) -> List[BenchmarkRecord]:
+    # 整個請求共用一個延遲預算：用盡後其餘組合直接走預測模型
+    deadline = Deadline.from_env()
+    results = []
+    for g in games:
+        batch = await scraper.search_benchmarks(
+            game=g,
+            resolution=request.resolution,
+            settings=request.settings,
+            hardware_list=[h.model_dump() for h in request.hardware],
+            deadline=deadline,
+        )
+        results.extend(batch)
+    return results
+
 @router.post("/benchmarks/search", response_model=BenchmarkSearchResponse)
-async def search_benchmarks(request: BenchmarkSearchRequest):
+async def search_benchmarks(request: BenchmarkSearchRequest, http_request: Request):
     """
     搜尋基準測試資料
     從網路即時抓取，不使用內建靜態資料
+    client 中途斷線時會取消尚未完成的組合與對外 HTTP 呼叫
     """
+    scraper: Optional[BenchmarkScraper] = None
     try:
         # 強制要求至少一顆 CPU：否則瓶頸分析（CPU/GPU）不可靠
         if not any((h.category or "").lower() == "cpu" for h in (request.hardware or [])):
@@ -118,72 +139,48 @@ async def search_benchmarks(request: BenchmarkSearchRequest):
         else:
             raise HTTPException(status_code=400, detail="請提供 game 或 games")
 
-        results = []
-        for g in games:
-            batch = await scraper.search_benchmarks(
-                game=g,
-                resolution=request.resolution,
-                settings=request.settings,
-                hardware_list=[h.model_dump() for h in request.hardware],
-            )
-            results.extend(batch)
-        
-        # 為每個結果進行瓶頸分析
+        try:
+            results = await _run_until_disconnected(http_request, _collect_benchmarks(scraper, request, games))
+        except ClientDisconnected:
+            return Response(status_code=CLIENT_CLOSED_REQUEST)
+
+        # RAM 和存儲規格以請求為準
+        ram_spec = next((hw for hw in request.hardware if hw.category.lower() == "ram"), None)
+        storage_spec = next((hw for hw in request.hardware if hw.category.lower() == "storage"), None)
+
+        # 為每個結果進行瓶頸分析（使用率是 BenchmarkRecord 的數值欄位，不需再從 notes 解析）
         analyzer = BottleneckAnalyzer()
         for result in results:
-            analysis_data = {
-                "avg_fps": result.get("avg_fps") if isinstance(result, dict) else result.avg_fps,
-                "p1_low": result.get("p1_low") if isinstance(result, dict) else result.p1_low,
-                "p0_1_low": result.get("p0_1_low") if isinstance(result, dict) else result.p0_1_low,
-                "gpu_usage": None,
-                "cpu_usage": None,
-                "memory_usage": None,
+            result.bottleneck_analysis = analyzer._determine_bottleneck({
+                "avg_fps": result.avg_fps,
+                "p1_low": result.p1_low,
+                "p0_1_low": result.p0_1_low,
+                "gpu_usage": result.gpu_usage,
+                "cpu_usage": result.cpu_usage,
+                "memory_usage": result.memory_usage,
                 "frametime": None,
-            }
-
-            # 嘗試從 notes 中提取使用率資訊
-            notes = result.get("notes") if isinstance(result, dict) else result.notes
-            if notes:
-                usage = _extract_usage_from_notes(str(notes))
-                analysis_data["gpu_usage"] = usage["gpu_usage"]
-                analysis_data["cpu_usage"] = usage["cpu_usage"]
-                analysis_data["memory_usage"] = usage["memory_usage"]
-
-            # 進行瓶頸分析
-            analysis = analyzer._determine_bottleneck(analysis_data)
-            if isinstance(result, dict):
-                result["bottleneck_analysis"] = analysis
-                # 設置使用率信息到結果中
-                result["gpu_usage"] = analysis_data["gpu_usage"]
-                result["cpu_usage"] = analysis_data["cpu_usage"]
-                result["memory_usage"] = analysis_data["memory_usage"]
-            else:
-                result.bottleneck_analysis = analysis
-                result.gpu_usage = analysis_data["gpu_usage"]
-                result.cpu_usage = analysis_data["cpu_usage"]
-                result.memory_usage = analysis_data["memory_usage"]
-
-            # 確保RAM和存儲規格被正確設置
-            if isinstance(result, dict):
-                # 從hardware_list中提取RAM和存儲信息
-                for hw in request.hardware:
-                    if hw.category.lower() == "ram":
-                        result["ram_gb"] = hw.ram_gb
-                        result["ram_type"] = hw.ram_type
-                        result["ram_speed_mhz"] = hw.ram_speed_mhz
-                        result["ram_latency_ns"] = hw.ram_latency_ns
-                    elif hw.category.lower() == "storage":
-                        result["storage_type"] = hw.storage_type
-        
-        return BenchmarkSearchResponse(
-            results=results,  # list[dict] 也可被 response_model 解析
-            total=len(results)
-        )
+            })
+            if ram_spec is not None:
+                result.ram_gb = ram_spec.ram_gb
+                result.ram_type = ram_spec.ram_type
+                result.ram_speed_mhz = ram_spec.ram_speed_mhz
+                result.ram_latency_ns = ram_spec.ram_latency_ns
+            if storage_spec is not None:
+                result.storage_type = storage_spec.storage_type
+
+        # 結果的型別已由 BenchmarkRecord 固定（對應 BenchmarkResult）：直接序列化，不再經 response_model 逐筆驗證
+        return FastJSONResponse({
+            "results": [r.to_response() for r in results],
+            "total": len(results),
+        })
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"搜尋基準測試失敗: {str(e)}"
         )
+    finally:
+        if scraper is not None:
+            await scraper.close()
 
 @router.post("/benchmarks/analyze", response_model=BottleneckAnalysis)
 async def analyze_bottleneck_from_result(result: BenchmarkResult):
@@ -194,23 +191,20 @@ async def analyze_bottleneck_from_result(result: BenchmarkResult):
         analyzer = BottleneckAnalyzer()
         
         # 將 BenchmarkResult 轉換為分析所需的資料格式
+        usage = (result.gpu_usage, result.cpu_usage, result.memory_usage)
+        if all(u is None for u in usage):
+            # 舊版 client 只送回 notes：從 notes 解析使用率
+            usage = parse_usage_note(result.notes)
         analysis_data = {
             "avg_fps": result.avg_fps,
             "p1_low": result.p1_low,
             "p0_1_low": result.p0_1_low,
-            "gpu_usage": None,  # 從原始資料中提取（如果有的話）
-            "cpu_usage": None,
-            "memory_usage": None,
+            "gpu_usage": usage[0],
+            "cpu_usage": usage[1],
+            "memory_usage": usage[2],
             "frametime": None,
         }
         
-        # 嘗試從 notes 或 raw_source_snippet 中提取使用率資訊
-        if result.notes:
-            usage = _extract_usage_from_notes(str(result.notes))
-            analysis_data["gpu_usage"] = usage["gpu_usage"]
-            analysis_data["cpu_usage"] = usage["cpu_usage"]
-            analysis_data["memory_usage"] = usage["memory_usage"]
-        
         analysis = analyzer._determine_bottleneck(analysis_data)
         return analysis
     except Exception as e:
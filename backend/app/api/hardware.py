@@ -1,12 +1,11 @@
-from fastapi import APIRouter, Query, HTTPException
-from typing import Optional, List
+from fastapi import APIRouter, Query, HTTPException, Request, Response
+from typing import Any, Dict, Hashable, Optional, List
 from pydantic import BaseModel
-
-from app.scrapers.hardware_scraper import HardwareScraper
-import os
 import json
-from datetime import datetime
-import re
+import os
+
+from app.cache.response_cache import ResponseBodyCache, RenderedBody, choose_encoding, etag_matches
+from app.services.hardware_catalog import CatalogIndex, hardware_catalog
 
 def infer_brand_from_model_backend(model: Optional[str]) -> str:
     m = (model or '').lower()
@@ -73,6 +72,10 @@ def infer_category_from_model_backend(model: Optional[str], generation: Optional
 
 router = APIRouter()
 
+# 目錄只在 seed / 爬蟲快照改變時變動：回應 body 依 (目錄版本, 查詢) 快取並預先壓縮，附 ETag 與 Cache-Control
+_CACHE_MAX_AGE = max(0, int(os.getenv("HARDWARE_CACHE_MAX_AGE", "60")))
+_response_cache = ResponseBodyCache(max_entries=int(os.getenv("HARDWARE_RESPONSE_CACHE_ENTRIES", "256")))
+
 class HardwareItem(BaseModel):
     category: str  # gpu, cpu, storage
     model: str
@@ -87,255 +90,163 @@ class HardwareListResponse(BaseModel):
     total: int
     source: str
     timestamp: str
+    # 分頁：還有下一頁時的 cursor（帶入 cursor= 取得下一頁）
+    next_cursor: Optional[str] = None
+    # facets=true 時的計數：category / brand / series / vram（vram 為 ≥ 門檻的數量）
+    facets: Optional[Dict[str, List[Dict[str, Any]]]] = None
+
+class HardwareSuggestion(BaseModel):
+    category: str
+    model: str
+    brand: Optional[str] = None
+    generation: Optional[str] = None
+    score: float
+
+class HardwareSuggestResponse(BaseModel):
+    query: str
+    items: List[HardwareSuggestion]
+
+def _list_key(
+    category: Optional[str] = None,
+    search: Optional[str] = None,
+    brand: Optional[str] = None,
+    series: Optional[str] = None,
+    min_vram_gb: Optional[int] = None,
+    min_ram_gb: Optional[int] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    facets: bool = False,
+) -> Hashable:
+    return ("list", category, search, brand, series, min_vram_gb, min_ram_gb, limit, cursor, fields, bool(facets))
+
+
+def _cached_response(request: Request, rendered: RenderedBody, index: CatalogIndex) -> Response:
+    """
+    依 Accept-Encoding 選擇預先壓縮的 body；If-None-Match 符合時回 304
+    爬蟲快照年齡隨時間改變，放在 X-Snapshot-Age header（每次請求計算），body 與 ETag 一一對應
+    """
+    encoding = choose_encoding(request.headers.get("accept-encoding"), rendered)
+    body, etag = rendered.variant(encoding)
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={_CACHE_MAX_AGE}, stale-while-revalidate={_CACHE_MAX_AGE * 5}",
+        "Vary": "Accept-Encoding",
+    }
+    age = index.snapshot_age_seconds()
+    if age is not None:
+        headers["X-Snapshot-Age"] = str(int(age))
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        _response_cache.not_modified += 1
+        return Response(status_code=304, headers=headers)
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def _render_list(
+    category: Optional[str] = None,
+    search: Optional[str] = None,
+    brand: Optional[str] = None,
+    series: Optional[str] = None,
+    min_vram_gb: Optional[int] = None,
+    min_ram_gb: Optional[int] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    facets: bool = False,
+) -> RenderedBody:
+    projection = None
+    if fields:
+        projection = [f.strip() for f in fields.split(",") if f.strip()]
+        unknown = [f for f in projection if f not in HardwareItem.model_fields]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"未知的欄位: {', '.join(unknown)}")
+    try:
+        page = hardware_catalog.query_page(
+            category=category,
+            search=search,
+            brand=brand,
+            series=series,
+            min_vram_gb=min_vram_gb,
+            min_ram_gb=min_ram_gb,
+            limit=limit if limit is not None or not cursor else 50,
+            cursor=cursor,
+            facets=facets,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    index = page.index
+    if projection is not None:
+        # 部分欄位不符合 HardwareItem 的必填欄位，直接輸出 JSON
+        body = json.dumps({
+            "items": [{f: it.get(f) for f in projection} for it in page.items],
+            "total": page.total,
+            "source": index.source,
+            "timestamp": index.timestamp,
+            "next_cursor": page.next_cursor,
+            "facets": page.facets,
+        }, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    else:
+        body = HardwareListResponse(
+            items=page.items,
+            total=page.total,
+            source=index.source,
+            timestamp=index.timestamp,
+            next_cursor=page.next_cursor,
+            facets=page.facets,
+        ).model_dump_json().encode("utf-8")
+    key = _list_key(category, search, brand, series, min_vram_gb, min_ram_gb, limit, cursor, fields, facets)
+    return _response_cache.put(index.version, key, body)
+
+
+def _render_brands(index: CatalogIndex) -> RenderedBody:
+    body = json.dumps(
+        {"brands": index.brands},
+        ensure_ascii=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+    return _response_cache.put(index.version, ("brands",), body)
+
+
+def _warm_common_shapes(index: CatalogIndex) -> None:
+    """目錄重建後預先產生最常見的查詢（各類別的完整清單與品牌）的壓縮 body"""
+    for category in (None, *sorted(index.by_category)):
+        _render_list(category=category)
+    _render_brands(index)
+
+
+hardware_catalog.add_listener(_warm_common_shapes)
+
 
 @router.get("/hardware", response_model=HardwareListResponse)
 async def get_hardware_list(
+    request: Request,
     category: Optional[str] = Query(None, description="硬體類別: gpu / cpu / storage"),
     search: Optional[str] = Query(None, description="搜尋關鍵字"),
     brand: Optional[str] = Query(None, description="廠牌過濾"),
     series: Optional[str] = Query(None, description="系列/世代過濾"),
     min_vram_gb: Optional[int] = Query(None, description="最低 VRAM (GB)"),
-    min_ram_gb: Optional[int] = Query(None, description="最低 RAM (GB)")
+    min_ram_gb: Optional[int] = Query(None, description="最低 RAM (GB)"),
+    limit: Optional[int] = Query(None, ge=1, le=500, description="每頁筆數（未指定則回傳全部）"),
+    cursor: Optional[str] = Query(None, description="上一頁回應的 next_cursor"),
+    fields: Optional[str] = Query(None, description="只回傳指定欄位（逗號分隔），例如 model,brand"),
+    facets: bool = Query(False, description="同時回傳 brand/series/category/VRAM 計數"),
 ):
     """
     取得硬體列表
-    從網路即時抓取硬體資訊，不使用內建靜態資料
+    seed 與爬蟲清單的合併/去重/分類由 hardware_catalog 預先建立索引，這裡只做過濾
+    爬蟲清單由背景排程更新，請求路徑不會連網；相同目錄版本的相同查詢直接回傳快取的（壓縮）body 或 304
     """
+    params = (category, search, brand, series, min_vram_gb, min_ram_gb, limit, cursor, fields, facets)
     try:
-        scraper = HardwareScraper()
-        scraped_list = await scraper.fetch_hardware_list(
-            category=category,
-            search=search
-        )
-
-        # Always load seed and MERGE with scraped results.
-        # Rationale: scraper can intermittently return a small partial list; if we replace the list,
-        # users see options "disappear" on refresh. Merging keeps the curated coverage stable.
-        seed_items: List[dict] = []
-        seed_source_name = None
-        try:
-            seed_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), '..', 'data', 'hardware_seed.json')
-            seed_path = os.path.normpath(seed_path)
-            with open(seed_path, 'r', encoding='utf-8') as f:
-                seed = json.load(f)
-            for item in seed.get('items', []):
-                if not item:
-                    continue
-                seed_items.append({
-                    "category": item.get("category"),
-                    "model": item.get("model"),
-                    "generation": item.get("generation"),
-                    "release_year": item.get("release_year"),
-                    "brand": item.get("brand"),
-                    "capacity_gb": item.get("capacity_gb"),
-                    "selected": False,
-                })
-            seed_source_name = f"seed:{os.path.basename(seed_path)}"
-        except Exception:
-            seed_items = []
-            seed_source_name = None
-
-        def normalize_item(it) -> Optional[dict]:
-            if it is None:
-                return None
-            if isinstance(it, HardwareItem):
-                it = it.model_dump()
-            if not isinstance(it, dict):
-                return None
-            cat = it.get("category")
-            model = it.get("model")
-            # If category missing, attempt to infer from model/generation/brand
-            if not cat and model:
-                inferred = infer_category_from_model_backend(model, it.get("generation"), it.get("brand"))
-                if inferred:
-                    cat = inferred
-            if not cat or not model:
-                return None
-            brand = it.get("brand") or infer_brand_from_model_backend(model)
-            return {
-                "category": cat,
-                "model": model,
-                "generation": it.get("generation"),
-                "release_year": it.get("release_year") or it.get("year"),
-                "brand": brand,
-                "capacity_gb": it.get("capacity_gb"),
-                "selected": False,
-            }
-
-        merged_map = {}
-        merged_order = []
-
-        # Stronger normalization for model keys to merge variants like:
-        # "Ryzen 7 7800X3D", "7800X3D", "Ryzen 7\n7800X3D", etc.
-        def normalize_model_key(s: Optional[str]) -> str:
-            if not s:
-                return ''
-            m = str(s)
-            # remove parenthetical notes e.g. "Model (OEM)"
-            m = re.sub(r'\(.*?\)', ' ', m)
-            # replace common separators with spaces
-            m = m.replace('-', ' ').replace('_', ' ').replace('/', ' ')
-            # remove trademark or extra punctuation, keep letters/numbers/CJK/space
-            m = re.sub(r'[^\w\u4e00-\u9fff\s]', ' ', m)
-            # remove brand prefixes like "Intel", "AMD", "NVIDIA", "Samsung", "WD"
-            m = re.sub(r'^(intel|amd|nvidia|nvidia geforce|geforce|samsung|western digital|wd|kingston|crucial)\\b', ' ', m, flags=re.IGNORECASE)
-            # collapse whitespace and lowercase
-            m = re.sub(r'\\s+', ' ', m).strip().lower()
-            return m
-
-        def upsert(d: dict, prefer_new: bool) -> None:
-            # Use case-insensitive keys to avoid duplicates like "i9-13900K" vs "i9-13900k"
-            cat_key = str(d.get('category') or '').strip().lower()
-            model_key = normalize_model_key(d.get('model'))
-            key = f"{cat_key}||{model_key}"
-            if key not in merged_map:
-                merged_map[key] = d
-                merged_order.append(key)
-                return
-            cur = merged_map[key]
-            if prefer_new:
-                # prefer scraped fields when present; keep seed-only metadata (e.g. capacity_gb) if missing
-                cur["brand"] = d.get("brand") or cur.get("brand")
-                cur["generation"] = d.get("generation") or cur.get("generation")
-                cur["release_year"] = d.get("release_year") or cur.get("release_year")
-                cur["capacity_gb"] = d.get("capacity_gb") or cur.get("capacity_gb")
-            else:
-                # prefer existing; only fill gaps
-                cur["brand"] = cur.get("brand") or d.get("brand")
-                cur["generation"] = cur.get("generation") or d.get("generation")
-                cur["release_year"] = cur.get("release_year") or d.get("release_year")
-                cur["capacity_gb"] = cur.get("capacity_gb") or d.get("capacity_gb")
-            merged_map[key] = cur
-
-        for it in seed_items:
-            n = normalize_item(it)
-            if n:
-                upsert(n, prefer_new=False)
-
-        for it in (scraped_list or []):
-            n = normalize_item(it)
-            if n:
-                upsert(n, prefer_new=True)
-
-        hardware_list = [merged_map[k] for k in merged_order]
-
-        # Final dedupe pass: collapse items that share the same normalized model key
-        final_map = {}
-        final_order = []
-        for item in hardware_list:
-            nm = normalize_model_key(item.get('model'))
-            if not nm:
-                # keep items without normalized key as-is (rare)
-                key = f"{item.get('category') or ''}||{item.get('model') or ''}"
-                if key not in final_map:
-                    final_map[key] = item
-                    final_order.append(key)
-                continue
-            if nm not in final_map:
-                # clone to avoid mutating original
-                final_map[nm] = dict(item)
-                final_order.append(nm)
-            else:
-                # merge metadata: prefer existing fields, but fill gaps
-                cur = final_map[nm]
-                # prefer brand from existing, otherwise use new
-                cur['brand'] = cur.get('brand') or item.get('brand')
-                cur['generation'] = cur.get('generation') or item.get('generation')
-                cur['release_year'] = cur.get('release_year') or item.get('release_year')
-                cur['capacity_gb'] = cur.get('capacity_gb') or item.get('capacity_gb')
-                # if categories differ, prefer the one that's not empty, or keep existing
-                if not cur.get('category') and item.get('category'):
-                    cur['category'] = item.get('category')
-                final_map[nm] = cur
-
-        hardware_list = [final_map[k] for k in final_order]
-
-        source_parts = []
-        if scraped_list:
-            source_parts.append(scraper.get_source_name())
-        if seed_source_name:
-            source_parts.append(seed_source_name)
-        if source_parts and len(source_parts) > 1:
-            source_name = "merged:" + "+".join(source_parts)
-        elif source_parts:
-            source_name = source_parts[0]
-        else:
-            source_name = scraper.get_source_name()
-
-        timestamp = scraper.get_last_fetch_time() if scraped_list else datetime.now().isoformat()
-        # 嘗試讀取 seed map（model -> metadata）供過濾使用
-        # 建立 seed_map 時使用標準化 key（小寫、trim），以便與 merged_map 的鍵一致
-        seed_map = {}
-        try:
-            seed_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), '..', 'data', 'hardware_seed.json')
-            seed_path = os.path.normpath(seed_path)
-            with open(seed_path, 'r', encoding='utf-8') as f:
-                seed = json.load(f)
-            for it in seed.get('items', []):
-                k = normalize_model_key(it.get('model'))
-                if k:
-                    seed_map[k] = it
-        except Exception:
-            seed_map = {}
-
-        def get_storage_type_key(model: str, generation: str) -> str:
-            gen = (generation or "").lower()
-            m = (model or "").lower()
-            if "nvme" in gen or "nvme" in m or "m.2" in m or "m2" in m:
-                return "nvme"
-            if "sata" in gen or "sata" in m:
-                return "sata"
-            if "hdd" in gen or "hdd" in m or "hard drive" in m:
-                return "hdd"
-            return "other"
-
-        def matches_filters(it) -> bool:
-            # support both dict and object-like items
-            def get_field(obj, name):
-                if isinstance(obj, dict):
-                    return obj.get(name)
-                return getattr(obj, name, None)
-
-            it_brand = get_field(it, 'brand') or ''
-            it_model = get_field(it, 'model') or ''
-            it_generation = get_field(it, 'generation') or ''
-            it_category = get_field(it, 'category') or ''
-
-            if brand and it_brand and brand.lower() not in it_brand.lower():
-                return False
-            if series:
-                sf = series.lower()
-                # storage: allow series=nvme/sata/hdd to work even if generation is SATA/HDD etc.
-                if it_category == "storage" and sf in ("nvme", "sata", "hdd"):
-                    if get_storage_type_key(it_model, it_generation) != sf:
-                        return False
-                else:
-                    if not ((it_generation and sf in it_generation.lower()) or (it_model and sf in it_model.lower())):
-                        return False
-            # 使用更強的 model key 標準化去查 seed_map（避免大小寫/空白/前綴差異導致找不到 metadata）
-            meta = seed_map.get(normalize_model_key(it_model), {})
-            vram = meta.get('vram_gb', 0) or 0
-            ram = meta.get('ram_gb', 0) or 0
-            if min_vram_gb and vram < min_vram_gb:
-                return False
-            if min_ram_gb and ram < min_ram_gb:
-                return False
-            if category and it_category != category:
-                return False
-            if search:
-                term = search.lower()
-                if term not in it_model.lower() and term not in it_brand.lower() and not (it_generation and term in it_generation.lower()):
-                    return False
-            return True
-
-        filtered = [it for it in hardware_list if matches_filters(it)]
-
-        return HardwareListResponse(
-            items=filtered,
-            total=len(filtered),
-            source=source_name,
-            timestamp=timestamp
-        )
+        index = hardware_catalog.get()
+        rendered = _response_cache.get(index.version, _list_key(*params))
+        if rendered is None:
+            rendered = _render_list(*params)
+        return _cached_response(request, rendered, index)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -343,8 +254,31 @@ async def get_hardware_list(
         )
 
 
+@router.get("/hardware/suggest", response_model=HardwareSuggestResponse)
+async def suggest_hardware(
+    q: str = Query(..., description="輸入中的型號關鍵字（容許錯字/連寫，例如 7800x3d、4070ti s、ryzen7 9700）"),
+    category: Optional[str] = Query(None, description="硬體類別: gpu / cpu / storage"),
+    limit: int = Query(8, ge=1, le=50, description="最多回傳筆數"),
+):
+    """型號自動完成（HardwareSelector 搜尋框用）；依搜尋分數排序"""
+    hits = hardware_catalog.search(q, category=category, limit=limit)
+    return HardwareSuggestResponse(
+        query=q,
+        items=[
+            HardwareSuggestion(
+                category=e.category,
+                model=e.item.get("model") or "",
+                brand=e.item.get("brand"),
+                generation=e.item.get("generation"),
+                score=score,
+            )
+            for e, score in hits
+        ],
+    )
+
+
 @router.get("/hardware/brands")
-async def get_hardware_brands():
+async def get_hardware_brands(request: Request):
     """
     取得可用品牌與系列選項（來源：seed + 爬蟲結果若可得）
     回傳範例:
@@ -356,65 +290,15 @@ async def get_hardware_brands():
     }
     """
     try:
-        # 先嘗試從爬蟲取得較新的清單
-        scraper = HardwareScraper()
-        await scraper.initialize()
-        try:
-            items = await scraper.fetch_hardware_list()
-        except Exception:
-            items = []
-
-        # 載入 seed 作為補充
-        try:
-            seed_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), '..', 'data', 'hardware_seed.json')
-            seed_path = os.path.normpath(seed_path)
-            with open(seed_path, 'r', encoding='utf-8') as f:
-                seed = json.load(f)
-            seed_items = seed.get('items', [])
-        except Exception:
-            seed_items = []
-
-        combined = []
-        if items:
-            # items may be list of HardwareItem models or dicts; normalize to dicts
-            for it in items:
-                if isinstance(it, dict):
-                    combined.append(it)
-                else:
-                    combined.append({
-                        "category": getattr(it, "category", None),
-                        "model": getattr(it, "model", None),
-                        "generation": getattr(it, "generation", None),
-                        "brand": getattr(it, "brand", None)
-                    })
-        combined.extend(seed_items)
-
-        # Aggregate brands and series
-        brands_map = {}
-        import re
-        series_tokens = re.compile(r'(RTX|GTX|RX|RDNA|Core|Arc|Radeon|Threadripper|Ryzen)', re.IGNORECASE)
-        for it in combined:
-            brand = (it.get('brand') or '').strip()
-            if not brand:
-                continue
-            if brand not in brands_map:
-                brands_map[brand] = set()
-            gen = it.get('generation') or ''
-            if gen:
-                brands_map[brand].add(gen)
-            model = it.get('model') or ''
-            m = series_tokens.findall(model)
-            for token in m:
-                brands_map[brand].add(token.upper())
-
-        result = {"brands": []}
-        for b, sset in brands_map.items():
-            result["brands"].append({
-                "name": b,
-                "series": sorted(list(sset))
-            })
-
-        return result
+        # 品牌/系列在 hardware_catalog 建立索引時已彙整（seed + 爬蟲清單）
+        index = hardware_catalog.get()
+        rendered = _response_cache.get(index.version, ("brands",)) or _render_brands(index)
+        return _cached_response(request, rendered, index)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"無法取得品牌/系列: {e}")
 
+
+@router.get("/hardware/catalog")
+async def get_hardware_catalog_status():
+    """硬體目錄狀態：快照年齡、背景更新排程與最近一次錯誤"""
+    return {**hardware_catalog.status(), "responses": _response_cache.stats()}
@@ -0,0 +1,35 @@
+"""
+快速 JSON 回應（大量結果的端點用）
+
+一般 FastAPI 端點回傳物件後，會先依 response_model 逐筆驗證、再用標準 encoder（jsonable_encoder + json.dumps）序列化。
+/api/benchmarks/search 的結果在產生時型別就已固定（BenchmarkRecord.to_response），
+可以直接回傳 FastJSONResponse：跳過重新驗證，一次序列化成單一 bytes buffer。
+端點仍宣告 response_model，OpenAPI schema 不變。
+
+- orjson 列在 requirements.txt；退回標準 json 的緊湊輸出只是防護（例如沒有對應 wheel 的平台）
+"""
+from __future__ import annotations
+
+import json
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def dumps_bytes(content: Any) -> bytes:
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """content 必須只含 JSON 原生型別（dict/list/str/數值/bool/None）"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps_bytes(content)
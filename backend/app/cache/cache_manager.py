@@ -1,30 +1,121 @@
 """
 快取管理器
 預設快取 24 小時，支援手動刷新，熱門項目可縮短快取時間
+TTL 可用小時（ttl_hours）或秒（ttl_seconds）指定；指定 namespace 時另寫入磁碟持久化快取
+Redis 使用 redis.asyncio（connection pool + timeout），不會阻塞 event loop；多 key 操作以 pipeline 一次往返
+
+分層模式（CACHE_LAYERED，連上 Redis 時預設開啟）：
+- L1：每個 process 的記憶體 LRU（TTL 最多 CACHE_L1_TTL_SECONDS）；L2：Redis（跨 worker 共用）
+- 讀取 L1 → L2，L2 命中回填 L1；delete/refresh 同時清除 L1，可選擇透過 Redis pub/sub 通知其他 process
+- 同一 key 的併發未命中合併成一次 L2 讀取（get_or_set 則合併成一次 loader 呼叫）；
+  所有等待者都被取消時（例如 client 斷線）一併取消 loader，不會把付費 API 呼叫跑完
+
+Redis 值的編碼由 CacheCodec 處理（CACHE_CODEC / CACHE_COMPRESSION），舊的純 JSON 值仍可讀取
+
+快照（CACHE_SNAPSHOT_ENABLED）：未使用 Redis 時，記憶體快取定期與關閉時寫入磁碟（保留剩餘 TTL），
+啟動後在背景還原，不延遲 readiness
+
+熱門 key（CACHE_ADAPTIVE_TTL）：以 count-min sketch 追蹤存取頻率；熱門 key 未指定 TTL 時改用
+較短的 CACHE_HOT_TTL_HOURS（更常刷新）；呼叫端指定 TTL（例如付費搜尋結果）時則至少保留
+CACHE_HOT_MIN_TTL_HOURS，熱門查詢少打幾次 API。熱門 key 在記憶體/L1 中 pinned（LRU 最後才淘汰）
 """
+import asyncio
 import json
 import os
-from typing import Optional, Any, Dict
-from datetime import datetime, timedelta
+import uuid
+from datetime import datetime
+from typing import Optional, Any, Awaitable, Callable, Dict, Iterable, List
 import hashlib
 
+from app.cache.codec import CacheCodec
+from app.cache.hot_keys import HotKeyTracker
+from app.cache.memory_cache import ExpiringLRU
+from app.cache.persistent_cache import PersistentCache
+from app.cache.snapshot import load_snapshot, save_snapshot
+
 try:
-    import redis
+    import redis.asyncio as aioredis
     REDIS_AVAILABLE = True
 except ImportError:
     REDIS_AVAILABLE = False
 
 class CacheManager:
-    """快取管理器，支援 Redis 或記憶體快取"""
+    """快取管理器，支援 Redis 或記憶體快取（或兩者分層）"""
     
     def __init__(self):
-        self.redis_client: Optional[redis.Redis] = None
-        self.memory_cache: Dict[str, Dict[str, Any]] = {}
+        self.redis_client: Optional["aioredis.Redis"] = None
+        self.redis_pool: Optional["aioredis.BlockingConnectionPool"] = None
+        # 記憶體快取：monotonic 到期 + LRU，依 entry 數與約略位元組數限制大小
+        self.memory_cache = ExpiringLRU(
+            max_entries=int(os.getenv("CACHE_MEMORY_MAX_ENTRIES", "10000")),
+            max_bytes=int(os.getenv("CACHE_MEMORY_MAX_MB", "64")) * 1024 * 1024,
+        )
         self.use_redis = False
         
         # 快取設定
         self.default_ttl_hours = int(os.getenv("CACHE_TTL_HOURS", "24"))
         self.hot_ttl_hours = int(os.getenv("CACHE_HOT_TTL_HOURS", "1"))
+
+        # Redis 連線設定：timeout 要短，Redis 無回應時降級到記憶體快取而不是卡住請求/啟動
+        self.redis_max_connections = int(os.getenv("REDIS_MAX_CONNECTIONS", "20"))
+        self.redis_connect_timeout = float(os.getenv("REDIS_CONNECT_TIMEOUT", "1.0"))
+        self.redis_socket_timeout = float(os.getenv("REDIS_SOCKET_TIMEOUT", "0.5"))
+        self.redis_pool_timeout = float(os.getenv("REDIS_POOL_TIMEOUT", "2.0"))
+
+        # Redis 值的序列化/壓縮（記憶體 tier 直接存 Python 物件，不經過 codec）
+        level = os.getenv("CACHE_COMPRESSION_LEVEL", "").strip()
+        self.codec = CacheCodec(
+            serializer=os.getenv("CACHE_CODEC", "json"),
+            compression=os.getenv("CACHE_COMPRESSION", "zlib"),
+            min_compress_bytes=int(os.getenv("CACHE_COMPRESS_MIN_BYTES", "1024")),
+            level=int(level) if level else None,
+        )
+
+        # 分層模式：記憶體 LRU 作為 Redis 前面的 L1
+        self.layered = os.getenv("CACHE_LAYERED", "1").strip().lower() not in ("0", "false", "no")
+        self.l1_ttl_seconds = max(1, int(os.getenv("CACHE_L1_TTL_SECONDS", "30")))
+        self.invalidation_pubsub = os.getenv("CACHE_INVALIDATION_PUBSUB", "0").strip().lower() in ("1", "true", "yes")
+        self.invalidation_channel = os.getenv("CACHE_INVALIDATION_CHANNEL", "cache:invalidate")
+        self.instance_id = uuid.uuid4().hex
+        self._invalidation_task: Optional[asyncio.Task] = None
+        # 進行中的 L2 讀取 / loader：key -> task（併發未命中共用同一個結果）
+        self._inflight: Dict[str, asyncio.Task] = {}
+        # 每個進行中 task 的等待者數；最後一個等待者被取消時連帶取消 task（例如 client 斷線，停止付費 API 呼叫）
+        self._waiters: Dict[asyncio.Task, int] = {}
+        self.layer_stats: Dict[str, int] = {"l1_hits": 0, "l2_hits": 0, "coalesced": 0, "invalidations_received": 0}
+
+        # 熱門 key 偵測與自適應 TTL
+        self.adaptive_ttl = os.getenv("CACHE_ADAPTIVE_TTL", "1").strip().lower() not in ("0", "false", "no")
+        self.hot_min_ttl_hours = float(os.getenv("CACHE_HOT_MIN_TTL_HOURS", "72"))
+        self.hot_keys = HotKeyTracker(
+            half_life_seconds=float(os.getenv("CACHE_HOT_HALF_LIFE_SECONDS", "600")),
+            hot_threshold=int(os.getenv("CACHE_HOT_THRESHOLD", "20")),
+            top_k=int(os.getenv("CACHE_HOT_TOP_K", "50")),
+        )
+
+        # 磁碟持久化快取（重啟後保留），以 namespace 區分
+        self.persistent = PersistentCache.create_default()
+
+        # 記憶體快取快照（只在未使用 Redis 時啟用：分層模式的 L1 TTL 很短，不需要保存）
+        base = os.path.normpath(os.path.join(os.path.dirname(__file__), "..", ".."))
+        self.snapshot_enabled = os.getenv("CACHE_SNAPSHOT_ENABLED", "1").strip().lower() not in ("0", "false", "no")
+        self.snapshot_path = os.getenv("CACHE_SNAPSHOT_PATH") or os.path.join(base, "data", "memory_cache_snapshot.bin")
+        self.snapshot_interval_seconds = float(os.getenv("CACHE_SNAPSHOT_INTERVAL_SECONDS", "300"))
+        # 快照整個檔案另外以 zlib 壓縮，每筆 record 只做序列化
+        self._snapshot_codec = CacheCodec(serializer=self.codec.serializer, compression="none")
+        self._snapshot_task: Optional[asyncio.Task] = None
+        self._restore_task: Optional[asyncio.Task] = None
+        # 還原完成前不寫快照（否則會用部分內容覆蓋舊檔）
+        self._restore_done = False
+        self._snapshot_writes = -1
+        self.snapshot_stats: Dict[str, Any] = {
+            "saved_entries": 0,
+            "saved_bytes": 0,
+            "last_saved_at": None,
+            "restored_entries": 0,
+        }
+        # 命中統計：family -> {"hits": n, "misses": n}
+        self.stats: Dict[str, Dict[str, int]] = {}
     
     async def initialize(self):
         """初始化快取系統"""
@@ -34,22 +125,43 @@ class CacheManager:
                 redis_host = os.getenv("REDIS_HOST", "localhost")
                 redis_port = int(os.getenv("REDIS_PORT", "6379"))
                 redis_db = int(os.getenv("REDIS_DB", "0"))
-                
-                self.redis_client = redis.Redis(
+
+                # BlockingConnectionPool：連線用完時等待（最多 pool_timeout）而不是直接丟出 Too many connections
+                self.redis_pool = aioredis.BlockingConnectionPool(
                     host=redis_host,
                     port=redis_port,
                     db=redis_db,
-                    decode_responses=True
+                    # 值可能是二進位（msgpack/pickle/壓縮），由 codec 自行解碼
+                    decode_responses=False,
+                    max_connections=self.redis_max_connections,
+                    timeout=self.redis_pool_timeout,
+                    socket_connect_timeout=self.redis_connect_timeout,
+                    socket_timeout=self.redis_socket_timeout,
+                    health_check_interval=30,
+                )
+                self.redis_client = aioredis.Redis(connection_pool=self.redis_pool)
+                # 測試連接（整體也設上限，避免 DNS 等卡住啟動）
+                await asyncio.wait_for(
+                    self.redis_client.ping(),
+                    timeout=self.redis_connect_timeout + self.redis_socket_timeout,
                 )
-                # 測試連接
-                self.redis_client.ping()
                 self.use_redis = True
-                print("使用 Redis 快取")
+                print("使用 Redis 快取" + ("（L1 記憶體 + L2 Redis）" if self.layered else ""))
+                if self.layered and self.invalidation_pubsub:
+                    self._invalidation_task = asyncio.create_task(self._invalidation_listener())
             except Exception as e:
-                print(f"無法連接 Redis，使用記憶體快取: {e}")
+                print(f"無法連接 Redis，使用記憶體快取: {e!r}")
                 self.use_redis = False
+                await self._close_redis()
         else:
             print("Redis 未安裝，使用記憶體快取")
+
+        if self.snapshot_enabled and not self.use_redis:
+            # 從現在起被寫入/刪除的 key 以新狀態為準，還原時略過
+            self.memory_cache.track_changes()
+            self._restore_task = asyncio.create_task(self._restore_snapshot())
+            if self.snapshot_interval_seconds > 0:
+                self._snapshot_task = asyncio.create_task(self._snapshot_loop())
     
     def _generate_key(self, prefix: str, **kwargs) -> str:
         """生成快取鍵"""
@@ -58,96 +170,519 @@ class CacheManager:
         params_hash = hashlib.md5(params_str.encode()).hexdigest()
         return f"{prefix}:{params_hash}"
     
-    async def get(self, key: str) -> Optional[Any]:
-        """取得快取資料"""
+    def _record(self, family: Optional[str], hit: bool) -> None:
+        if not family:
+            return
+        counters = self.stats.setdefault(family, {"hits": 0, "misses": 0})
+        counters["hits" if hit else "misses"] += 1
+
+    @property
+    def _l1_active(self) -> bool:
+        return self.layered and self.use_redis and self.redis_client is not None
+
+    async def _singleflight(self, key: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        同一 key 同時只執行一次 factory，其餘呼叫者等待同一個結果。
+        單一呼叫者被取消不影響其他等待者；所有等待者都被取消時才取消 factory（不再白白跑完付費呼叫）
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._inflight[key] = task
+
+            def _done(t: asyncio.Task, k: str = key) -> None:
+                if self._inflight.get(k) is t:
+                    del self._inflight[k]
+                self._waiters.pop(t, None)
+                if not t.cancelled():
+                    t.exception()  # 所有等待者都被取消時，避免 "exception was never retrieved"
+
+            task.add_done_callback(_done)
+        else:
+            self.layer_stats["coalesced"] += 1
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            # shield：單一呼叫者被取消不會中斷其他人等待的 task
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if not task.done() and self._waiters.get(task, 0) <= 1:
+                task.cancel()
+            raise
+        finally:
+            if task in self._waiters:
+                self._waiters[task] -= 1
+                if self._waiters[task] <= 0 and task.done():
+                    del self._waiters[task]
+
+    def hot_key_report(self, limit: int = 20) -> Dict[str, Any]:
+        """top-K 熱門 key（衰減後的估計存取次數）"""
+        return {
+            "threshold": self.hot_keys.hot_threshold,
+            "half_life_seconds": self.hot_keys.half_life_seconds,
+            "keys": [
+                {"key": k, "hits": n, "hot": n >= self.hot_keys.hot_threshold}
+                for k, n in self.hot_keys.top(limit)
+            ],
+        }
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """各 family 的命中/未命中次數與命中率"""
+        out: Dict[str, Dict[str, Any]] = {}
+        for family, c in sorted(self.stats.items()):
+            total = c["hits"] + c["misses"]
+            out[family] = {**c, "hit_rate": round(c["hits"] / total, 4) if total else 0.0}
+        return out
+
+    async def get(self, key: str, namespace: Optional[str] = None, family: Optional[str] = None) -> Optional[Any]:
+        """
+        取得快取資料
+        - namespace：記憶體/Redis 未命中時再查磁碟持久化快取，命中後回填
+        - family：用於命中統計（例如 google_cse:strict）
+        """
+        self.hot_keys.record(key)
+        value = await self._get_hot(key)
+        if value is None and namespace:
+            try:
+                found = await self.persistent.get(namespace, key)
+            except Exception as e:
+                print(f"持久化快取取得失敗: {e}")
+                found = None
+            if found is not None:
+                value, remaining = found
+                await self._set_hot(key, value, max(1, int(remaining)))
+        self._record(family, value is not None)
+        return value
+
+    async def get_or_set(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl_hours: Optional[int] = None,
+        is_hot: bool = False,
+        ttl_seconds: Optional[int] = None,
+        namespace: Optional[str] = None,
+        family: Optional[str] = None,
+    ) -> Optional[Any]:
+        """
+        取得快取；未命中時呼叫 loader 並寫回（loader 回傳 None 不寫入）。
+        同一 key 的併發未命中只會呼叫一次 loader，loader 的例外會傳給所有等待者。
+        """
+        value = await self.get(key, namespace=namespace, family=family)
+        if value is not None:
+            return value
+
+        async def load_and_store() -> Optional[Any]:
+            # 前一個 loader 可能剛寫回
+            fresh = await self._get_hot(key)
+            if fresh is not None:
+                return fresh
+            fresh = await loader()
+            if fresh is not None:
+                await self.set(key, fresh, ttl_hours=ttl_hours, is_hot=is_hot, ttl_seconds=ttl_seconds, namespace=namespace)
+            return fresh
+
+        return await self._singleflight(f"load:{key}", load_and_store)
+
+    async def get_many(self, keys: Iterable[str], namespace: Optional[str] = None) -> Dict[str, Any]:
+        """
+        一次取得多個 key（Redis 以 pipeline 一次往返）；只回傳命中的 key。
+        指定 namespace 時，未命中的 key 再查磁碟持久化快取並回填。
+        """
+        keys = list(dict.fromkeys(keys))
+        out: Dict[str, Any] = {}
+        if not keys:
+            return out
+        for key in keys:
+            self.hot_keys.record(key)
+
+        if self._l1_active:
+            for key in keys:
+                value = self.memory_cache.get(key)
+                if value is not None:
+                    out[key] = value
+                    self.layer_stats["l1_hits"] += 1
+        if self.use_redis and self.redis_client:
+            missing = [k for k in keys if k not in out]
+            try:
+                if missing:
+                    out.update(await self._fetch_l2_many(missing))
+            except Exception as e:
+                print(f"Redis 批次取得失敗: {e}")
+        if not self._l1_active:
+            for key in keys:
+                if key not in out:
+                    value = self._get_memory(key)
+                    if value is not None:
+                        out[key] = value
+
+        if namespace:
+            backfill: Dict[str, tuple] = {}
+            for key in keys:
+                if key in out:
+                    continue
+                try:
+                    found = await self.persistent.get(namespace, key)
+                except Exception as e:
+                    print(f"持久化快取取得失敗: {e}")
+                    found = None
+                if found is not None:
+                    value, remaining = found
+                    out[key] = value
+                    backfill[key] = (value, max(1, int(remaining)))
+            for key, (value, ttl) in backfill.items():
+                await self._set_hot(key, value, ttl)
+        return out
+
+    async def set_many(
+        self,
+        items: Dict[str, Any],
+        ttl_hours: Optional[int] = None,
+        is_hot: bool = False,
+        ttl_seconds: Optional[int] = None,
+        namespace: Optional[str] = None,
+    ) -> None:
+        """一次寫入多個 key（Redis 以非交易 pipeline 一次往返；TTL 規則同 set）"""
+        if not items:
+            return
+        ttl_seconds = self._resolve_ttl(ttl_hours, is_hot, ttl_seconds)
+
+        if namespace:
+            for key, value in items.items():
+                try:
+                    await self.persistent.set(namespace, key, value, ttl_seconds)
+                except Exception as e:
+                    print(f"持久化快取設定失敗: {e}")
+
         if self.use_redis and self.redis_client:
             try:
-                data = self.redis_client.get(key)
-                if data:
-                    parsed = json.loads(data)
-                    # 向後相容：舊版本可能把資料包在 {"data": ..., "expires_at": ...}
-                    if isinstance(parsed, dict) and "data" in parsed and "expires_at" in parsed:
-                        return parsed.get("data")
-                    return parsed
+                async with self.redis_client.pipeline(transaction=False) as pipe:
+                    for key, value in items.items():
+                        pipe.setex(key, ttl_seconds, self.codec.encode(value))
+                    await pipe.execute()
+                if self._l1_active:
+                    for key, value in items.items():
+                        self._set_l1(key, value, min(ttl_seconds, self.l1_ttl_seconds))
+                    await self._publish_invalidation(list(items))
+                return
+            except Exception as e:
+                print(f"Redis 批次設定失敗: {e}")
+        for key, value in items.items():
+            self._set_memory(key, value, ttl_seconds)
+
+    async def delete_many(self, keys: Iterable[str], namespace: Optional[str] = None) -> None:
+        """一次刪除多個 key（Redis 單一 DEL 指令）"""
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return
+        if namespace:
+            for key in keys:
+                try:
+                    await self.persistent.delete(namespace, key)
+                except Exception as e:
+                    print(f"持久化快取刪除失敗: {e}")
+        if self.use_redis and self.redis_client:
+            try:
+                await self.redis_client.delete(*keys)
+            except Exception as e:
+                print(f"Redis 刪除失敗: {e}")
+        for key in keys:
+            self.memory_cache.delete(key)
+        await self._publish_invalidation(keys)
+
+    def _decode_redis(self, data: Optional[bytes]) -> Optional[Any]:
+        if not data:
+            return None
+        try:
+            parsed = self.codec.decode(data)
+        except Exception as e:
+            # 無法解碼（例如其他版本寫入的格式）視為未命中
+            print(f"Redis 快取值解碼失敗: {e}")
+            return None
+        # 向後相容：舊版本可能把資料包在 {"data": ..., "expires_at": ...}
+        if isinstance(parsed, dict) and "data" in parsed and "expires_at" in parsed:
+            return parsed.get("data")
+        return parsed
+
+    def _l1_ttl(self, pttl_ms: Optional[int]) -> float:
+        """回填 L1 的 TTL：不超過 L2 剩餘時間，也不超過 l1_ttl_seconds"""
+        if pttl_ms is not None and pttl_ms > 0:
+            return min(self.l1_ttl_seconds, pttl_ms / 1000.0)
+        return float(self.l1_ttl_seconds)
+
+    async def _fetch_l2(self, key: str) -> Optional[Any]:
+        """從 Redis 讀取；分層模式下同時取 PTTL（同一次往返）並回填 L1"""
+        if not self._l1_active:
+            return self._decode_redis(await self.redis_client.get(key))
+        async with self.redis_client.pipeline(transaction=False) as pipe:
+            pipe.get(key)
+            pipe.pttl(key)
+            data, pttl = await pipe.execute()
+        value = self._decode_redis(data)
+        if value is not None:
+            self.layer_stats["l2_hits"] += 1
+            self._set_l1(key, value, self._l1_ttl(pttl))
+        return value
+
+    async def _fetch_l2_many(self, keys: List[str]) -> Dict[str, Any]:
+        out: Dict[str, Any] = {}
+        if not self._l1_active:
+            for key, data in zip(keys, await self.redis_client.mget(keys)):
+                value = self._decode_redis(data)
+                if value is not None:
+                    out[key] = value
+            return out
+        async with self.redis_client.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.get(key)
+                pipe.pttl(key)
+            replies = await pipe.execute()
+        for i, key in enumerate(keys):
+            value = self._decode_redis(replies[2 * i])
+            if value is not None:
+                out[key] = value
+                self.layer_stats["l2_hits"] += 1
+                self._set_l1(key, value, self._l1_ttl(replies[2 * i + 1]))
+        return out
+
+    async def _get_hot(self, key: str) -> Optional[Any]:
+        """從 L1 / Redis 或記憶體快取取得"""
+        if self._l1_active:
+            value = self.memory_cache.get(key)
+            if value is not None:
+                self.layer_stats["l1_hits"] += 1
+                return value
+        if self.use_redis and self.redis_client:
+            try:
+                # 同一 key 的併發 L1 未命中只讀一次 Redis
+                value = await self._singleflight(f"l2:{key}", lambda: self._fetch_l2(key))
+                if value is not None:
+                    return value
             except Exception as e:
                 print(f"Redis 取得失敗: {e}")
+            if self._l1_active:
+                return None
         
-        # 使用記憶體快取
-        if key in self.memory_cache:
-            cache_item = self.memory_cache[key]
-            # 檢查是否過期
-            if datetime.fromisoformat(cache_item["expires_at"]) > datetime.now():
-                return cache_item["data"]
-            else:
-                # 過期，刪除
-                del self.memory_cache[key]
-        
-        return None
+        return self._get_memory(key)
+
+    def _get_memory(self, key: str) -> Optional[Any]:
+        """使用記憶體快取"""
+        return self.memory_cache.get(key)
     
+    def _resolve_ttl(
+        self,
+        ttl_hours: Optional[int],
+        is_hot: bool,
+        ttl_seconds: Optional[int],
+        key: Optional[str] = None,
+    ) -> int:
+        """
+        決定 TTL（秒）。偵測到的熱門 key：未指定 TTL 時視同 is_hot（較短、更常刷新）；
+        已指定 TTL 時取 max(指定值, CACHE_HOT_MIN_TTL_HOURS)，延長熱門付費結果的保留時間
+        """
+        detected = key is not None and self.adaptive_ttl and self.hot_keys.is_hot(key)
+        if ttl_seconds is None and ttl_hours is None:
+            ttl_hours = self.hot_ttl_hours if (is_hot or detected) else self.default_ttl_hours
+        if ttl_seconds is None:
+            ttl_seconds = int(ttl_hours * 3600)
+        elif detected:
+            ttl_seconds = max(int(ttl_seconds), int(self.hot_min_ttl_hours * 3600))
+        return max(1, int(ttl_seconds))
+
     async def set(
         self,
         key: str,
         value: Any,
         ttl_hours: Optional[int] = None,
-        is_hot: bool = False
+        is_hot: bool = False,
+        ttl_seconds: Optional[int] = None,
+        namespace: Optional[str] = None,
     ):
-        """設定快取資料"""
-        # 決定 TTL
-        if ttl_hours is None:
-            ttl_hours = self.hot_ttl_hours if is_hot else self.default_ttl_hours
-        
-        expires_at = datetime.now() + timedelta(hours=ttl_hours)
-        
+        """設定快取資料（ttl_seconds 優先於 ttl_hours）"""
+        ttl_seconds = self._resolve_ttl(ttl_hours, is_hot, ttl_seconds, key=key)
+
+        if namespace:
+            try:
+                await self.persistent.set(namespace, key, value, ttl_seconds)
+            except Exception as e:
+                print(f"持久化快取設定失敗: {e}")
+
+        await self._set_hot(key, value, ttl_seconds)
+
+    async def _set_hot(self, key: str, value: Any, ttl_seconds: int):
+        """寫入 Redis 或記憶體快取"""
         if self.use_redis and self.redis_client:
             try:
-                self.redis_client.setex(
+                await self.redis_client.setex(
                     key,
-                    ttl_hours * 3600,  # 轉換為秒
+                    ttl_seconds,
                     # Redis 本身已經有 TTL，不需要額外包一層 expires_at
-                    json.dumps(value)
+                    self.codec.encode(value)
                 )
+                if self._l1_active:
+                    self._set_l1(key, value, min(ttl_seconds, self.l1_ttl_seconds))
+                    # 其他 process 的 L1 可能還是舊值
+                    await self._publish_invalidation([key])
                 return
             except Exception as e:
                 print(f"Redis 設定失敗: {e}")
         
-        # 使用記憶體快取
-        self.memory_cache[key] = {
-            "data": value,
-            "expires_at": expires_at.isoformat()
-        }
-        
-        # 清理過期項目（簡單實作，實際應使用更高效的方式）
-        if len(self.memory_cache) > 1000:
-            self._cleanup_expired()
+        self._set_memory(key, value, ttl_seconds)
+
+    def _set_memory(self, key: str, value: Any, ttl_seconds: int) -> None:
+        """使用記憶體快取（過期清理與大小上限由 ExpiringLRU 處理）"""
+        self._set_l1(key, value, ttl_seconds)
+
+    def _set_l1(self, key: str, value: Any, ttl_seconds: float) -> None:
+        """寫入記憶體 tier；熱門 key 以 pinned 寫入"""
+        pinned = self.adaptive_ttl and self.hot_keys.is_hot(key)
+        self.memory_cache.set(key, value, ttl_seconds, pinned=pinned)
     
-    async def delete(self, key: str):
+    async def delete(self, key: str, namespace: Optional[str] = None):
         """刪除快取"""
+        if namespace:
+            try:
+                await self.persistent.delete(namespace, key)
+            except Exception as e:
+                print(f"持久化快取刪除失敗: {e}")
+
         if self.use_redis and self.redis_client:
             try:
-                self.redis_client.delete(key)
+                await self.redis_client.delete(key)
             except Exception as e:
                 print(f"Redis 刪除失敗: {e}")
         
-        if key in self.memory_cache:
-            del self.memory_cache[key]
+        self.memory_cache.delete(key)
+        await self._publish_invalidation([key])
     
-    async def refresh(self, key: str):
+    async def refresh(self, key: str, namespace: Optional[str] = None):
         """手動刷新快取（刪除）"""
-        await self.delete(key)
-    
-    def _cleanup_expired(self):
-        """清理過期的記憶體快取項目"""
-        now = datetime.now()
-        expired_keys = [
-            key for key, item in self.memory_cache.items()
-            if datetime.fromisoformat(item["expires_at"]) <= now
-        ]
-        for key in expired_keys:
-            del self.memory_cache[key]
+        await self.delete(key, namespace=namespace)
     
+    async def _publish_invalidation(self, keys: List[str]) -> None:
+        """透過 Redis pub/sub 通知其他 process 清除 L1（未啟用時不做事）"""
+        if not (self._l1_active and self.invalidation_pubsub and keys):
+            return
+        try:
+            await self.redis_client.publish(
+                self.invalidation_channel,
+                json.dumps({"origin": self.instance_id, "keys": keys}),
+            )
+        except Exception as e:
+            print(f"快取失效通知發送失敗: {e}")
+
+    async def _invalidation_listener(self) -> None:
+        """訂閱失效通知並清除本機 L1；連線中斷時稍後重新訂閱"""
+        while self.use_redis and self.redis_client is not None:
+            pubsub = self.redis_client.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(self.invalidation_channel)
+                while True:
+                    msg = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                    if not msg or msg.get("type") != "message":
+                        continue
+                    try:
+                        payload = json.loads(msg.get("data") or "{}")
+                    except ValueError:
+                        continue
+                    if payload.get("origin") == self.instance_id:
+                        continue
+                    for key in payload.get("keys") or []:
+                        self.memory_cache.delete(str(key))
+                    self.layer_stats["invalidations_received"] += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"快取失效訂閱中斷，稍後重試: {e}")
+                await asyncio.sleep(1.0)
+            finally:
+                try:
+                    await (getattr(pubsub, "aclose", None) or pubsub.close)()
+                except Exception:
+                    pass
+
+    async def _restore_snapshot(self) -> None:
+        """背景還原快照；啟動後已寫入或刪除/失效的 key 以新狀態為準（不會被舊值復活）"""
+        try:
+            entries = await asyncio.get_running_loop().run_in_executor(None, load_snapshot, self.snapshot_path, self._snapshot_codec)
+            restored = 0
+            for i, (key, value, remaining) in enumerate(entries or []):
+                if not self.memory_cache.changed_since_tracking(key):
+                    self.memory_cache.set(key, value, remaining)
+                    restored += 1
+                if i % 100 == 99:
+                    # 分批讓出 event loop，避免大量還原時卡住請求
+                    await asyncio.sleep(0)
+            self.snapshot_stats["restored_entries"] = restored
+            if restored:
+                print(f"已還原記憶體快取快照: {restored} 筆")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"還原記憶體快取快照失敗: {e}")
+        finally:
+            self.memory_cache.stop_tracking()
+        self._restore_done = True
+
+    async def write_snapshot(self) -> Optional[int]:
+        """寫入記憶體快取快照；內容沒變、使用 Redis 或還原未完成時略過。回傳寫入的 bytes"""
+        if not self.snapshot_enabled or self.use_redis or not self._restore_done:
+            return None
+        writes = self.memory_cache.writes
+        if writes == self._snapshot_writes:
+            return None
+        entries = list(self.memory_cache.items())
+        try:
+            size = await asyncio.get_running_loop().run_in_executor(None, save_snapshot, self.snapshot_path, entries, self._snapshot_codec)
+        except Exception as e:
+            print(f"寫入記憶體快取快照失敗: {e}")
+            return None
+        self._snapshot_writes = writes
+        self.snapshot_stats.update(
+            saved_entries=len(entries),
+            saved_bytes=size,
+            last_saved_at=datetime.now().isoformat(),
+        )
+        return size
+
+    async def _snapshot_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.snapshot_interval_seconds)
+            await self.write_snapshot()
+
+    async def _close_redis(self):
+        client, pool = self.redis_client, self.redis_pool
+        self.redis_client = None
+        self.redis_pool = None
+        try:
+            if client is not None:
+                # redis-py >= 5 為 aclose()，舊版為 close()
+                await (getattr(client, "aclose", None) or client.close)()
+            if pool is not None:
+                await pool.disconnect()
+        except Exception as e:
+            print(f"關閉 Redis 連線失敗: {e}")
+
     async def close(self):
-        """關閉快取連接"""
-        if self.redis_client:
-            self.redis_client.close()
+        """關閉快取連接（未使用 Redis 時先寫入最後一次快照）"""
+        for attr in ("_snapshot_task", "_restore_task"):
+            task = getattr(self, attr)
+            if task is not None:
+                task.cancel()
+                try:
+                    await task
+                except (asyncio.CancelledError, Exception):
+                    pass
+                setattr(self, attr, None)
+        await self.write_snapshot()
+        if self._invalidation_task is not None:
+            self._invalidation_task.cancel()
+            try:
+                await self._invalidation_task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._invalidation_task = None
+        self.use_redis = False
+        await self._close_redis()
+        self.persistent.close()
 
 
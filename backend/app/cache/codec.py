@@ -0,0 +1,155 @@
+"""
+快取值編碼（CacheManager 寫入 Redis 的格式）
+
+格式：1 個 header byte + payload
+- header 最高位元固定為 1（0x80）：json.dumps 預設 ensure_ascii，輸出一定是 ASCII（< 0x80），
+  因此沒有 header 的舊 JSON 值仍可辨識並照常讀取
+- bit 6..5：格式版本（目前為 0）；bit 4..2：序列化方式；bit 1..0：壓縮方式
+- 未壓縮的 JSON 直接寫純 JSON（不加 header），滾動部署時舊版本 process 仍讀得懂
+
+序列化：json（預設，安全）、msgpack（需安裝 msgpack）、pickle（protocol 5，只適用於受信任的 Redis）
+壓縮：超過 min_compress_bytes 才壓縮；zstd（需安裝 zstandard）或 zlib（標準庫）
+"""
+from __future__ import annotations
+
+import json
+import pickle
+import zlib
+from typing import Any, Dict, Optional, Union
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+_MARKER = 0x80
+_VERSION = 0
+
+SERIALIZER_JSON = 0
+SERIALIZER_MSGPACK = 1
+SERIALIZER_PICKLE = 2
+
+COMPRESSION_NONE = 0
+COMPRESSION_ZLIB = 1
+COMPRESSION_ZSTD = 2
+
+_SERIALIZERS = {"json": SERIALIZER_JSON, "msgpack": SERIALIZER_MSGPACK, "pickle": SERIALIZER_PICKLE}
+_COMPRESSIONS = {"none": COMPRESSION_NONE, "zlib": COMPRESSION_ZLIB, "zstd": COMPRESSION_ZSTD}
+
+
+class CacheCodecError(ValueError):
+    """無法解碼的快取值（未知版本/格式，或缺少對應套件）"""
+
+
+def _header(serializer: int, compression: int) -> int:
+    return _MARKER | (_VERSION << 5) | (serializer << 2) | compression
+
+
+class CacheCodec:
+    """依設定編碼；解碼依 header 判斷，所以切換設定後舊資料仍可讀"""
+
+    def __init__(
+        self,
+        serializer: str = "json",
+        compression: str = "zlib",
+        min_compress_bytes: int = 1024,
+        level: Optional[int] = None,
+    ):
+        serializer = (serializer or "json").strip().lower()
+        compression = (compression or "none").strip().lower()
+        if serializer not in _SERIALIZERS:
+            print(f"未知的快取序列化方式 {serializer!r}，改用 json")
+            serializer = "json"
+        if serializer == "msgpack" and not MSGPACK_AVAILABLE:
+            print("msgpack 未安裝，快取序列化改用 json")
+            serializer = "json"
+        if compression not in _COMPRESSIONS:
+            print(f"未知的快取壓縮方式 {compression!r}，改用 zlib")
+            compression = "zlib"
+        if compression == "zstd" and not ZSTD_AVAILABLE:
+            print("zstandard 未安裝，快取壓縮改用 zlib")
+            compression = "zlib"
+        self.serializer = serializer
+        self.compression = compression
+        self.min_compress_bytes = max(0, int(min_compress_bytes))
+        self._serializer_id = _SERIALIZERS[serializer]
+        self._compression_id = _COMPRESSIONS[compression]
+        if self._compression_id == COMPRESSION_ZSTD:
+            self._level = 3 if level is None else int(level)
+            self._zstd_c = zstandard.ZstdCompressor(level=self._level)
+        else:
+            self._level = 6 if level is None else int(level)
+            self._zstd_c = None
+        self._zstd_d = zstandard.ZstdDecompressor() if ZSTD_AVAILABLE else None
+
+    def _serialize(self, value: Any) -> tuple:
+        sid = self._serializer_id
+        if sid == SERIALIZER_MSGPACK:
+            try:
+                return sid, msgpack.packb(value, use_bin_type=True)
+            except (TypeError, ValueError, OverflowError):
+                # msgpack 不支援的值（例如超過 64-bit 的整數）改用 json
+                pass
+        elif sid == SERIALIZER_PICKLE:
+            return sid, pickle.dumps(value, protocol=5)
+        return SERIALIZER_JSON, json.dumps(value).encode("ascii")
+
+    def encode(self, value: Any) -> bytes:
+        sid, body = self._serialize(value)
+        cid = COMPRESSION_NONE
+        if self._compression_id != COMPRESSION_NONE and len(body) >= self.min_compress_bytes:
+            if self._compression_id == COMPRESSION_ZSTD:
+                packed = self._zstd_c.compress(body)
+            else:
+                packed = zlib.compress(body, self._level)
+            # 壓縮後沒有變小就存原始資料
+            if len(packed) < len(body):
+                body, cid = packed, self._compression_id
+        if sid == SERIALIZER_JSON and cid == COMPRESSION_NONE:
+            return body
+        return bytes((_header(sid, cid),)) + body
+
+    def decode(self, data: Union[bytes, str, None]) -> Any:
+        if data is None or data == b"" or data == "":
+            return None
+        if isinstance(data, str):
+            return json.loads(data)
+        head = data[0]
+        if head < _MARKER:
+            # 舊格式：純 JSON
+            return json.loads(data)
+        if (head >> 5) & 0x3 != _VERSION:
+            raise CacheCodecError(f"不支援的快取格式版本: header=0x{head:02x}")
+        sid, cid = (head >> 2) & 0x7, head & 0x3
+        body = memoryview(data)[1:]
+        if cid == COMPRESSION_ZLIB:
+            body = zlib.decompress(body)
+        elif cid == COMPRESSION_ZSTD:
+            if self._zstd_d is None:
+                raise CacheCodecError("快取值以 zstd 壓縮，但 zstandard 未安裝")
+            body = self._zstd_d.decompress(body)
+        elif cid != COMPRESSION_NONE:
+            raise CacheCodecError(f"未知的壓縮方式: {cid}")
+        if sid == SERIALIZER_JSON:
+            return json.loads(bytes(body))
+        if sid == SERIALIZER_MSGPACK:
+            if not MSGPACK_AVAILABLE:
+                raise CacheCodecError("快取值為 msgpack 格式，但 msgpack 未安裝")
+            return msgpack.unpackb(body, raw=False)
+        if sid == SERIALIZER_PICKLE:
+            return pickle.loads(body)
+        raise CacheCodecError(f"未知的序列化方式: {sid}")
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "serializer": self.serializer,
+            "compression": self.compression,
+            "min_compress_bytes": self.min_compress_bytes,
+        }
@@ -0,0 +1,94 @@
+"""
+熱門 key 偵測
+
+- Count-min sketch 估計每個 key 的存取次數（固定記憶體，不隨 key 數成長）
+- 計數器以半衰期衰減（每經過 half_life_seconds 全部減半），反映「最近」的熱度
+- 另外維護一個小型候選表，提供 top-K 熱門 key
+"""
+from __future__ import annotations
+
+import hashlib
+import time
+from typing import Dict, List, Tuple
+
+
+def _hash64(key: str) -> int:
+    # 不用內建 hash()（每個 process 隨機化）；blake2b 為 C 實作，成本很低
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class HotKeyTracker:
+    """Count-min sketch + 時間衰減 + top-K 候選表（單一 event loop 內使用）"""
+
+    def __init__(
+        self,
+        width: int = 2048,
+        depth: int = 4,
+        half_life_seconds: float = 600.0,
+        hot_threshold: int = 20,
+        top_k: int = 50,
+    ):
+        self.width = max(16, int(width))
+        self.depth = max(1, int(depth))
+        self.half_life_seconds = max(1.0, float(half_life_seconds))
+        self.hot_threshold = max(1, int(hot_threshold))
+        self.top_k = max(1, int(top_k))
+        self._rows: List[List[int]] = [[0] * self.width for _ in range(self.depth)]
+        # 候選表大小為 top_k 的兩倍，降低熱門 key 被擠出的機率
+        self._candidates: Dict[str, int] = {}
+        self._last_decay = time.monotonic()
+
+    def _indexes(self, key: str) -> List[int]:
+        # double hashing：h1 + i*h2 產生 depth 個欄位
+        h = _hash64(key)
+        h1, h2 = h & 0xFFFFFFFF, (h >> 32) | 1
+        return [(h1 + i * h2) % self.width for i in range(self.depth)]
+
+    def _maybe_decay(self) -> None:
+        now = time.monotonic()
+        halvings = int((now - self._last_decay) / self.half_life_seconds)
+        if halvings <= 0:
+            return
+        self._last_decay += halvings * self.half_life_seconds
+        shift = min(halvings, 63)
+        for row in self._rows:
+            for i, v in enumerate(row):
+                if v:
+                    row[i] = v >> shift
+        self._candidates = {k: v >> shift for k, v in self._candidates.items() if v >> shift}
+
+    def record(self, key: str) -> int:
+        """記錄一次存取，回傳衰減後的估計次數"""
+        self._maybe_decay()
+        idx = self._indexes(key)
+        # conservative update：只增加等於目前最小值的欄位，降低高估
+        current = min(self._rows[d][i] for d, i in enumerate(idx))
+        est = current + 1
+        for d, i in enumerate(idx):
+            if self._rows[d][i] < est:
+                self._rows[d][i] = est
+        self._track(key, est)
+        return est
+
+    def estimate(self, key: str) -> int:
+        self._maybe_decay()
+        return min(self._rows[d][i] for d, i in enumerate(self._indexes(key)))
+
+    def is_hot(self, key: str) -> bool:
+        return self.estimate(key) >= self.hot_threshold
+
+    def _track(self, key: str, est: int) -> None:
+        cands = self._candidates
+        if key in cands or len(cands) < 2 * self.top_k:
+            cands[key] = est
+            return
+        victim = min(cands, key=cands.__getitem__)
+        if est > cands[victim]:
+            del cands[victim]
+            cands[key] = est
+
+    def top(self, limit: int = 20) -> List[Tuple[str, int]]:
+        """熱門 key（估計次數由高到低）"""
+        self._maybe_decay()
+        ranked = sorted(self._candidates.items(), key=lambda kv: kv[1], reverse=True)
+        return ranked[: max(0, min(int(limit), self.top_k))]
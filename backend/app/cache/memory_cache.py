@@ -0,0 +1,184 @@
+"""
+記憶體快取（CacheManager 的 in-memory tier）
+
+- 到期時間用 time.monotonic()（不受系統時間調整影響，也不用每次解析字串）
+- OrderedDict 維持 LRU 順序：get/set/delete 皆為 O(1)（set 另有一次 O(log n) 的 heap push）
+- 到期 heap：每次 set 只從 heap 頂端移除已過期的項目，不需要掃描全部 entry
+- 同時以 entry 數與約略位元組數限制大小，超過時淘汰最久未使用的項目（pinned 的熱門 key 最後才淘汰）
+"""
+from __future__ import annotations
+
+import heapq
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# 容器/數值的約略額外成本（bytes），只用於大小上限判斷，不追求精確
+_CONTAINER_OVERHEAD = 64
+_SCALAR_SIZE = 16
+
+
+def approx_size(value: Any, _depth: int = 0) -> int:
+    """估算 JSON 類資料的記憶體大小（字串以長度計，容器遞迴加總）"""
+    if isinstance(value, str):
+        return 49 + len(value)
+    if isinstance(value, (bytes, bytearray)):
+        return 33 + len(value)
+    if value is None or isinstance(value, (bool, int, float)):
+        return _SCALAR_SIZE
+    if _depth > 32:
+        return _CONTAINER_OVERHEAD
+    if isinstance(value, dict):
+        return _CONTAINER_OVERHEAD + sum(
+            approx_size(k, _depth + 1) + approx_size(v, _depth + 1) for k, v in value.items()
+        )
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return _CONTAINER_OVERHEAD + sum(approx_size(v, _depth + 1) for v in value)
+    return _CONTAINER_OVERHEAD
+
+
+class _Entry:
+    __slots__ = ("value", "expires_at", "size", "pinned")
+
+    def __init__(self, value: Any, expires_at: float, size: int, pinned: bool = False):
+        self.value = value
+        self.expires_at = expires_at
+        self.size = size
+        self.pinned = pinned
+
+
+class ExpiringLRU:
+    """有 TTL 與大小上限的 LRU（單一 event loop 內使用，不需要鎖）"""
+
+    def __init__(self, max_entries: int = 10000, max_bytes: int = 64 * 1024 * 1024):
+        self.max_entries = max(1, int(max_entries))
+        self.max_bytes = max(1, int(max_bytes))
+        self._data: "OrderedDict[str, _Entry]" = OrderedDict()
+        # (expires_at, key)；覆寫/刪除後留下的舊項目在彈出時比對 expires_at 跳過
+        self._heap: List[Tuple[float, str]] = []
+        self.bytes = 0
+        self.evictions = 0
+        self.expirations = 0
+        # set/delete/clear 次數（快照用來判斷內容是否有變）
+        self.writes = 0
+        # track_changes() 之後被 set/delete 的 key 與是否 clear 過（還原快照時略過這些 key）
+        self._touched: Optional[set] = None
+        self._cleared = False
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        entry = self._data.get(key)
+        if entry is None:
+            return default
+        if entry.expires_at <= time.monotonic():
+            self._remove(key)
+            self.expirations += 1
+            return default
+        self._data.move_to_end(key)
+        return entry.value
+
+    def ttl(self, key: str) -> Optional[float]:
+        """剩餘秒數（不存在或已過期回傳 None）"""
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        remaining = entry.expires_at - time.monotonic()
+        return remaining if remaining > 0 else None
+
+    def track_changes(self) -> None:
+        """開始記錄之後被 set/delete/clear 的 key"""
+        self._touched = set()
+        self._cleared = False
+
+    def stop_tracking(self) -> None:
+        self._touched = None
+        self._cleared = False
+
+    def changed_since_tracking(self, key: str) -> bool:
+        return self._cleared or (self._touched is not None and key in self._touched)
+
+    def set(self, key: str, value: Any, ttl_seconds: float, pinned: bool = False) -> None:
+        """pinned：LRU 淘汰時先跳過（仍會依 TTL 過期）"""
+        self.writes += 1
+        if self._touched is not None:
+            self._touched.add(key)
+        now = time.monotonic()
+        expires_at = now + max(0.0, float(ttl_seconds))
+        size = approx_size(key) + approx_size(value)
+        old = self._data.pop(key, None)
+        if old is not None:
+            self.bytes -= old.size
+        self._data[key] = _Entry(value, expires_at, size, pinned)
+        self.bytes += size
+        heapq.heappush(self._heap, (expires_at, key))
+        self._purge_expired(now)
+        self._evict()
+        # 大量覆寫會讓 heap 累積舊項目：超過一定比例時重建（攤提 O(1)）
+        if len(self._heap) > 2 * len(self._data) + 64:
+            self._heap = [(e.expires_at, k) for k, e in self._data.items()]
+            heapq.heapify(self._heap)
+
+    def delete(self, key: str) -> bool:
+        # 即使 key 還不存在也要記錄（例如快照尚未還原到這個 key 就被刪除）
+        if self._touched is not None:
+            self._touched.add(key)
+        if key not in self._data:
+            return False
+        self.writes += 1
+        self._remove(key)
+        return True
+
+    def clear(self) -> None:
+        self.writes += 1
+        if self._touched is not None:
+            self._cleared = True
+        self._data.clear()
+        self._heap = []
+        self.bytes = 0
+
+    def items(self) -> Iterator[Tuple[str, Any, float]]:
+        """未過期的 (key, value, 剩餘秒數)，由最久未使用到最近使用"""
+        now = time.monotonic()
+        for key, entry in list(self._data.items()):
+            if entry.expires_at > now:
+                yield key, entry.value, entry.expires_at - now
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._data),
+            "bytes": self.bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+    def _remove(self, key: str) -> None:
+        entry = self._data.pop(key)
+        self.bytes -= entry.size
+
+    def _purge_expired(self, now: float) -> None:
+        heap = self._heap
+        while heap and heap[0][0] <= now:
+            expires_at, key = heapq.heappop(heap)
+            entry = self._data.get(key)
+            if entry is not None and entry.expires_at == expires_at:
+                self._remove(key)
+                self.expirations += 1
+
+    def _evict(self) -> None:
+        skipped = 0
+        while self._data and (len(self._data) > self.max_entries or self.bytes > self.max_bytes):
+            key, entry = self._data.popitem(last=False)
+            if entry.pinned and skipped < len(self._data):
+                # pinned 移回最新端；全部都是 pinned 時才淘汰
+                self._data[key] = entry
+                skipped += 1
+                continue
+            self.bytes -= entry.size
+            self.evictions += 1
@@ -0,0 +1,99 @@
+"""
+持久化（磁碟）快取
+以 SQLite 儲存，重啟後仍保留；用於付費查詢（Google CSE / SerpApi）回應等昂貴資料
+"""
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Optional
+
+
+class PersistentCache:
+    """以 namespace 區分的 SQLite key-value 快取（含秒級 TTL）"""
+
+    # 每寫入 N 次清理一次過期資料
+    CLEANUP_EVERY = 200
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    @classmethod
+    def create_default(cls) -> "PersistentCache":
+        # backend/app/cache -> backend/app -> backend
+        base = os.path.normpath(os.path.join(os.path.dirname(__file__), "..", ".."))
+        fp = os.getenv("PERSISTENT_CACHE_PATH") or os.path.join(base, "data", "persistent_cache.sqlite3")
+        return cls(fp)
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.file_path), exist_ok=True)
+            conn = sqlite3.connect(self.file_path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                " namespace TEXT NOT NULL,"
+                " key TEXT NOT NULL,"
+                " value TEXT NOT NULL,"
+                " expires_at REAL NOT NULL,"
+                " PRIMARY KEY (namespace, key))"
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _get_sync(self, namespace: str, key: str) -> Optional[tuple]:
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT value, expires_at FROM cache WHERE namespace = ? AND key = ?",
+                (namespace, key),
+            ).fetchone()
+            if not row:
+                return None
+            value, expires_at = row
+            if expires_at <= time.time():
+                conn.execute("DELETE FROM cache WHERE namespace = ? AND key = ?", (namespace, key))
+                conn.commit()
+                return None
+            return json.loads(value), expires_at - time.time()
+
+    def _set_sync(self, namespace: str, key: str, value: Any, ttl_seconds: float) -> None:
+        with self._lock:
+            conn = self._connect()
+            now = time.time()
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+                (namespace, key, json.dumps(value, ensure_ascii=False), now + float(ttl_seconds)),
+            )
+            self._writes += 1
+            if self._writes % self.CLEANUP_EVERY == 0:
+                conn.execute("DELETE FROM cache WHERE expires_at <= ?", (now,))
+            conn.commit()
+
+    def _delete_sync(self, namespace: str, key: str) -> None:
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM cache WHERE namespace = ? AND key = ?", (namespace, key))
+            conn.commit()
+
+    async def get(self, namespace: str, key: str) -> Optional[tuple]:
+        """回傳 (value, 剩餘秒數)；不存在或已過期回傳 None"""
+        return await asyncio.get_running_loop().run_in_executor(None, self._get_sync, namespace, key)
+
+    async def set(self, namespace: str, key: str, value: Any, ttl_seconds: float) -> None:
+        await asyncio.get_running_loop().run_in_executor(None, self._set_sync, namespace, key, value, ttl_seconds)
+
+    async def delete(self, namespace: str, key: str) -> None:
+        await asyncio.get_running_loop().run_in_executor(None, self._delete_sync, namespace, key)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
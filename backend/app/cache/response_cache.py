@@ -0,0 +1,144 @@
+"""
+預先壓縮的回應 body 快取（/api/hardware 等唯讀目錄端點用）
+
+- key = (資料版本, 查詢形狀)；同一版本同一查詢只序列化/壓縮一次，之後直接回傳 bytes
+- ETag 由資料版本 + 查詢形狀導出（不需要讀 body 計算 hash）；壓縮版本在 ETag 後加上 -gzip / -br，
+  比對 If-None-Match 時忽略這個後綴（同一份內容不論編碼都能回 304）
+- body 只放版本內不變的內容（快照年齡等隨時間變化的值由呼叫端放在 header），
+  同一個強 ETag 永遠對應相同的 bytes
+- brotli 需安裝 brotli（未安裝時只提供 gzip）
+- 版本改變時舊版本的 entry 全部丟棄；同一版本內以 LRU 限制數量
+"""
+from __future__ import annotations
+
+import gzip
+import hashlib
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+# 太小的 body 壓縮沒有意義（header 開銷比省下的還多）
+_MIN_COMPRESS_BYTES = 512
+# 只做一次，用較高的壓縮等級
+_GZIP_LEVEL = 9
+_BROTLI_QUALITY = 9
+
+
+class RenderedBody:
+    __slots__ = ("etag", "body", "gzip", "br")
+
+    def __init__(self, etag: str, body: bytes):
+        self.etag = etag
+        self.body = body
+        self.gzip: Optional[bytes] = None
+        self.br: Optional[bytes] = None
+        if len(body) >= _MIN_COMPRESS_BYTES:
+            # mtime=0：相同內容輸出相同 bytes
+            self.gzip = gzip.compress(body, compresslevel=_GZIP_LEVEL, mtime=0)
+            if BROTLI_AVAILABLE:
+                self.br = brotli.compress(body, quality=_BROTLI_QUALITY)
+
+    def variant(self, encoding: Optional[str]) -> Tuple[bytes, str]:
+        """(body, etag)；encoding 為 None/identity 或沒有該壓縮版本時回傳原始 body"""
+        if encoding == "br" and self.br is not None:
+            return self.br, self.etag[:-1] + '-br"'
+        if encoding == "gzip" and self.gzip is not None:
+            return self.gzip, self.etag[:-1] + '-gzip"'
+        return self.body, self.etag
+
+
+def make_etag(version: str, key: Hashable) -> str:
+    digest = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()[:12]
+    return f'"{version[:16]}-{digest}"'
+
+
+def choose_encoding(accept_encoding: Optional[str], body: RenderedBody) -> Optional[str]:
+    """依 Accept-Encoding（含 q 值）選擇可用的壓縮；br 優先於 gzip"""
+    if not accept_encoding:
+        return None
+    accepted: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if name:
+            accepted[name.strip().lower()] = q
+    wildcard = accepted.get("*", 0.0)
+    for enc, available in (("br", body.br is not None), ("gzip", body.gzip is not None)):
+        if available and accepted.get(enc, wildcard) > 0:
+            return enc
+    return None
+
+
+def _strip_etag(tag: str) -> str:
+    tag = tag.strip()
+    if tag.startswith("W/"):
+        tag = tag[2:]
+    tag = tag.strip('"')
+    for suffix in ("-gzip", "-br"):
+        if tag.endswith(suffix):
+            return tag[:-len(suffix)]
+    return tag
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match 比對（弱比對，忽略 W/ 與壓縮後綴）"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    target = _strip_etag(etag)
+    return any(_strip_etag(t) == target for t in if_none_match.split(",") if t.strip())
+
+
+class ResponseBodyCache:
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max(1, int(max_entries))
+        self._version: Optional[str] = None
+        self._data: "OrderedDict[Hashable, RenderedBody]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def get(self, version: str, key: Hashable) -> Optional[RenderedBody]:
+        if version != self._version:
+            self.misses += 1
+            return None
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, version: str, key: Hashable, body: bytes) -> RenderedBody:
+        if version != self._version:
+            self._version = version
+            self._data.clear()
+        entry = RenderedBody(make_etag(version, key), body)
+        self._data[key] = entry
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+        return entry
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "version": self._version,
+            "entries": len(self._data),
+            "hits": self.hits,
+            "misses": self.misses,
+            "not_modified": self.not_modified,
+            "brotli": BROTLI_AVAILABLE,
+        }
@@ -0,0 +1,86 @@
+"""
+記憶體快取快照（重啟後還原 CacheManager 的 memory tier）
+
+檔案格式：4 bytes magic + zlib 壓縮的 record 串流；每個 record 為 4 bytes 長度（big-endian）+ CacheCodec 編碼內容
+- 第一個 record 是 {"saved_at": epoch}，其後每筆為 [key, value, 剩餘秒數]
+- 剩餘 TTL 以存檔當下計算，還原時再扣掉停機時間；已過期的 entry 不還原
+- entries 依 LRU 順序（最久未使用在前），依序寫回即可保留使用順序
+- 每筆獨立編碼：讀寫都是同步函式，由 CacheManager 在 executor thread 執行，
+  不會出現一次解析整個大 JSON、長時間佔住 GIL 而卡住 event loop 的情況
+"""
+from __future__ import annotations
+
+import os
+import struct
+import time
+import zlib
+from typing import Any, List, Optional, Tuple
+
+from app.cache.codec import CacheCodec
+
+_MAGIC = b"MCS1"
+_LEN = struct.Struct(">I")
+
+SnapshotEntry = Tuple[str, Any, float]
+
+
+def save_snapshot(path: str, entries: List[SnapshotEntry], codec: CacheCodec) -> int:
+    """原子寫入快照（tmp + replace），回傳檔案大小；無法編碼的 entry 略過"""
+    comp = zlib.compressobj(6)
+    chunks = [_MAGIC]
+
+    def put(record: Any) -> None:
+        body = codec.encode(record)
+        chunks.append(comp.compress(_LEN.pack(len(body)) + body))
+
+    put({"saved_at": time.time()})
+    for key, value, remaining in entries:
+        try:
+            put([key, value, round(remaining, 3)])
+        except (TypeError, ValueError, OverflowError):
+            continue
+    chunks.append(comp.flush())
+    blob = b"".join(chunks)
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    # 多個 worker process 可能同時寫同一個檔案：tmp 檔名加上 pid
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(blob)
+    os.replace(tmp, path)
+    return len(blob)
+
+
+def load_snapshot(path: str, codec: CacheCodec) -> Optional[List[SnapshotEntry]]:
+    """讀取快照並扣除停機時間；檔案不存在或格式不符回傳 None"""
+    try:
+        with open(path, "rb") as f:
+            blob = f.read()
+    except FileNotFoundError:
+        return None
+    if not blob.startswith(_MAGIC):
+        print(f"記憶體快取快照格式不符，略過: {path}")
+        return None
+    raw = memoryview(zlib.decompress(blob[len(_MAGIC):]))
+
+    records: List[Any] = []
+    pos, end = 0, len(raw)
+    while pos + _LEN.size <= end:
+        (size,) = _LEN.unpack_from(raw, pos)
+        pos += _LEN.size
+        records.append(codec.decode(bytes(raw[pos:pos + size])))
+        pos += size
+    if not records or not isinstance(records[0], dict):
+        return None
+
+    elapsed = max(0.0, time.time() - float(records[0].get("saved_at") or 0))
+    out: List[SnapshotEntry] = []
+    for item in records[1:]:
+        try:
+            key, value, remaining = item
+            remaining = float(remaining) - elapsed
+        except (TypeError, ValueError):
+            continue
+        if remaining > 0 and value is not None:
+            out.append((str(key), value, remaining))
+    return out
@@ -1,5 +1,6 @@
 from .benchmark_store import benchmark_store  # noqa: F401
 from .benchmark_store_v2 import benchmark_store_v2  # noqa: F401
+from .enrichment_queue import enrichment_queue  # noqa: F401
 
 
 
@@ -4,24 +4,94 @@ import asyncio
 import json
 import os
 from dataclasses import dataclass
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+
+from app.db.dependency_index import TagIndex, entry_tags, is_predicted
+from app.services.hardware_identity import hardware_identity
 
 
 def _norm(s: str) -> str:
     return " ".join((s or "").strip().split())
 
 
+def _canon_part(s: str) -> str:
+    return _norm(s).lower()
+
+
+def _hw_part(s: str) -> str:
+    return hardware_identity.resolve(s) or _canon_part(s)
+
+
+def _canon_key(game: str, resolution: str, settings: str, gpu: str, cpu: str) -> str:
+    # 與 v2 相同的 canonical 規則：case-insensitive + "||"；GPU/CPU 為 hardware_identity 的 canonical id
+    return "||".join([_canon_part(game), _canon_part(resolution), _canon_part(settings), _hw_part(gpu), _hw_part(cpu)])
+
+
+def _try_canonicalize_existing_key(k: str) -> Optional[str]:
+    """
+    舊格式 key：
+    - "game|resolution|settings|gpu|cpu"（大小寫敏感）
+    - "game||resolution||settings||gpu||cpu"
+    轉成 canonical key；無法解析時回傳 None。
+    """
+    if not k:
+        return None
+    s = str(k)
+    if "||" in s:
+        parts = s.split("||")
+        if len(parts) == 5:
+            return _canon_key(*parts)
+    parts = s.split("|")
+    if len(parts) == 5:
+        return _canon_key(*parts)
+    return None
+
+
+def _prefer_new(prev: Any, new: Dict[str, Any]) -> bool:
+    """同一 canonical key 的重複資料：有 avg_fps 的優先，其次非預測（真實）資料；都一樣時保留先出現者"""
+    def rank(v: Any) -> Tuple[bool, bool]:
+        if not isinstance(v, dict):
+            return (False, False)
+        return (v.get("avg_fps") is not None, not is_predicted(v))
+    return rank(new) > rank(prev)
+
+
+def canonicalize_items(items: Dict[str, Any]) -> Tuple[Dict[str, Any], int]:
+    """舊檔案內容 → (canonical key 的資料, 合併掉的重複筆數)"""
+    canon: Dict[str, Any] = {}
+    collapsed = 0
+    for k, v in (items or {}).items():
+        if not isinstance(v, dict):
+            continue
+        ck = _try_canonicalize_existing_key(k) or str(k)
+        if ck in canon:
+            collapsed += 1
+            if _prefer_new(canon[ck], v):
+                canon[ck] = v
+        else:
+            canon[ck] = v
+    return canon, collapsed
+
+
 @dataclass
 class BenchmarkStore:
     """
     v1 cache（含 CPU）：
-    key = game|resolution|settings|gpu|cpu
+    key = game||resolution||settings||gpu||cpu（全小寫，GPU/CPU 為 canonical id；與 v2 相同規則）
     value = 任意 JSON dict（avg_fps/p1_low/notes/source/raw_snippet...）
+
+    舊版 "game|resolution|settings|gpu|cpu"（大小寫敏感）的檔案在載入時轉成 canonical key，
+    大小寫/寫法不同的重複資料合併成一筆（有 avg_fps 的優先）；下次寫檔即以新格式保存
+
+    依賴索引（_index）：第一次查詢依賴時建立，之後隨 upsert/delete_keys 增量維護
     """
 
     file_path: str
     _lock: asyncio.Lock
     _data: Dict[str, Any]
+    _index: Optional[TagIndex] = None
+    # 載入時合併掉的重複筆數（migration 報告用）
+    collapsed_on_load: int = 0
 
     @classmethod
     def create_default(cls) -> "BenchmarkStore":
@@ -36,12 +106,38 @@ class BenchmarkStore:
         try:
             if os.path.exists(self.file_path):
                 with open(self.file_path, "r", encoding="utf-8") as f:
-                    self._data = json.load(f) or {}
+                    raw = json.load(f) or {}
+                self._data, self.collapsed_on_load = canonicalize_items(raw if isinstance(raw, dict) else {})
+                if self.collapsed_on_load:
+                    print(f"v1 快取載入：合併 {self.collapsed_on_load} 筆重複資料")
         except Exception:
             self._data = {}
 
     def _key(self, game: str, resolution: str, settings: str, gpu: str, cpu: str) -> str:
-        return "|".join([_norm(game), _norm(resolution), _norm(settings), _norm(gpu), _norm(cpu)])
+        return _canon_key(game, resolution, settings, gpu, cpu)
+
+    @staticmethod
+    def _tags_for(key: str, value: Any) -> list:
+        parts = key.split("||") if "||" in key else key.split("|")
+        if len(parts) != 5:
+            return []
+        game, _res, _st, gpu, cpu = parts
+        return entry_tags(game, gpu, cpu, value if isinstance(value, dict) else None)
+
+    def _ensure_index(self) -> TagIndex:
+        if self._index is None:
+            index = TagIndex()
+            for k, v in self._data.items():
+                index.add(k, self._tags_for(k, v))
+            self._index = index
+        return self._index
+
+    def _write(self) -> None:
+        os.makedirs(os.path.dirname(self.file_path), exist_ok=True)
+        tmp = f"{self.file_path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self._data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, self.file_path)
 
     async def get(self, game: str, resolution: str, settings: str, gpu: str, cpu: str) -> Optional[Dict[str, Any]]:
         async with self._lock:
@@ -51,12 +147,36 @@ class BenchmarkStore:
     async def upsert(self, game: str, resolution: str, settings: str, gpu: str, cpu: str, value: Dict[str, Any]) -> None:
         async with self._lock:
             await self._load()
-            self._data[self._key(game, resolution, settings, gpu, cpu)] = value
-            os.makedirs(os.path.dirname(self.file_path), exist_ok=True)
-            tmp = f"{self.file_path}.tmp"
-            with open(tmp, "w", encoding="utf-8") as f:
-                json.dump(self._data, f, ensure_ascii=False, indent=2)
-            os.replace(tmp, self.file_path)
+            key = self._key(game, resolution, settings, gpu, cpu)
+            self._data[key] = value
+            if self._index is not None:
+                self._index.add(key, self._tags_for(key, value))
+            self._write()
+
+    async def find_dependents(self, **criteria: Any) -> Set[str]:
+        """依依賴條件取出 key（參數同 TagIndex.match）"""
+        async with self._lock:
+            await self._load()
+            return self._ensure_index().match(**criteria)
+
+    async def delete_keys(self, keys: Iterable[str]) -> int:
+        """刪除多筆（只寫檔一次）；下次查詢時會依現行模型重新產生"""
+        async with self._lock:
+            await self._load()
+            removed = 0
+            for key in keys:
+                if self._data.pop(key, None) is not None:
+                    removed += 1
+                    if self._index is not None:
+                        self._index.remove(key)
+            if removed:
+                self._write()
+            return removed
+
+    async def index_stats(self) -> Dict[str, int]:
+        async with self._lock:
+            await self._load()
+            return self._ensure_index().stats()
 
 
 benchmark_store = BenchmarkStore.create_default()
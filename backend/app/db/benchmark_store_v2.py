@@ -5,7 +5,10 @@ import json
 import os
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterable, Optional, Set
+
+from app.db.dependency_index import TagIndex, entry_tags
+from app.services.hardware_identity import hardware_identity
 
 
 def _norm(s: str) -> str:
@@ -16,8 +19,10 @@ def _canon_part(s: str) -> str:
 
 
 def _canon_key(game: str, resolution: str, settings: str, gpu: str) -> str:
-    # v2 canonical: case-insensitive + "||" separator（向後相容舊檔案格式）
-    return "||".join([_canon_part(game), _canon_part(resolution), _canon_part(settings), _canon_part(gpu)])
+    # v2 canonical: case-insensitive + "||" separator（向後相容舊檔案格式）；
+    # GPU 使用 hardware_identity 的 canonical id（"NVIDIA GeForce RTX 4090" 與 "RTX 4090" 同一筆）
+    gpu_id = hardware_identity.resolve(gpu) or _canon_part(gpu)
+    return "||".join([_canon_part(game), _canon_part(resolution), _canon_part(settings), gpu_id])
 
 
 def _try_canonicalize_existing_key(k: str) -> Optional[str]:
@@ -25,7 +30,7 @@ def _try_canonicalize_existing_key(k: str) -> Optional[str]:
     支援舊格式 key：
     - "game|resolution|settings|gpu"
     - "game||resolution||settings||gpu"
-    轉成 canonical "game||resolution||settings||gpu"（全小寫）。
+    轉成 canonical "game||resolution||settings||gpu"（全小寫，GPU 為 canonical id）。
     """
     if not k:
         return None
@@ -52,11 +57,14 @@ class BenchmarkStoreV2:
     用途：
     - 大量預熱 25 games × GPUs × resolutions × settings
     - 由後端再套用 CPU 調整/使用率推估，提升覆蓋率與一致性
+
+    依賴索引（_index）：第一次查詢依賴時建立，之後隨 upsert/bulk_upsert/delete_keys 增量維護
     """
 
     file_path: str
     _lock: asyncio.Lock
     _data: Dict[str, Any]
+    _index: Optional[TagIndex] = None
 
     @classmethod
     def create_default(cls) -> "BenchmarkStoreV2":
@@ -109,6 +117,39 @@ class BenchmarkStoreV2:
     def _key(self, game: str, resolution: str, settings: str, gpu: str) -> str:
         return _canon_key(game, resolution, settings, gpu)
 
+    @staticmethod
+    def _tags_for(key: str, value: Any) -> list:
+        parts = key.split("||") if "||" in key else key.split("|")
+        if len(parts) != 4:
+            return []
+        game, _res, _st, gpu = parts
+        # GPU-base：預測時使用固定的 reference CPU，不標 CPU
+        return entry_tags(game, gpu, None, value if isinstance(value, dict) else None)
+
+    def _ensure_index(self) -> TagIndex:
+        if self._index is None:
+            index = TagIndex()
+            for k, v in self._data.items():
+                index.add(k, self._tags_for(k, v))
+            self._index = index
+        return self._index
+
+    def _write(self) -> None:
+        os.makedirs(os.path.dirname(self.file_path), exist_ok=True)
+        tmp = f"{self.file_path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "version": 2,
+                    "updated_at": datetime.now().isoformat(),
+                    "items": self._data,
+                },
+                f,
+                ensure_ascii=False,
+                indent=2,
+            )
+        os.replace(tmp, self.file_path)
+
     async def get(self, game: str, resolution: str, settings: str, gpu: str) -> Optional[Dict[str, Any]]:
         async with self._lock:
             await self._load()
@@ -122,21 +163,11 @@ class BenchmarkStoreV2:
     async def upsert(self, game: str, resolution: str, settings: str, gpu: str, value: Dict[str, Any]) -> None:
         async with self._lock:
             await self._load()
-            self._data[self._key(game, resolution, settings, gpu)] = value
-            os.makedirs(os.path.dirname(self.file_path), exist_ok=True)
-            tmp = f"{self.file_path}.tmp"
-            with open(tmp, "w", encoding="utf-8") as f:
-                json.dump(
-                    {
-                        "version": 2,
-                        "updated_at": datetime.now().isoformat(),
-                        "items": self._data,
-                    },
-                    f,
-                    ensure_ascii=False,
-                    indent=2,
-                )
-            os.replace(tmp, self.file_path)
+            key = self._key(game, resolution, settings, gpu)
+            self._data[key] = value
+            if self._index is not None:
+                self._index.add(key, self._tags_for(key, value))
+            self._write()
 
     async def bulk_upsert(self, records: list[dict]) -> None:
         """
@@ -148,20 +179,34 @@ class BenchmarkStoreV2:
             for r in records or []:
                 k = self._key(r.get("game", ""), r.get("resolution", ""), r.get("settings", ""), r.get("gpu", ""))
                 self._data[k] = r.get("value", {})
-            os.makedirs(os.path.dirname(self.file_path), exist_ok=True)
-            tmp = f"{self.file_path}.tmp"
-            with open(tmp, "w", encoding="utf-8") as f:
-                json.dump(
-                    {
-                        "version": 2,
-                        "updated_at": datetime.now().isoformat(),
-                        "items": self._data,
-                    },
-                    f,
-                    ensure_ascii=False,
-                    indent=2,
-                )
-            os.replace(tmp, self.file_path)
+                if self._index is not None:
+                    self._index.add(k, self._tags_for(k, self._data[k]))
+            self._write()
+
+    async def find_dependents(self, **criteria: Any) -> Set[str]:
+        """依依賴條件取出 key（參數同 TagIndex.match）"""
+        async with self._lock:
+            await self._load()
+            return self._ensure_index().match(**criteria)
+
+    async def delete_keys(self, keys: Iterable[str]) -> int:
+        """刪除多筆（只寫檔一次）；下次查詢時會依現行模型重新產生"""
+        async with self._lock:
+            await self._load()
+            removed = 0
+            for key in keys:
+                if self._data.pop(key, None) is not None:
+                    removed += 1
+                    if self._index is not None:
+                        self._index.remove(key)
+            if removed:
+                self._write()
+            return removed
+
+    async def index_stats(self) -> Dict[str, int]:
+        async with self._lock:
+            await self._load()
+            return self._ensure_index().stats()
 
 
 benchmark_store_v2 = BenchmarkStoreV2.create_default()
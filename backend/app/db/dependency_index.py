@@ -0,0 +1,124 @@
+"""
+快取 entry 的依賴標記（tag → key 反向索引）
+
+每筆 v1/v2 資料依 key 與內容標上依賴：
+- game:<遊戲>、gpu:<GPU>、cpu:<CPU>（只有 v1 含 CPU；GPU/CPU 為 hardware_identity 的 canonical id）
+- predicted：由預測模型產生的資料（才會受 hw_performance_override.json / MODEL_VERSION 影響）
+- mv:<model_version>：預測資料的模型版本
+
+調整單一 GPU 的分數時，只需要從索引取出相關 key，不必掃描整個檔案。
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from app.services.hardware_identity import hardware_identity
+
+TAG_PREDICTED = "predicted"
+
+
+def tag_part(s: Any) -> str:
+    return " ".join(str(s or "").strip().split()).lower()
+
+
+def hw_tag_part(s: Any) -> str:
+    """GPU/CPU tag 使用 canonical id（與 store key、override 比對一致）"""
+    return hardware_identity.resolve(s) or tag_part(s)
+
+
+def is_predicted(value: Optional[Dict[str, Any]]) -> bool:
+    """預測資料（舊版可能被寫成 Local Benchmark Cache，但 raw_snippet 會露出）"""
+    if not isinstance(value, dict):
+        return False
+    if str(value.get("source") or "") == "Predicted Model":
+        return True
+    return "基於真實基準預測" in str(value.get("raw_snippet") or "")
+
+
+def entry_tags(game: str, gpu: str, cpu: Optional[str], value: Optional[Dict[str, Any]]) -> List[str]:
+    tags = [f"game:{tag_part(game)}", f"gpu:{hw_tag_part(gpu)}"]
+    if cpu:
+        tags.append(f"cpu:{hw_tag_part(cpu)}")
+    if is_predicted(value):
+        tags.append(TAG_PREDICTED)
+        tags.append(f"mv:{(value or {}).get('model_version')}")
+    return tags
+
+
+class TagIndex:
+    """tag → keys 與 key → tags 的雙向索引（由 store 在自己的鎖內維護）"""
+
+    def __init__(self):
+        self._keys: Dict[str, Set[str]] = {}
+        self._tags: Dict[str, List[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._tags)
+
+    def add(self, key: str, tags: Iterable[str]) -> None:
+        self.remove(key)
+        tags = list(tags)
+        self._tags[key] = tags
+        for t in tags:
+            self._keys.setdefault(t, set()).add(key)
+
+    def remove(self, key: str) -> None:
+        for t in self._tags.pop(key, ()):
+            keys = self._keys.get(t)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys[t]
+
+    def keys(self, tag: str) -> Set[str]:
+        return set(self._keys.get(tag, ()))
+
+    def tags(self, prefix: str = "") -> List[str]:
+        """目前存在的 tag（可用前綴過濾，例如 "gpu:"）"""
+        return [t for t in self._keys if t.startswith(prefix)]
+
+    def match(
+        self,
+        gpus: Iterable[str] = (),
+        cpus: Iterable[str] = (),
+        games: Iterable[str] = (),
+        substring: bool = False,
+        predicted_only: bool = False,
+        stale_model_version: Optional[Any] = None,
+    ) -> Set[str]:
+        """
+        依條件取出 key（gpu/cpu/game 之間為聯集）：
+        - substring=True：GPU/CPU 名稱以「包含」比對（與 override 檔的比對規則相同，
+          例如 override "RTX 4070" 會影響 "rtx 4070 super"）；只掃描 tag 名稱，不掃描資料
+        - predicted_only：只保留預測資料
+        - stale_model_version：另外加入 model_version 不等於此值的預測資料
+        """
+        out: Set[str] = set()
+        for prefix, names in (("gpu:", gpus), ("cpu:", cpus), ("game:", games)):
+            part = tag_part if prefix == "game:" else hw_tag_part
+            names = [p for p in (part(n) for n in names) if p]
+            if not names:
+                continue
+            if substring and prefix != "game:":
+                for tag in self.tags(prefix):
+                    value = tag[len(prefix):]
+                    if any(n in value for n in names):
+                        out |= self._keys.get(tag, set())
+            else:
+                for n in names:
+                    out |= self._keys.get(prefix + n, set())
+        if predicted_only:
+            out &= self._keys.get(TAG_PREDICTED, set())
+        if stale_model_version is not None:
+            current = f"mv:{stale_model_version}"
+            for tag in self.tags("mv:"):
+                if tag != current:
+                    out |= self._keys.get(tag, set())
+        return out
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._tags),
+            "tags": len(self._keys),
+            "predicted": len(self._keys.get(TAG_PREDICTED, ())),
+        }
@@ -0,0 +1,244 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from app.services.hardware_identity import hardware_identity
+
+
+def _norm(s: str) -> str:
+    return " ".join((s or "").strip().split())
+
+
+def _hw_part(s: str) -> str:
+    return hardware_identity.resolve(s) or _norm(s).lower()
+
+
+def _job_key(game: str, resolution: str, settings: str, gpu: str, cpu: str) -> str:
+    parts = [_norm(x).lower() for x in (game, resolution, settings)]
+    return "||".join(parts + [_hw_part(gpu), _hw_part(cpu)])
+
+
+@dataclass
+class EnrichmentQueue:
+    """
+    背景 web enrichment 佇列（JSON 檔持久化，重啟後保留）：
+    key = game||resolution||settings||gpu||cpu（全小寫；GPU/CPU 為 hardware_identity 的 canonical id）
+    value = {"game":..., "status": pending|running|done|failed, "attempts":..., "next_attempt_at": epoch, ...}
+
+    - 同一組合只保留一筆；已完成/失敗的組合在冷卻期（retry_seconds）內重複 enqueue 不會生效
+    - running 代表被 worker 取走；重啟時視為 pending（上次執行被中斷）
+    - 找到真實數據的 job 完成即移除（v1 快取已有資料）；沒找到的 done job 在冷卻期過後清掉，檔案不會無限成長
+    - 寫檔在 worker thread 執行（持有 lock，寫入順序不變），不阻塞 event loop
+    """
+
+    file_path: str
+    _lock: asyncio.Lock
+    _data: Dict[str, Dict[str, Any]]
+    retry_seconds: float = 24 * 3600
+    max_attempts: int = 5
+    _loaded: bool = False
+
+    @classmethod
+    def create_default(cls) -> "EnrichmentQueue":
+        base = os.path.normpath(os.path.join(os.path.dirname(__file__), "..", ".."))
+        fp = os.path.join(base, "data", "enrichment_queue.json")
+        return cls(
+            file_path=fp,
+            _lock=asyncio.Lock(),
+            _data={},
+            retry_seconds=float(os.getenv("ENRICH_RETRY_HOURS", "24")) * 3600,
+            max_attempts=int(os.getenv("ENRICH_MAX_ATTEMPTS", "5")),
+        )
+
+    async def _load(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            if os.path.exists(self.file_path):
+                with open(self.file_path, "r", encoding="utf-8") as f:
+                    raw = json.load(f) or {}
+                jobs = raw.get("jobs") if isinstance(raw, dict) else None
+                self._data = {}
+                for k, v in (jobs or {}).items():
+                    if not isinstance(v, dict):
+                        continue
+                    # 舊版 key 的 GPU/CPU 只做小寫；以 job 內容重新計算，同一組合只保留第一筆
+                    if all(v.get(f) is not None for f in ("game", "resolution", "settings", "gpu", "cpu")):
+                        k = _job_key(v["game"], v["resolution"], v["settings"], v["gpu"], v["cpu"])
+                    self._data.setdefault(k, v)
+                for job in self._data.values():
+                    if job.get("status") == "running":
+                        job["status"] = "pending"
+        except Exception:
+            self._data = {}
+
+    def _prune(self, now: float) -> None:
+        """移除冷卻期已過的 done job（之後再 enqueue 等同新 job）"""
+        expired = [
+            k
+            for k, job in self._data.items()
+            if job.get("status") == "done" and now - float(job.get("finished_at") or 0.0) >= self.retry_seconds
+        ]
+        for k in expired:
+            del self._data[k]
+
+    async def _save(self) -> None:
+        """必須在 self._lock 內呼叫"""
+        self._prune(time.time())
+        await asyncio.get_running_loop().run_in_executor(None, self._write)
+
+    def _write(self) -> None:
+        os.makedirs(os.path.dirname(self.file_path), exist_ok=True)
+        tmp = f"{self.file_path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "version": 1,
+                    "updated_at": datetime.now().isoformat(),
+                    "jobs": self._data,
+                },
+                f,
+                ensure_ascii=False,
+                indent=2,
+            )
+        os.replace(tmp, self.file_path)
+
+    async def enqueue(
+        self,
+        game: str,
+        resolution: str,
+        settings: str,
+        gpu: str,
+        cpu: str,
+        reason: str = "",
+        delay_seconds: float = 0.0,
+    ) -> bool:
+        """加入佇列；已在佇列中或仍在冷卻期時回傳 False"""
+        key = _job_key(game, resolution, settings, gpu, cpu)
+        now = time.time()
+        async with self._lock:
+            await self._load()
+            job = self._data.get(key)
+            if job is not None:
+                status = job.get("status")
+                if status in ("pending", "running"):
+                    return False
+                if now - float(job.get("finished_at") or 0.0) < self.retry_seconds:
+                    return False
+                if status == "failed" and int(job.get("attempts") or 0) >= self.max_attempts:
+                    return False
+            self._data[key] = {
+                "game": game,
+                "resolution": resolution,
+                "settings": settings,
+                "gpu": gpu,
+                "cpu": cpu,
+                "status": "pending",
+                "reason": reason,
+                "attempts": int((job or {}).get("attempts") or 0),
+                "enqueued_at": now,
+                "next_attempt_at": now + max(0.0, float(delay_seconds)),
+                "finished_at": None,
+                "last_error": None,
+            }
+            await self._save()
+            return True
+
+    async def claim_next(self) -> Optional[Dict[str, Any]]:
+        """取出最早到期的 pending job（標記為 running）"""
+        now = time.time()
+        async with self._lock:
+            await self._load()
+            best_key = None
+            best_at = None
+            for k, job in self._data.items():
+                if job.get("status") != "pending":
+                    continue
+                at = float(job.get("next_attempt_at") or 0.0)
+                if at > now:
+                    continue
+                if best_at is None or at < best_at:
+                    best_key, best_at = k, at
+            if best_key is None:
+                return None
+            job = self._data[best_key]
+            job["status"] = "running"
+            job["attempts"] = int(job.get("attempts") or 0) + 1
+            await self._save()
+            return {"key": best_key, **job}
+
+    async def complete(self, key: str, found: bool) -> None:
+        async with self._lock:
+            await self._load()
+            job = self._data.get(key)
+            if job is None:
+                return
+            if found:
+                # 真實數據已寫入 v1 快取：不需要冷卻標記
+                del self._data[key]
+                await self._save()
+                return
+            job["status"] = "done"
+            job["found"] = False
+            job["finished_at"] = time.time()
+            job["last_error"] = None
+            await self._save()
+
+    async def fail(self, key: str, error: str) -> None:
+        """失敗：未達上限則指數退避後重試"""
+        async with self._lock:
+            await self._load()
+            job = self._data.get(key)
+            if job is None:
+                return
+            attempts = int(job.get("attempts") or 0)
+            job["last_error"] = str(error)[:500]
+            if attempts >= self.max_attempts:
+                job["status"] = "failed"
+                job["finished_at"] = time.time()
+            else:
+                job["status"] = "pending"
+                job["next_attempt_at"] = time.time() + min(3600.0, 30.0 * (2 ** attempts))
+            await self._save()
+
+    async def defer(self, key: str, delay_seconds: float, reason: str = "") -> None:
+        """延後重試且不計入失敗次數（例如搜尋 API 額度不足）"""
+        async with self._lock:
+            await self._load()
+            job = self._data.get(key)
+            if job is None:
+                return
+            job["status"] = "pending"
+            job["attempts"] = max(0, int(job.get("attempts") or 0) - 1)
+            job["next_attempt_at"] = time.time() + max(0.0, float(delay_seconds))
+            job["last_error"] = str(reason)[:500] or None
+            await self._save()
+
+    async def next_due_in(self) -> Optional[float]:
+        """距離下一個 pending job 到期的秒數（沒有 pending 時回傳 None）"""
+        now = time.time()
+        async with self._lock:
+            await self._load()
+            ats = [float(j.get("next_attempt_at") or 0.0) for j in self._data.values() if j.get("status") == "pending"]
+            if not ats:
+                return None
+            return max(0.0, min(ats) - now)
+
+    async def stats(self) -> Dict[str, int]:
+        async with self._lock:
+            await self._load()
+            out: Dict[str, int] = {}
+            for job in self._data.values():
+                st = str(job.get("status") or "unknown")
+                out[st] = out.get(st, 0) + 1
+            return out
+
+
+enrichment_queue = EnrichmentQueue.create_default()
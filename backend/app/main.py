@@ -4,14 +4,19 @@ from fastapi.responses import JSONResponse
 import os
 from dotenv import load_dotenv
 
-from app.api import hardware, benchmarks
-from app.cache.global_cache import cache_manager
-
 # 確保不論從哪個工作目錄啟動，都能讀到 backend/.env
+# （必須在 import app.* 之前：額度/佇列/worker 等 singleton 在 import 時讀取環境變數）
 _BACKEND_DIR = os.path.normpath(os.path.join(os.path.dirname(__file__), ".."))
 _DOTENV_PATH = os.path.join(_BACKEND_DIR, ".env")
 load_dotenv(dotenv_path=_DOTENV_PATH, override=True)
 
+from app.api import hardware, benchmarks  # noqa: E402
+from app.cache.global_cache import cache_manager  # noqa: E402
+from app.services.api_budget import api_budget  # noqa: E402
+from app.services.dependency_tracker import dependency_tracker  # noqa: E402
+from app.services.enrichment import enrichment_worker  # noqa: E402
+from app.services.hardware_catalog import hardware_catalog  # noqa: E402
+
 app = FastAPI(
     title="硬體 FPS 基準分析系統",
     description="即時從網路抓取硬體效能基準資料並進行瓶頸分析",
@@ -25,16 +30,24 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # 硬體目錄的快照年齡放在 header（body 與 ETag 一一對應）
+    expose_headers=["X-Snapshot-Age"],
 )
 
 @app.on_event("startup")
 async def startup_event():
     """應用啟動時初始化"""
     await cache_manager.initialize()
+    hardware_catalog.start()
+    enrichment_worker.start()
+    dependency_tracker.start()
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """應用關閉時清理"""
+    await hardware_catalog.stop()
+    await dependency_tracker.stop()
+    await enrichment_worker.stop()
     await cache_manager.close()
 
 # 註冊路由
@@ -53,6 +66,27 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+@app.get("/cache/stats")
+async def cache_stats():
+    """快取命中統計（依 query family 分類）"""
+    return {
+        "families": cache_manager.get_stats(),
+        "memory": cache_manager.memory_cache.stats(),
+        "layers": dict(cache_manager.layer_stats),
+        "codec": cache_manager.codec.describe(),
+        "snapshot": dict(cache_manager.snapshot_stats),
+    }
+
+@app.get("/cache/hot")
+async def cache_hot_keys(limit: int = 20):
+    """近期存取最頻繁的 key（count-min sketch 估計值，依半衰期衰減）"""
+    return cache_manager.hot_key_report(limit)
+
+@app.get("/api-budget")
+async def api_budget_stats():
+    """付費搜尋 API 今日用量與各優先等級可用上限"""
+    return await api_budget.snapshot()
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
     """全域異常處理"""
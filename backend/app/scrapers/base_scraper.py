@@ -11,6 +11,25 @@ from urllib.parse import urljoin, urlparse
 import httpx
 from datetime import datetime
 
+class RateLimiter:
+    """跨實例共用的 rate limiter（同一 process 內所有持有者共享最小請求間隔）"""
+
+    def __init__(self, min_interval: float):
+        self.min_interval = float(min_interval)
+        self._last: float = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        async with self._lock:
+            delay = self.min_interval - (time.monotonic() - self._last)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._last = time.monotonic()
+
+
+# 背景工作（enrichment 等）共用；互動請求仍使用各自 instance 的 rate limiting
+global_rate_limiter = RateLimiter(float(os.getenv("GLOBAL_RATE_LIMIT_SECONDS", "1.0")))
+
 class BaseScraper:
     """基礎爬蟲類別，提供 robots.txt 檢查與 rate limiting"""
     
@@ -23,16 +42,19 @@ class BaseScraper:
         )
         self.user_agent = "HardwareBenchmarkBot/1.0 (+https://github.com/your-repo)"
         self.client: Optional[httpx.AsyncClient] = None
+        # 指定時改用共用的 RateLimiter（例如背景 worker 使用 global_rate_limiter）
+        self.rate_limiter: Optional[RateLimiter] = None
         
     async def initialize(self):
-        """初始化 HTTP 客戶端與 robots.txt"""
-        self.client = httpx.AsyncClient(
-            timeout=30.0,
-            headers={"User-Agent": self.user_agent},
-            follow_redirects=True
-        )
+        """初始化 HTTP 客戶端與 robots.txt（重複呼叫會沿用既有 client，避免連線洩漏）"""
+        if self.client is None or self.client.is_closed:
+            self.client = httpx.AsyncClient(
+                timeout=30.0,
+                headers={"User-Agent": self.user_agent},
+                follow_redirects=True
+            )
         
-        if self.base_url:
+        if self.base_url and self.robots_parser is None:
             await self._load_robots_txt()
     
     async def _load_robots_txt(self):
@@ -55,6 +77,9 @@ class BaseScraper:
     
     async def _rate_limit(self):
         """實作 rate limiting"""
+        if self.rate_limiter is not None:
+            await self.rate_limiter.wait()
+            return
         current_time = time.time()
         time_since_last = current_time - self.last_request_time
         
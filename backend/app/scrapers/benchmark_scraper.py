@@ -14,17 +14,24 @@ import hashlib
 from pathlib import Path
 
 # Hardware performance overrides loader (optional JSON file)
+# 檔案 mtime 改變時重新載入（相依的快取資料由 dependency_tracker 失效）
 _hw_overrides_cache: Optional[Dict[str, Dict[str, float]]] = None
+_hw_overrides_mtime: Optional[float] = None
+_HW_OVERRIDES_PATH = Path(__file__).resolve().parents[2] / "data" / "hw_performance_override.json"
 
 def _load_hw_overrides() -> Dict[str, Dict[str, float]]:
-    global _hw_overrides_cache
-    if _hw_overrides_cache is not None:
+    global _hw_overrides_cache, _hw_overrides_mtime
+    try:
+        mtime: Optional[float] = _HW_OVERRIDES_PATH.stat().st_mtime
+    except OSError:
+        mtime = None
+    if _hw_overrides_cache is not None and mtime == _hw_overrides_mtime:
         return _hw_overrides_cache
+
+    _hw_overrides_mtime = mtime
     try:
-        base = Path(__file__).resolve().parents[2]
-        p = base / "data" / "hw_performance_override.json"
-        if p.exists():
-            _hw_overrides_cache = json.loads(p.read_text(encoding="utf-8") or "{}")
+        if mtime is not None:
+            _hw_overrides_cache = json.loads(_HW_OVERRIDES_PATH.read_text(encoding="utf-8") or "{}")
         else:
             _hw_overrides_cache = {}
     except Exception:
@@ -33,15 +40,276 @@ def _load_hw_overrides() -> Dict[str, Dict[str, float]]:
 
 from app.scrapers.base_scraper import BaseScraper
 from app.data.game_requirements import GAME_REQUIREMENTS_25
-from app.db import benchmark_store, benchmark_store_v2
+from app.db import benchmark_store, benchmark_store_v2, enrichment_queue
+from app.services.api_budget import PRIORITY_INTERACTIVE, BudgetExhausted
 from app.services.google_fps_search import GoogleFpsSearchService
+from app.services.hardware_identity import IdentityTable, hardware_identity
+from app.services.benchmark_record import TIER_PREDICTED, BenchmarkRecord
+from app.services.query_spec import QuerySpec, Resolution, parse_resolution
+from app.services.request_budget import Deadline, DeadlineExceeded
+from app.services.enrichment import enqueue_enrichment
+
+
+# 效能評分表（相對於 RTX 3060 / 中階 CPU 的倍數），以 hardware_identity 的 canonical id 比對
+_GPU_SCORES: Dict[str, float] = {
+    # NVIDIA RTX 50-series (Ada Lovelace)
+    "RTX 5090": 2.60,
+    "RTX 5080": 2.40,
+    "RTX 5070 Ti": 2.20,
+    "RTX 5070": 2.05,
+    "RTX 5060 Ti": 1.80,
+    "RTX 5060": 1.60,
+    "RTX 5050": 1.40,
+
+    # NVIDIA RTX 40-series (Ada Lovelace)
+    "RTX 4090": 2.50,
+    "RTX 4080 SUPER": 2.25,
+    "RTX 4080": 2.20,
+    "RTX 4070 Ti SUPER": 2.10,
+    "RTX 4070 Ti": 2.05,
+    "RTX 4070 SUPER": 1.95,
+    "RTX 4070": 1.90,
+    "RTX 4060 Ti 16GB": 1.70,
+    "RTX 4060 Ti": 1.65,
+    "RTX 4060": 1.45,
+
+    # NVIDIA RTX 30-series (Ampere)
+    "RTX 3090 Ti": 2.30,
+    "RTX 3090": 2.25,
+    "RTX 3080 Ti": 2.10,
+    "RTX 3080 12GB": 2.05,
+    "RTX 3080": 2.00,
+    "RTX 3070 Ti": 1.85,
+    "RTX 3070": 1.75,
+    "RTX 3060 Ti": 1.50,
+    "RTX 3060": 1.40,
+    "RTX 3050": 1.10,
+
+    # NVIDIA RTX 20-series (Turing)
+    "RTX 2080 Ti": 1.80,
+    "RTX 2080 SUPER": 1.65,
+    "RTX 2080": 1.60,
+    "RTX 2070 SUPER": 1.45,
+    "RTX 2070": 1.40,
+    "RTX 2060 SUPER": 1.25,
+    "RTX 2060": 1.20,
+
+    # NVIDIA GTX 16-series (Turing)
+    "GTX 1660 Ti": 1.15,
+    "GTX 1660 Super": 1.10,
+    "GTX 1660": 1.05,
+    "GTX 1650 Super": 0.90,
+    "GTX 1650": 0.85,
+
+    # NVIDIA GTX 10-series (Pascal)
+    "GTX 1080 Ti": 1.50,
+    "GTX 1080": 1.40,
+    "GTX 1070 Ti": 1.30,
+    "GTX 1070": 1.25,
+    "GTX 1060 6GB": 1.05,
+    "GTX 1060 3GB": 0.95,
+    "GTX 1050 Ti": 0.85,
+    "GTX 1050": 0.75,
+    "GTX 1030": 0.55,
+
+    # AMD RX 7000-series (RDNA 3)
+    "RX 7900 XTX": 2.35,
+    "RX 7900 XT": 2.25,
+    "RX 7900 GRE": 2.20,
+    "RX 7800 XT": 2.10,
+    "RX 7700 XT": 1.90,
+    "RX 7600 XT": 1.60,
+    "RX 7600": 1.45,
+
+    # AMD RX 6000-series (RDNA 2)
+    "RX 6950 XT": 2.15,
+    "RX 6900 XT": 2.05,
+    "RX 6800 XT": 1.85,
+    "RX 6800": 1.75,
+    "RX 6750 XT": 1.65,
+    "RX 6700 XT": 1.55,
+    "RX 6650 XT": 1.35,
+    "RX 6600 XT": 1.25,
+    "RX 6600": 1.15,
+    "RX 6500 XT": 1.05,
+    "RX 6400": 0.85,
+
+    # AMD RX 5000-series (RDNA)
+    "RX 5700 XT": 1.70,
+    "RX 5700": 1.60,
+    "RX 5600 XT": 1.45,
+    "RX 5500 XT": 1.30,
+
+    # AMD RX 400/500-series (GCN)
+    "RX 580": 1.20,
+    "RX 570": 1.15,
+    "RX 560": 1.05,
+    "RX 480": 1.25,
+    "RX 470": 1.20,
+
+    # AMD Vega series
+    "Radeon VII": 1.85,
+    "RX Vega 64": 1.40,
+    "RX Vega 56": 1.30,
+
+    # Intel Arc series
+    "Arc A770": 1.75,
+    "Arc A750": 1.45,
+    "Arc A580": 1.35,
+    "Arc A380": 1.20,
+    "Arc A310": 1.05,
+
+    # Integrated graphics
+    "Integrated Intel UHD": 0.70,
+}
+
+_CPU_SCORES: Dict[str, float] = {
+    # Intel Ultra series (Meteor Lake)
+    "Intel Core Ultra 9 285K": 2.5, "Intel Core Ultra 9 285": 2.4,
+    "Intel Core Ultra 7 265K": 2.3, "Intel Core Ultra 7 265": 2.2,
+    "Intel Core Ultra 5 245K": 2.1, "Intel Core Ultra 5 245": 2.0,
+
+    # Intel 14th Gen (Raptor Lake Refresh)
+    "i9-14900K": 2.4, "i9-14900KF": 2.4, "i9-14900": 2.35, "i9-14900F": 2.35,
+    "i7-14700K": 2.2, "i7-14700KF": 2.2, "i7-14700": 2.15, "i7-14700F": 2.15,
+    "i5-14600K": 2.0, "i5-14600KF": 2.0, "i5-14600": 1.95, "i5-14600F": 1.95,
+    "i5-14400": 1.85, "i5-14400F": 1.85,
+
+    # Intel 13th Gen (Raptor Lake)
+    "i9-13900K": 2.35, "i9-13900KF": 2.35, "i9-13900": 2.3, "i9-13900F": 2.3,
+    "i7-13700K": 2.1, "i7-13700KF": 2.1, "i7-13700": 2.05, "i7-13700F": 2.05,
+    "i5-13600K": 1.9, "i5-13600KF": 1.9, "i5-13600": 1.85, "i5-13600F": 1.85,
+    "i5-13500": 1.8, "i5-13500F": 1.8, "i5-13400": 1.75, "i5-13400F": 1.75,
+
+    # Intel 12th Gen (Alder Lake)
+    "i9-12900K": 2.1, "i9-12900KF": 2.1, "i9-12900": 2.05, "i9-12900F": 2.05,
+    "i7-12700K": 1.95, "i7-12700KF": 1.95, "i7-12700": 1.9, "i7-12700F": 1.9,
+    "i5-12600K": 1.7, "i5-12600KF": 1.7, "i5-12600": 1.65, "i5-12600F": 1.65,
+    "i5-12500": 1.6, "i5-12500F": 1.6, "i5-12400": 1.55, "i5-12400F": 1.55,
+
+    # Intel 11th Gen (Rocket Lake)
+    "i9-11900K": 1.8, "i9-11900KF": 1.8, "i9-11900": 1.75, "i9-11900F": 1.75,
+    "i7-11700K": 1.7, "i7-11700KF": 1.7, "i7-11700": 1.65, "i7-11700F": 1.65,
+    "i5-11600K": 1.5, "i5-11600KF": 1.5, "i5-11600": 1.45, "i5-11600F": 1.45,
+    "i5-11500": 1.4, "i5-11500F": 1.4, "i5-11400": 1.35, "i5-11400F": 1.35,
+
+    # Intel 10th Gen (Comet Lake)
+    "i9-10900K": 1.65, "i9-10900KF": 1.65, "i9-10900": 1.6, "i9-10900F": 1.6,
+    "i7-10700K": 1.55, "i7-10700KF": 1.55, "i7-10700": 1.5, "i7-10700F": 1.5,
+    "i5-10600K": 1.35, "i5-10600KF": 1.35, "i5-10600": 1.3, "i5-10600F": 1.3,
+    "i5-10500": 1.25, "i5-10500F": 1.25, "i5-10400": 1.2, "i5-10400F": 1.2,
+
+    # Intel 9th Gen (Coffee Lake Refresh)
+    "i9-9900K": 1.45, "i9-9900KF": 1.45, "i9-9900": 1.4, "i9-9900F": 1.4,
+    "i7-9700K": 1.35, "i7-9700KF": 1.35, "i7-9700": 1.3, "i7-9700F": 1.3,
+    "i5-9600K": 1.2, "i5-9600KF": 1.2, "i5-9600": 1.15, "i5-9600F": 1.15,
+    "i5-9500": 1.1, "i5-9500F": 1.1, "i5-9400": 1.05, "i5-9400F": 1.05,
+
+    # Intel 8th Gen (Coffee Lake)
+    "i7-8700K": 1.25, "i7-8700": 1.2, "i5-8600K": 1.1, "i5-8600": 1.05,
+    "i5-8500": 1.0, "i5-8400": 0.95, "i3-8350K": 0.9, "i3-8100": 0.85,
+
+    # Intel 7th Gen (Kaby Lake)
+    "i7-7700K": 1.15, "i7-7700": 1.1, "i5-7600K": 1.0, "i5-7600": 0.95,
+    "i5-7500": 0.9, "i5-7400": 0.85, "i3-7350K": 0.8, "i3-7300": 0.75, "i3-7100": 0.7,
+
+    # AMD Ryzen 9000 series (Zen 5)
+    "Ryzen 9 9950X": 2.23, "Ryzen 9 9950X3D": 2.25, "Ryzen 9 9900X": 2.1, "Ryzen 9 9900X3D": 2.15,
+    "Ryzen 7 9700X": 1.95, "Ryzen 7 9700X3D": 2.0, "Ryzen 5 9600X": 1.8, "Ryzen 5 9600X3D": 1.85,
+
+    # AMD Ryzen 8000/7000 series (Zen 4)
+    "Ryzen 9 7950X": 2.05, "Ryzen 9 7950X3D": 2.1, "Ryzen 9 7900X": 1.95, "Ryzen 9 7900X3D": 2.0,
+    "Ryzen 9 7900": 1.9, "Ryzen 7 7800X3D": 1.85, "Ryzen 7 7700X": 1.75, "Ryzen 7 7700X3D": 1.8,
+    "Ryzen 7 7700": 1.7, "Ryzen 5 7600X": 1.6, "Ryzen 5 7600X3D": 1.65, "Ryzen 5 7600": 1.55,
+
+    # AMD Ryzen 5000 series (Zen 3)
+    "Ryzen 9 5950X": 1.85, "Ryzen 9 5900X": 1.8, "Ryzen 9 5900": 1.75,
+    "Ryzen 7 5800X3D": 1.75, "Ryzen 7 5800X": 1.65, "Ryzen 7 5800": 1.6,
+    "Ryzen 5 5600X": 1.4, "Ryzen 5 5600X3D": 1.45, "Ryzen 5 5600": 1.35,
+
+    # AMD Ryzen 3000 series (Zen 2)
+    "Ryzen 9 3900X": 1.5, "Ryzen 9 3900": 1.45, "Ryzen 9 3950X": 1.55,
+    "Ryzen 7 3800X": 1.4, "Ryzen 7 3800XT": 1.4, "Ryzen 7 3800": 1.35,
+    "Ryzen 7 3700X": 1.35, "Ryzen 7 3700": 1.3, "Ryzen 5 3600X": 1.2,
+    "Ryzen 5 3600XT": 1.2, "Ryzen 5 3600": 1.15, "Ryzen 5 3500X": 1.1,
+    "Ryzen 5 3400G": 1.05, "Ryzen 3 3300X": 1.0, "Ryzen 3 3200G": 0.95, "Ryzen 3 3100": 0.9,
+
+    # AMD Ryzen 2000 series (Zen+)
+    "Ryzen 7 2700X": 1.15, "Ryzen 7 2700": 1.1, "Ryzen 5 2600X": 1.05, "Ryzen 5 2600": 1.0,
+    "Ryzen 5 2500X": 0.95, "Ryzen 5 2400G": 0.9, "Ryzen 3 2300X": 0.85, "Ryzen 3 2200G": 0.85,
+
+    # AMD Ryzen 1000 series (Zen)
+    "Ryzen 7 1800X": 1.0, "Ryzen 7 1700X": 0.95, "Ryzen 7 1700": 0.9,
+    "Ryzen 5 1600X": 0.9, "Ryzen 5 1600": 0.85, "Ryzen 5 1500X": 0.8,
+    "Ryzen 5 1400": 0.75, "Ryzen 3 1300X": 0.7, "Ryzen 3 1200": 0.65,
+}
+
+_score_tables: Dict[str, IdentityTable] = {}
+# override 檔重新載入（內容 dict 換了）時才重建
+_override_tables: Dict[str, Tuple[Dict[str, Any], IdentityTable]] = {}
+
+
+def _score_table(kind: str) -> IdentityTable:
+    table = _score_tables.get(kind)
+    if table is None:
+        table = IdentityTable((_GPU_SCORES if kind == "gpus" else _CPU_SCORES).items())
+        _score_tables[kind] = table
+    return table
+
+
+def _override_table(kind: str) -> IdentityTable:
+    overrides = _load_hw_overrides()
+    cached = _override_tables.get(kind)
+    if cached is not None and cached[0] is overrides:
+        return cached[1]
+    table = IdentityTable((overrides.get(kind) or {}).items())
+    _override_tables[kind] = (overrides, table)
+    return table
+
+
+# 解析度 → FPS 倍數（1080p = 1.0；無法辨識的解析度比照 1080p）
+_RES_MULT_DEFAULT: Dict[Optional[Resolution], float] = {
+    Resolution.R720: 2.0,
+    Resolution.R1080: 1.0,
+    Resolution.R1440: 0.65,
+    Resolution.R2160: 0.25,
+}
+# 電競/CPU-bound：解析度影響較小（4K 0.60 對齊實測）
+_RES_MULT_ESPORTS: Dict[Optional[Resolution], float] = {
+    Resolution.R720: 1.25,
+    Resolution.R1080: 1.0,
+    Resolution.R1440: 0.85,
+    Resolution.R2160: 0.60,
+}
+_RES_MULT_SIM: Dict[Optional[Resolution], float] = {
+    Resolution.R720: 1.35,
+    Resolution.R1080: 1.0,
+    Resolution.R1440: 0.78,
+    Resolution.R2160: 0.38,
+}
+# 超重 3A：4K 的掉幅不要壓得比實際還低（否則 RT 時會不合理）
+_RES_MULT_HEAVY: Dict[Optional[Resolution], float] = {
+    Resolution.R720: 1.8,
+    Resolution.R1080: 1.0,
+    Resolution.R1440: 0.60,
+    Resolution.R2160: 0.40,
+}
+
+
+# _parse_fps_data 用：avg / 1% low / 0.1% low 合併成單一 pattern（0.1% 必須排在 1% 之前）
+_FPS_STAT_RE = re.compile(
+    r"0\.1%[:\s]+low[:\s]+(?P<p0_1_low>\d+\.?\d*)"
+    r"|1%[:\s]+low[:\s]+(?P<p1_low>\d+\.?\d*)"
+    r"|avg[:\s]+(?P<avg_fps>\d+\.?\d*)",
+    re.IGNORECASE,
+)
 
 
 class BenchmarkScraper(BaseScraper):
     """基準測試資料爬蟲"""
 
     # 預測模型版本：用於 v2 cache 的「Predicted Model」自動升級/覆蓋
-    MODEL_VERSION = 4
+    MODEL_VERSION = 7
     # v2 GPU-base 預測採用的 reference CPU（後續再依使用者 CPU 做調整）
     CPU_REF_MODEL = "Intel Core i5-12600K"
 
@@ -51,21 +319,28 @@ class BenchmarkScraper(BaseScraper):
         self.source_name = "Real Benchmark Database"
         self.last_fetch_time: Optional[str] = None
         self.benchmark_db, self.gpu_meta = self._load_seed_database()
+        self._setting_tables: Dict[Tuple[str, str, str], IdentityTable] = {}
+        # 網路層模式：inline（在請求內查詢，受延遲預算限制）/ background（只交給背景 enrichment 佇列）
+        self.web_tier_inline = os.getenv("BENCHMARK_WEB_TIER", "inline").strip().lower() != "background"
+        # 付費搜尋 API 額度的優先等級（背景 enrichment / 預熱工具會改成較低等級）
+        self.api_priority = PRIORITY_INTERACTIVE
     
     async def search_benchmarks(
         self,
         game: str,
         resolution: str,
         settings: Optional[str],
-        hardware_list: List[dict]
-    ) -> List[dict]:
+        hardware_list: List[dict],
+        deadline: Optional[Deadline] = None,
+    ) -> List[BenchmarkRecord]:
         """
         搜尋基準測試資料
         從網路即時抓取，不使用內建靜態資料
+        deadline：整個請求的延遲預算，用盡時網路階段會被跳過並降級為預測模型
         """
         await self.initialize()
         
-        results: List[dict] = []
+        results: List[BenchmarkRecord] = []
 
         gpus = [h for h in (hardware_list or []) if (h or {}).get("category") == "gpu"]
         cpus = [h for h in (hardware_list or []) if (h or {}).get("category") == "cpu"]
@@ -85,6 +360,9 @@ class BenchmarkScraper(BaseScraper):
         ram_latency_ns = ram_specs.get("ram_latency_ns")
         storage_type = storages[0].get("storage_type") if storages else None
 
+        # game / resolution / settings 只解析一次，所有 GPU×CPU 組合共用
+        spec = QuerySpec.build(game, resolution, settings)
+
         for gpu in gpus:
             for cpu in cpus:
                 try:
@@ -99,6 +377,8 @@ class BenchmarkScraper(BaseScraper):
                         ram_speed_mhz=ram_speed_mhz,
                         ram_latency_ns=ram_latency_ns,
                         storage_type=storage_type,
+                        deadline=deadline,
+                        spec=spec,
                     )
                     if benchmark:
                         results.append(benchmark)
@@ -125,12 +405,23 @@ class BenchmarkScraper(BaseScraper):
                 model = str(it.get("model") or "").strip()
                 if not model:
                     continue
-                gpu_meta[model.lower()] = it
+                gpu_meta.setdefault(hardware_identity.resolve(model), it)
             return benchmarks, gpu_meta
         except Exception as e:
             print(f"載入 seed 資料庫失敗: {e}")
             return {}, {}
 
+    def _setting_gpu_table(
+        self, game: str, resolution: str, quality_setting: str, setting_data: Dict[str, Any]
+    ) -> IdentityTable:
+        """seed 某遊戲/解析度/畫質的 GPU 列表 → IdentityTable（值為 seed 中的原始型號名稱）"""
+        key = (game, resolution, quality_setting)
+        table = self._setting_tables.get(key)
+        if table is None:
+            table = IdentityTable((name, name) for name in setting_data)
+            self._setting_tables[key] = table
+        return table
+
     async def _fetch_benchmark_combo(
         self,
         game: str,
@@ -143,18 +434,39 @@ class BenchmarkScraper(BaseScraper):
         ram_speed_mhz: Optional[int] = None,
         ram_latency_ns: Optional[float] = None,
         storage_type: Optional[str] = None,
-    ) -> Optional[dict]:
+        deadline: Optional[Deadline] = None,
+        spec: Optional[QuerySpec] = None,
+    ) -> Optional[BenchmarkRecord]:
         """抓取單一 GPU×CPU 組合的基準測試資料"""
 
+        spec = spec or QuerySpec.build(game, resolution, settings)
         gpu_model = gpu.get("model") or "Unknown GPU"
         cpu_model = cpu.get("model") or "Unknown CPU"
-        effective_settings = (settings or "High").strip() or "High"
+        effective_settings = spec.settings
+
+        def predict(cpu_for_model: str) -> BenchmarkRecord:
+            return BenchmarkRecord.from_payload(self._generate_mock_data(
+                game=game,
+                resolution=resolution,
+                gpu={"category": "gpu", "model": gpu_model, "selected_vram_gb": gpu.get("selected_vram_gb")},
+                cpu={"category": "cpu", "model": cpu_for_model},
+                settings=effective_settings,
+                ram_gb=ram_gb,
+                ram_type=ram_type,
+                ram_speed_mhz=ram_speed_mhz,
+                ram_latency_ns=ram_latency_ns,
+                storage_type=storage_type,
+                spec=spec,
+            ))
 
         # 0) 先查本地快取資料庫 v1（含 CPU）
         # 如果有RAM參數，跳過快取檢查以確保正確應用RAM影響
         skip_cache = ram_gb is not None or ram_type is not None or ram_speed_mhz is not None or ram_latency_ns is not None
         cached = None
+        cached_v2 = None
+        rec: Optional[BenchmarkRecord] = None
         if not skip_cache:
+            # 本地快取讀取很便宜，不受請求預算限制（預算只約束網路階段）
             cached = await benchmark_store.get(game, resolution, effective_settings, gpu_model, cpu_model)
 
         if cached and cached.get("avg_fps") is not None:
@@ -163,102 +475,50 @@ class BenchmarkScraper(BaseScraper):
             raw_snip = str((cached or {}).get("raw_snippet") or "")
 
             # 1) 若 v1 存的是 Predicted Model，且版本過舊 → 直接重算
-            if cached_src == "Predicted Model" and mv != self.MODEL_VERSION:
-                fps_data = self._generate_mock_data(
-                    game=game,
-                    resolution=resolution,
-                    gpu={"category": "gpu", "model": gpu_model, "selected_vram_gb": gpu.get("selected_vram_gb")},
-                    cpu={"category": "cpu", "model": cpu_model},
-                    settings=effective_settings,
-                    ram_gb=ram_gb,
-                    ram_type=ram_type,
-                    ram_speed_mhz=ram_speed_mhz,
-                    ram_latency_ns=ram_latency_ns,
-                    storage_type=storage_type,
-                )
-            else:
-                # 1.5) 舊版 predicted 有時會被寫成 Local Benchmark Cache（source 變了但 raw_snippet 還會露出）
-                looks_predicted = ("基於真實基準預測" in raw_snip) or (cached_src == "Predicted Model")
-                if looks_predicted and mv != self.MODEL_VERSION:
-                    fps_data = self._generate_mock_data(
-                        game=game,
-                        resolution=resolution,
-                        gpu={"category": "gpu", "model": gpu_model, "selected_vram_gb": gpu.get("selected_vram_gb")},
-                        cpu={"category": "cpu", "model": cpu_model},
-                        settings=effective_settings,
-                        ram_gb=ram_gb,
-                        ram_type=ram_type,
-                        ram_speed_mhz=ram_speed_mhz,
-                        ram_latency_ns=ram_latency_ns,
-                        storage_type=storage_type,
-                    )
-                else:
-                    # 2) 對於重負載/RT 這類「對設定超敏感」的情境：若舊 cache 明顯偏離現行模型，就刷新
-                    st_lower = effective_settings.lower()
-                    wants_rt = any(k in st_lower for k in ["ray tracing", "raytracing", "path tracing", "pathtracing", " rt", "rt ", "光追", "光線追蹤", "路徑追蹤"])
-                    is_sensitive = self._is_ultra_heavy_aaa(game) or wants_rt
-                    if is_sensitive:
-                        predicted = self._generate_mock_data(
+            # 1.5) 舊版 predicted 有時會被寫成 Local Benchmark Cache（source 變了但 raw_snippet 還會露出）
+            looks_predicted = ("基於真實基準預測" in raw_snip) or (cached_src == "Predicted Model")
+            if looks_predicted and mv != self.MODEL_VERSION:
+                rec = predict(cpu_model)
+            elif spec.ultra_heavy or spec.rt:
+                # 2) 對於重負載/RT 這類「對設定超敏感」的情境：若舊 cache 明顯偏離現行模型，就刷新
+                predicted = predict(cpu_model)
+                try:
+                    cached_avg = float((cached or {}).get("avg_fps"))
+                    pred_avg = float(predicted.avg_fps or 0.0)
+                    if pred_avg > 0:
+                        delta = abs(cached_avg - pred_avg) / max(1.0, pred_avg)
+                    else:
+                        delta = 0.0
+                except Exception:
+                    delta = 0.0
+
+                # 重負載/RT 情境比一般更敏感：刷新門檻更低，避免舊 cache（或先前 bug）殘留
+                # - RT：最敏感
+                # - 超重 3A：也容易因模型校正而差異明顯
+                threshold = 0.15 if spec.rt else (0.20 if spec.ultra_heavy else 0.35)
+
+                # 若差異很大，採用現行模型並覆寫 v1（避免下次又被舊 cache 命中）
+                if delta > threshold:
+                    rec = predicted
+                    try:
+                        await benchmark_store.upsert(
                             game=game,
                             resolution=resolution,
-                            gpu={"category": "gpu", "model": gpu_model, "selected_vram_gb": gpu.get("selected_vram_gb")},
-                            cpu={"category": "cpu", "model": cpu_model},
                             settings=effective_settings,
-                            ram_gb=ram_gb,
-                            ram_type=ram_type,
-                            ram_speed_mhz=ram_speed_mhz,
-                            ram_latency_ns=ram_latency_ns,
-                            storage_type=storage_type,
+                            gpu=gpu_model,
+                            cpu=cpu_model,
+                            value={**rec.to_payload(), "confidence_override": None, "model_version": self.MODEL_VERSION},
                         )
-                        try:
-                            cached_avg = float((cached or {}).get("avg_fps"))
-                            pred_avg = float(predicted.get("avg_fps") or 0.0)
-                            if pred_avg > 0:
-                                delta = abs(cached_avg - pred_avg) / max(1.0, pred_avg)
-                            else:
-                                delta = 0.0
-                        except Exception:
-                            delta = 0.0
-
-                        # 重負載/RT 情境比一般更敏感：刷新門檻更低，避免舊 cache（或先前 bug）殘留
-                        # - RT：最敏感
-                        # - 超重 3A：也容易因模型校正而差異明顯
-                        threshold = 0.15 if wants_rt else (0.20 if self._is_ultra_heavy_aaa(game) else 0.35)
-
-                        # 若差異很大，採用現行模型並覆寫 v1（避免下次又被舊 cache 命中）
-                        if delta > threshold:
-                            fps_data = predicted
-                            try:
-                                await benchmark_store.upsert(
-                                    game=game,
-                                    resolution=resolution,
-                                    settings=effective_settings,
-                                    gpu=gpu_model,
-                                    cpu=cpu_model,
-                                    value={
-                                        "avg_fps": fps_data.get("avg_fps"),
-                                        "p1_low": fps_data.get("p1_low"),
-                                        "p0_1_low": fps_data.get("p0_1_low"),
-                                        "notes": fps_data.get("notes"),
-                                        "raw_snippet": fps_data.get("raw_snippet"),
-                                        "source": "Predicted Model",
-                                "model_version": self.MODEL_VERSION,
-                                "ram_gb": fps_data.get("ram_gb"),
-                                "storage_type": fps_data.get("storage_type"),
-                                    },
-                                )
-                            except Exception:
-                                pass
-                        else:
-                            fps_data = {**cached, "source": "Local Benchmark Cache"}
-                    else:
-                        # 3) 一般情境：照常使用 v1 cache
-                        fps_data = {**cached, "source": "Local Benchmark Cache", "ram_gb": ram_gb, "storage_type": storage_type}
-                        fps_data = {**cached, "source": "Local Benchmark Cache", "ram_gb": ram_gb, "storage_type": storage_type}
+                    except Exception:
+                        pass
+                else:
+                    rec = BenchmarkRecord.from_payload(cached, source="Local Benchmark Cache")
+            else:
+                # 3) 一般情境：照常使用 v1 cache
+                rec = BenchmarkRecord.from_payload(cached, source="Local Benchmark Cache")
         else:
             # 0.5) 再查 v2（GPU-base）
             # 如果有RAM參數，跳過v2快取檢查以確保正確應用RAM影響
-            cached_v2 = None
             if not skip_cache:
                 cached_v2 = await benchmark_store_v2.get(game, resolution, effective_settings, gpu_model)
 
@@ -275,99 +535,85 @@ class BenchmarkScraper(BaseScraper):
 
                 if must_refresh:
                     try:
-                        refreshed = self._generate_mock_data(
-                            game=game,
-                            resolution=resolution,
-                            gpu={
-                                "category": "gpu",
-                                "model": gpu_model,
-                                "selected_vram_gb": gpu.get("selected_vram_gb"),
-                            },
-                            cpu={"category": "cpu", "model": self.CPU_REF_MODEL},
-                            settings=effective_settings,
-                            ram_gb=ram_gb,
-                            ram_type=ram_type,
-                            ram_speed_mhz=ram_speed_mhz,
-                            ram_latency_ns=ram_latency_ns,
-                            storage_type=storage_type,
-                        )
+                        refreshed = predict(self.CPU_REF_MODEL)
                         await benchmark_store_v2.upsert(
                             game=game,
                             resolution=resolution,
                             settings=effective_settings,
                             gpu=gpu_model,
-                            value={
-                                "avg_fps": refreshed.get("avg_fps"),
-                                "p1_low": refreshed.get("p1_low"),
-                                "p0_1_low": refreshed.get("p0_1_low"),
-                                "notes": refreshed.get("notes"),
-                                "raw_snippet": refreshed.get("raw_snippet"),
-                                "source": "Predicted Model",
-                                "cpu_ref": "i5-12600K",
-                                "model_version": self.MODEL_VERSION,
-                            },
+                            value=self._v2_value(refreshed),
                         )
                         cached_v2 = await benchmark_store_v2.get(game, resolution, effective_settings, gpu_model) or cached_v2
                     except Exception:
                         pass
 
-                fps_data = {
-                    **cached_v2,
-                    "game": game,
-                    "resolution": resolution,
-                    "settings": effective_settings,
-                    "gpu": gpu_model,
-                    "cpu": cpu_model,
-                    "source": "Local Benchmark Cache (GPU-base)",
-                }
-                fps_data = self._apply_cpu_adjustment(
-                    fps_data=fps_data,
-                    game=game,
-                    cpu_model=cpu_model,
-                )
+                rec = BenchmarkRecord.from_payload(cached_v2, source="Local Benchmark Cache (GPU-base)")
+                rec.gpu = gpu_model
+                rec.resolution = resolution
+                rec.settings = effective_settings
+                self._adjust_record_for_cpu(rec, game=game, cpu_model=cpu_model, spec=spec)
             else:
                 # 1) seed 真實/插值
-                fps_data = self._query_real_benchmark_data(game, resolution, settings, gpu, cpu)
+                seed = self._query_real_benchmark_data(game, resolution, settings, gpu, cpu)
+                if seed:
+                    rec = BenchmarkRecord.from_payload(seed)
 
         # 1.5) 若使用者明確指定 RT/PT，對所有來源套用額外懲罰（不是所有遊戲都有，僅在 settings 明確表示時生效）
-        try:
-            fps_data = self._apply_rt_adjustment(fps_data=fps_data, game=game, settings=effective_settings)
-        except Exception:
-            pass
+        if rec is not None:
+            try:
+                self._apply_rt_adjustment(rec, game=game, settings=effective_settings, spec=spec)
+            except Exception:
+                pass
 
         # 2) 如果本地資料庫沒有資料，嘗試從網路抓取（優先 Google snippet，其次站點爬蟲）
+        # 網路階段只能在請求預算內進行；逾時則降級為預測並排入背景 enrichment
         web_note: Optional[str] = None
-        if not fps_data or not fps_data.get("avg_fps"):
-            web_try = await self._try_multiple_sources(game, resolution, effective_settings, gpu, cpu)
+        is_degraded = False
+        web_attempted = False
+        if (rec is None or not rec.avg_fps) and self.web_tier_inline:
+            web_attempted = True
+            web_coro = self._try_multiple_sources(game, resolution, effective_settings, gpu, cpu, deadline=deadline)
+            try:
+                web_try = await (deadline.run(web_coro) if deadline is not None else web_coro)
+            except DeadlineExceeded:
+                web_try = None
+                is_degraded = True
+            if web_try and web_try.get("deadline_exceeded") and not web_try.get("avg_fps"):
+                # 網路階段因預算用盡而提前停止（不是真的查無資料）
+                is_degraded = True
             web_note = (web_try or {}).get("notes")
             if web_try and web_try.get("avg_fps"):
-                fps_data = web_try
+                rec = BenchmarkRecord.from_payload(web_try)
 
         # 3) 如果網路也抓取不到，使用預測（最後手段）
-        if not fps_data or not fps_data.get("avg_fps"):
-            fps_data = self._generate_mock_data(game, resolution, gpu, cpu, settings=effective_settings, ram_gb=ram_gb, ram_type=ram_type, ram_speed_mhz=ram_speed_mhz, ram_latency_ns=ram_latency_ns, storage_type=storage_type)
+        if rec is None or not rec.avg_fps:
+            rec = predict(cpu_model)
+            if is_degraded:
+                web_note = "網路來源超出請求時間預算，暫以預測模型回應（已排入背景更新）"
             if web_note:
-                fps_data["notes"] = (str(fps_data.get("notes") or "") + ("；" if fps_data.get("notes") else "") + str(web_note)).strip()
+                rec.remarks.append(str(web_note))
 
-        if not fps_data:
-            return None
+        # 結果一律對應這次的請求（RAM/儲存規格以請求為準）
+        rec.game = game
+        rec.resolution = resolution
+        rec.settings = effective_settings
+        rec.gpu = gpu_model
+        rec.cpu = cpu_model
+        rec.ram_gb, rec.ram_type, rec.ram_speed_mhz, rec.ram_latency_ns = ram_gb, ram_type, ram_speed_mhz, ram_latency_ns
+        rec.storage_type = storage_type
 
         # 4) 補齊欄位（避免瓶頸分析顯示「資料不足」）
-        fps_data = self._ensure_benchmark_completeness(
-            fps_data=fps_data,
-            game=game,
-            resolution=resolution,
-            settings=effective_settings,
-            gpu_model=gpu_model,
-            cpu_model=cpu_model,
-        )
+        self._ensure_benchmark_completeness(rec, spec=spec)
 
         # 5) 若不是 Predicted，就寫回 v1 快取（含 CPU）
+        # 降級的預測只是暫時回應：不寫入 v1/v2，避免覆蓋既有的真實數據（由背景 enrichment 補上）
         try:
-            src = str(fps_data.get("source") or "")
+            src = rec.source
+            if is_degraded:
+                src = None
             # v1 是「含 CPU」的最終結果快取，但不應把 GPU-base（已調整 CPU）再寫回，
             # 否則會用舊資料覆蓋新算法，且容易造成 notes 疊加與瓶頸判定不穩定。
-            if fps_data.get("avg_fps") is not None and src in (
+            if rec.avg_fps is not None and src in (
                 "Real Benchmark Database",
                 "Real Benchmark Database (scaled)",
                 "GoogleSearchSnippet",
@@ -383,26 +629,14 @@ class BenchmarkScraper(BaseScraper):
                     settings=effective_settings,
                     gpu=gpu_model,
                     cpu=cpu_model,
-                    value={
-                        "avg_fps": fps_data.get("avg_fps"),
-                        "p1_low": fps_data.get("p1_low"),
-                        "p0_1_low": fps_data.get("p0_1_low"),
-                        "notes": fps_data.get("notes"),
-                        "raw_snippet": fps_data.get("raw_snippet"),
-                        "source": "Predicted Model" if src == "Predicted Model" else fps_data.get("source"),
-                        "confidence_override": fps_data.get("confidence_override"),
-                        "model_version": self.MODEL_VERSION if src == "Predicted Model" else None,
-                        "ram_gb": fps_data.get("ram_gb"),
-                        "storage_type": fps_data.get("storage_type"),
-                    },
+                    value={**rec.to_payload(), "model_version": self.MODEL_VERSION if src == "Predicted Model" else None},
                 )
         except Exception as e:
             print(f"寫入本地 benchmarks_cache 失敗: {e}")
 
         # 6) 同步寫入 v2（GPU-base）
         try:
-            src = str(fps_data.get("source") or "")
-            if fps_data.get("avg_fps") is not None and src in (
+            if not is_degraded and rec.avg_fps is not None and rec.source in (
                 "Real Benchmark Database",
                 "Real Benchmark Database (scaled)",
                 "Predicted Model",
@@ -412,58 +646,96 @@ class BenchmarkScraper(BaseScraper):
                     resolution=resolution,
                     settings=effective_settings,
                     gpu=gpu_model,
-                    value={
-                        "avg_fps": fps_data.get("avg_fps"),
-                        "p1_low": fps_data.get("p1_low"),
-                        "p0_1_low": fps_data.get("p0_1_low"),
-                        "notes": fps_data.get("notes"),
-                        "raw_snippet": fps_data.get("raw_snippet"),
-                        "source": src,
-                            "cpu_ref": "i5-12600K" if src == "Predicted Model" else None,
-                            "model_version": self.MODEL_VERSION if src == "Predicted Model" else None,
-                            "ram_gb": fps_data.get("ram_gb"),
-                            "storage_type": fps_data.get("storage_type"),
-                    },
+                    value=self._v2_value(rec),
                 )
         except Exception as e:
             print(f"寫入本地 benchmarks_cache_v2 失敗: {e}")
 
-        vram_required_gb, vram_selected_gb, vram_is_enough, vram_margin_gb = self._check_vram(
+        rec.vram_required_gb, rec.vram_selected_gb, rec.vram_is_enough, rec.vram_margin_gb = self._check_vram(
             game=game,
             resolution=resolution,
             gpu=gpu,
+            spec=spec,
         )
-        if vram_is_enough is False:
-            warn = f"⚠️ VRAM 可能不足：需求約 {vram_required_gb}GB，已選 {vram_selected_gb}GB"
-            fps_data["notes"] = (str(fps_data.get("notes") or "") + ("；" if fps_data.get("notes") else "") + warn).strip()
-
-        fps_data = self._sanitize_benchmark_payload(fps_data)
+        if rec.vram_is_enough is False:
+            rec.remarks.append(f"⚠️ VRAM 可能不足：需求約 {rec.vram_required_gb}GB，已選 {rec.vram_selected_gb}GB")
+
+        self._sanitize_record(rec)
+
+        # 7) 由預測模型回應的組合（含命中「預測」快取）→ 記錄到背景 enrichment 佇列，之後以真實數據升級
+        if rec.source_tier == TIER_PREDICTED:
+            # inline 網搜剛試過且沒結果：等冷卻期後再試，避免背景立刻重複同樣的查詢
+            retry_later = web_attempted and not is_degraded
+            await enqueue_enrichment(
+                game,
+                resolution,
+                effective_settings,
+                gpu,
+                cpu,
+                reason="degraded" if is_degraded else "predicted",
+                delay_seconds=enrichment_queue.retry_seconds if retry_later else 0.0,
+            )
 
-        is_incomplete = (fps_data.get("avg_fps") is None) or (fps_data.get("p1_low") is None)
-        confidence_score = float(fps_data.get("confidence_override")) if fps_data.get("confidence_override") is not None else self._calculate_confidence(fps_data)
-        confidence_score = max(0.0, min(float(confidence_score), 1.0))
-        raw_snippet = fps_data.get("raw_snippet", "") or ""
+        confidence_score = rec.confidence_override if rec.confidence_override is not None else self._calculate_confidence(rec)
+        rec.confidence_score = max(0.0, min(float(confidence_score), 1.0))
+        rec.source = rec.source or self.source_name
+        rec.is_degraded = is_degraded
+        rec.timestamp = datetime.now().isoformat()
+        return rec
 
+    def _v2_value(self, rec: BenchmarkRecord) -> Dict[str, Any]:
+        """v2（GPU-base）快取列：不存 CPU 相關的 confidence override"""
+        predicted = rec.source == "Predicted Model"
         return {
-            "game": game,
-            "resolution": resolution,
-            "settings": effective_settings,
-            "gpu": gpu_model,
-            "cpu": cpu_model,
-            "avg_fps": fps_data.get("avg_fps"),
-            "p1_low": fps_data.get("p1_low"),
-            "p0_1_low": fps_data.get("p0_1_low"),
-            "source": fps_data.get("source", self.source_name) or self.source_name,
-            "timestamp": datetime.now().isoformat(),
-            "notes": fps_data.get("notes"),
-            "confidence_score": confidence_score,
-            "is_incomplete": is_incomplete,
-            "vram_required_gb": vram_required_gb,
-            "vram_selected_gb": vram_selected_gb,
-            "vram_is_enough": vram_is_enough,
-            "vram_margin_gb": vram_margin_gb,
+            **rec.to_payload(),
+            "confidence_override": None,
+            "cpu_ref": "i5-12600K" if predicted else None,
+            "model_version": self.MODEL_VERSION if predicted else None,
         }
 
+    async def enrich_from_web(
+        self,
+        game: str,
+        resolution: str,
+        settings: Optional[str],
+        gpu: dict,
+        cpu: dict,
+    ) -> bool:
+        """
+        背景 enrichment：不受請求預算限制地查詢網路來源，找到真實數據就寫回 v1 快取。
+        回傳是否有寫入；搜尋 API 額度不足而沒找到時丟出 BudgetExhausted（由呼叫端延後重試）。
+        """
+        effective_settings = (settings or "High").strip() or "High"
+        gpu_model = gpu.get("model") or "Unknown GPU"
+        cpu_model = cpu.get("model") or "Unknown CPU"
+
+        web_try = await self._try_multiple_sources(game, resolution, effective_settings, gpu, cpu)
+        if web_try.get("budget_exhausted") and not web_try.get("avg_fps"):
+            raise BudgetExhausted(
+                str(web_try.get("budget_provider") or "search"),
+                self.api_priority,
+                "deferred",
+                float(web_try.get("retry_after") or 0.0),
+            )
+        if not web_try or not web_try.get("avg_fps"):
+            return False
+
+        spec = QuerySpec.build(game, resolution, effective_settings)
+        rec = BenchmarkRecord.from_payload(web_try)
+        rec.game, rec.resolution, rec.settings, rec.gpu, rec.cpu = game, resolution, effective_settings, gpu_model, cpu_model
+        self._apply_rt_adjustment(rec, game=game, settings=effective_settings, spec=spec)
+        self._ensure_benchmark_completeness(rec, spec=spec)
+        self._sanitize_record(rec)
+        await benchmark_store.upsert(
+            game=game,
+            resolution=resolution,
+            settings=effective_settings,
+            gpu=gpu_model,
+            cpu=cpu_model,
+            value={**rec.to_payload(), "model_version": None},
+        )
+        return True
+
     def _query_real_benchmark_data(
         self,
         game: str,
@@ -510,12 +782,8 @@ class BenchmarkScraper(BaseScraper):
 
         # 檢查GPU是否存在
         if gpu_model not in setting_data:
-            # 嘗試模糊匹配GPU型號
-            matched_gpu = None
-            for available_gpu in setting_data:
-                if available_gpu.lower() in gpu_model.lower() or gpu_model.lower() in available_gpu.lower():
-                    matched_gpu = available_gpu
-                    break
+            # 以 canonical id 比對GPU型號（"NVIDIA GeForce RTX 5070Ti" → "RTX 5070 Ti"；列表順序不影響結果）
+            matched_gpu = self._setting_gpu_table(game, resolution, quality_setting, setting_data).get(gpu_model)
 
             if matched_gpu is None:
                 # 若該遊戲/解析度/畫質有其他 GPU 的真實資料，使用「效能分數比例」做插值估算
@@ -567,14 +835,16 @@ class BenchmarkScraper(BaseScraper):
         ram_speed_mhz: Optional[int] = None,
         ram_latency_ns: Optional[float] = None,
         storage_type: Optional[str] = None,
+        spec: Optional[QuerySpec] = None,
     ) -> Dict[str, Any]:
         """
         生成基於真實硬件基準的模擬資料
         使用實際的基準測試數據作為參考，生成更準確的預測
         """
+        spec = spec or QuerySpec.build(game, resolution, settings)
         gpu_model = str(gpu.get("model") or "")
         cpu_model = str(cpu.get("model") or "")
-        effective_settings = (settings or "High").strip() or "High"
+        effective_settings = spec.settings
 
         # deterministic RNG：同一組輸入每次一致
         # - rng_combo：用於 low/usage 等細節（可隨硬體不同，包括RAM）
@@ -607,9 +877,9 @@ class BenchmarkScraper(BaseScraper):
         # 遊戲需求係數（0.6~1.0）
         game_demand = self._get_game_performance_demand(game)
 
-        resolution_multiplier = self._get_resolution_multiplier_for_game(game, resolution)
-        quality_multiplier = self._get_quality_multiplier_for_game(game, effective_settings)
-        rt_multiplier, rt_note = self._get_rt_multiplier_for_game(game, effective_settings)
+        resolution_multiplier = self._get_resolution_multiplier_for_game(game, resolution, spec=spec)
+        quality_multiplier = self._get_quality_multiplier_for_game(game, effective_settings, spec=spec)
+        rt_multiplier, rt_note = spec.rt_multiplier, spec.rt_note
 
         base_fps = baseline_fps_1080p_high * game_demand * resolution_multiplier * quality_multiplier * rt_multiplier * perf_ratio
 
@@ -617,7 +887,7 @@ class BenchmarkScraper(BaseScraper):
         cpu_score = self._get_cpu_performance_score(cpu_model)
         ref_cpu = self._get_cpu_performance_score("i5-12600K")
         cpu_ratio = (cpu_score / ref_cpu) if ref_cpu and ref_cpu > 0 else 1.0
-        if self._is_cpu_bound_game(game):
+        if spec.cpu_bound:
             cpu_factor = max(0.75, min(cpu_ratio, 1.35))
         else:
             cpu_factor = max(0.9, min(0.98 + 0.08 * cpu_ratio, 1.12))
@@ -636,7 +906,7 @@ class BenchmarkScraper(BaseScraper):
 
         # CPU/引擎 ceiling（避免不合理超高）
         ceiling_1080_high = self._get_cpu_fps_ceiling_1080p_high(game)
-        if ceiling_1080_high is not None and self._is_cpu_limited_game(game):
+        if ceiling_1080_high is not None and spec.cpu_limited:
             # 原先只根據 CPU ratio 決定 ceiling，會導致高階 GPU 在 CPU-bound 遊戲被完全截斷
             # 新邏輯：仍以 CPU 為基準，但允許 GPU 提供部分上限提升（0.6 ~ 1.0 範圍）
             cpu_ceiling = float(ceiling_1080_high) * float(min(cpu_ratio, 1.35))
@@ -674,6 +944,7 @@ class BenchmarkScraper(BaseScraper):
             ram_speed_mhz=ram_speed_mhz,
             ram_latency_ns=ram_latency_ns,
             rng=rng_combo,
+            spec=spec,
         )
         notes = f"GPU: {gpu_usage:.0f}%, CPU: {cpu_usage:.0f}%, RAM: {memory_usage:.0f}%"
         if rt_note:
@@ -697,212 +968,53 @@ class BenchmarkScraper(BaseScraper):
             "model_version": self.MODEL_VERSION,
         }
 
-    def _get_rt_multiplier_for_game(self, game: str, settings: str) -> tuple[float, Optional[str]]:
+    def _get_rt_multiplier_for_game(
+        self, game: str, settings: str, spec: Optional[QuerySpec] = None
+    ) -> Tuple[float, Optional[str]]:
         """
         光線追蹤/路徑追蹤（RT/PT）額外懲罰：
         - 只有當使用者在 settings 明確表示 RT/PT 才套用
         - 並非所有遊戲都有此功能；未知遊戲不直接改 FPS（只提示）
+        倍數表與判斷規則見 app/services/query_spec.py（RT_MULTIPLIERS）
         """
-        st = (settings or "").lower()
-        rt_enabled = any(k in st for k in ["ray tracing", "raytracing", "path tracing", "pathtracing", " rt", "rt ", "rt+", "pt", "光追", "光線追蹤", "路徑追蹤"])
-        if not rt_enabled:
-            return 1.0, None
-
-        g = (game or "").lower()
-        # 只對「已知支援 RT/PT 的遊戲」套用懲罰（避免把不支援的遊戲也硬降 FPS）
-        rt_map: dict[str, float] = {
-            # 特別重的 RT/PT
-            "alan wake 2": 0.60,
-            # Cyberpunk：最終調整，RTX 5090 4K Ultra RT 約 45-50fps（相對不開 RT 下降約 10-15%）
-            "cyberpunk 2077": 0.9,
-            # Elden Ring：你期望 5080+14900K 開 RT 仍可 110+，因此只做輕度懲罰
-            "elden ring": 0.90,
-            # 中度懲罰
-            "hogwarts legacy": 0.75,
-            "fortnite": 0.80,
-            "minecraft": 0.70,
-            "control": 0.75,
-            "metro exodus": 0.70,
-        }
-        for k, m in rt_map.items():
-            if k in g:
-                return float(m), "已啟用 RT/PT（FPS 會明顯下降）"
-
-        return 1.0, "已勾選 RT/PT，但此遊戲的 RT/PT 支援未知：未額外調降 FPS"
+        spec = spec or QuerySpec.build(game, "", settings)
+        return spec.rt_multiplier, spec.rt_note
 
-    def _apply_rt_adjustment(self, fps_data: Optional[Dict[str, Any]], game: str, settings: str) -> Optional[Dict[str, Any]]:
+    def _apply_rt_adjustment(
+        self, rec: BenchmarkRecord, game: str, settings: str, spec: Optional[QuerySpec] = None
+    ) -> None:
         """
-        對任意來源的 fps_data 套用 RT/PT 懲罰（僅當 settings 明確包含 RT/PT）。
+        對任意來源的結果套用 RT/PT 懲罰（僅當 settings 明確包含 RT/PT）。
         """
-        if not fps_data:
-            return fps_data
-        # Predicted Model 在 _generate_mock_data() 已經套用過 RT multiplier，避免重複懲罰
-        try:
-            if str((fps_data or {}).get("source") or "") == "Predicted Model":
-                return fps_data
-        except Exception:
-            pass
-        mult, note = self._get_rt_multiplier_for_game(game, settings)
+        # Predicted Model 在 _generate_mock_data() 已經套用過 RT multiplier；已處理過 RT 的結果也不要重複縮放
+        if rec.source == "Predicted Model" or rec.rt_applied:
+            return
+        mult, note = self._get_rt_multiplier_for_game(game, settings, spec=spec)
         if mult >= 0.999 or not note:
-            return fps_data
-
-        d = dict(fps_data)
-        # 若 notes 已經包含任何 RT/PT 提示，就不要再重複追加/重複縮放
-        existing_notes = str(d.get("notes") or "")
-        if any(k in existing_notes for k in ["RT/PT", "啟用 RT", "啟用RT", "光追", "光線追蹤", "路徑追蹤"]):
-            return fps_data
-
-        def scale(x: Any) -> Any:
-            try:
-                if x is None:
-                    return None
-                return round(float(x) * float(mult), 1)
-            except Exception:
-                return x
-
-        d["avg_fps"] = scale(d.get("avg_fps"))
-        d["p1_low"] = scale(d.get("p1_low"))
-        d["p0_1_low"] = scale(d.get("p0_1_low"))
+            return
 
-        tail = existing_notes.strip()
-        d["notes"] = (tail + (" | " if tail else "") + note).strip()
+        rec.scale_fps(mult)
+        rec.tags.append(note)
+        rec.rt_applied = True
         # RT 下的資料不確定性更高，略降置信度（若已被 override，維持較低值）
-        try:
-            d["confidence_override"] = min(float(d.get("confidence_override") or 0.8), 0.7)
-        except Exception:
-            d["confidence_override"] = 0.7
-        return d
+        rec.cap_confidence(0.7, default=0.8)
 
     def _get_gpu_performance_score(self, gpu_model: str) -> float:
         """
         根據GPU型號返回效能評分（相對於基準RTX 3060的倍數）
         基於實際基準測試數據
         """
-        gpu_scores = {
-            # NVIDIA RTX 50-series (Ada Lovelace)
-            "RTX 5090": 2.60,
-            "RTX 5080": 2.40,
-            "RTX 5070 Ti": 2.20,
-            "RTX 5070": 2.05,
-            "RTX 5060 Ti": 1.80,
-            "RTX 5060": 1.60,
-            "RTX 5050": 1.40,
-
-            # NVIDIA RTX 40-series (Ada Lovelace)
-            "RTX 4090": 2.50,
-            "RTX 4080 SUPER": 2.25,
-            "RTX 4080": 2.20,
-            "RTX 4070 Ti SUPER": 2.10,
-            "RTX 4070 Ti": 2.05,
-            "RTX 4070 SUPER": 1.95,
-            "RTX 4070": 1.90,
-            "RTX 4060 Ti 16GB": 1.70,
-            "RTX 4060 Ti": 1.65,
-            "RTX 4060": 1.45,
-
-            # NVIDIA RTX 30-series (Ampere)
-            "RTX 3090 Ti": 2.30,
-            "RTX 3090": 2.25,
-            "RTX 3080 Ti": 2.10,
-            "RTX 3080 12GB": 2.05,
-            "RTX 3080": 2.00,
-            "RTX 3070 Ti": 1.85,
-            "RTX 3070": 1.75,
-            "RTX 3060 Ti": 1.50,
-            "RTX 3060": 1.40,
-            "RTX 3050": 1.10,
-
-            # NVIDIA RTX 20-series (Turing)
-            "RTX 2080 Ti": 1.80,
-            "RTX 2080 SUPER": 1.65,
-            "RTX 2080": 1.60,
-            "RTX 2070 SUPER": 1.45,
-            "RTX 2070": 1.40,
-            "RTX 2060 SUPER": 1.25,
-            "RTX 2060": 1.20,
-
-            # NVIDIA GTX 16-series (Turing)
-            "GTX 1660 Ti": 1.15,
-            "GTX 1660 Super": 1.10,
-            "GTX 1660": 1.05,
-            "GTX 1650 Super": 0.90,
-            "GTX 1650": 0.85,
-
-            # NVIDIA GTX 10-series (Pascal)
-            "GTX 1080 Ti": 1.50,
-            "GTX 1080": 1.40,
-            "GTX 1070 Ti": 1.30,
-            "GTX 1070": 1.25,
-            "GTX 1060 6GB": 1.05,
-            "GTX 1060 3GB": 0.95,
-            "GTX 1050 Ti": 0.85,
-            "GTX 1050": 0.75,
-            "GTX 1030": 0.55,
-
-            # AMD RX 7000-series (RDNA 3)
-            "RX 7900 XTX": 2.35,
-            "RX 7900 XT": 2.25,
-            "RX 7900 GRE": 2.20,
-            "RX 7800 XT": 2.10,
-            "RX 7700 XT": 1.90,
-            "RX 7600 XT": 1.60,
-            "RX 7600": 1.45,
-
-            # AMD RX 6000-series (RDNA 2)
-            "RX 6950 XT": 2.15,
-            "RX 6900 XT": 2.05,
-            "RX 6800 XT": 1.85,
-            "RX 6800": 1.75,
-            "RX 6750 XT": 1.65,
-            "RX 6700 XT": 1.55,
-            "RX 6650 XT": 1.35,
-            "RX 6600 XT": 1.25,
-            "RX 6600": 1.15,
-            "RX 6500 XT": 1.05,
-            "RX 6400": 0.85,
-
-            # AMD RX 5000-series (RDNA)
-            "RX 5700 XT": 1.70,
-            "RX 5700": 1.60,
-            "RX 5600 XT": 1.45,
-            "RX 5500 XT": 1.30,
-
-            # AMD RX 400/500-series (GCN)
-            "RX 580": 1.20,
-            "RX 570": 1.15,
-            "RX 560": 1.05,
-            "RX 480": 1.25,
-            "RX 470": 1.20,
-
-            # AMD Vega series
-            "Radeon VII": 1.85,
-            "RX Vega 64": 1.40,
-            "RX Vega 56": 1.30,
-
-            # Intel Arc series
-            "Arc A770": 1.75,
-            "Intel Arc A770": 1.75,
-            "Arc A750": 1.45,
-            "Intel Arc A750": 1.45,
-            "Arc A580": 1.35,
-            "Arc A380": 1.20,
-            "Arc A310": 1.05,
-
-            # Integrated graphics
-            "Integrated Intel UHD": 0.70,
-        }
 
-        # 模糊匹配
-        for key, score in gpu_scores.items():
-            if key.lower() in gpu_model.lower():
-                return score
+        # canonical id 比對（完全相同優先，否則取型號中最長的完整 token 序列）
+        score = _score_table("gpus").get(gpu_model)
+        if score is not None:
+            return score
 
         # check overrides file (higher priority)
         try:
-            overrides = _load_hw_overrides().get("gpus", {}) or {}
-            for ok, val in overrides.items():
-                if ok.lower() in gpu_model.lower():
-                    return float(val)
+            val = _override_table("gpus").get(gpu_model)
+            if val is not None:
+                return float(val)
         except Exception:
             pass
 
@@ -912,7 +1024,13 @@ class BenchmarkScraper(BaseScraper):
     def _make_deterministic_rng(self, **kwargs) -> random.Random:
         """
         以輸入參數產生 deterministic RNG，確保同一組輸入每次得到同一組「預測」結果。
+        gpu / cpu 以 hardware_identity 的 canonical id 參與 seed：同一型號的不同寫法
+        （"RTX 4070 Ti SUPER" / "NVIDIA GeForce RTX 4070 Ti Super"）得到相同的預測。
         """
+        for hw in ("gpu", "cpu"):
+            if hw in kwargs:
+                raw = str(kwargs[hw] or "")
+                kwargs[hw] = hardware_identity.resolve(raw) or raw.strip().lower()
         payload = json.dumps(kwargs, sort_keys=True, ensure_ascii=False)
         h = hashlib.md5(payload.encode("utf-8")).hexdigest()
         seed = int(h[:8], 16)
@@ -993,71 +1111,27 @@ class BenchmarkScraper(BaseScraper):
 
         return 120.0
 
+    def _game_spec(self, game: str) -> QuerySpec:
+        # 遊戲類型只取決於 game（關鍵字表見 app/services/query_spec.py）
+        return QuerySpec.build(game, "", None)
+
     def _is_ultra_heavy_aaa(self, game: str) -> bool:
-        g = (game or "").lower()
-        keys = [
-            "alan wake 2",
-            "cyberpunk 2077",
-            "starfield",
-            "dragon's dogma 2",
-        ]
-        return any(k in g for k in keys)
+        return self._game_spec(game).ultra_heavy
 
     def _is_cpu_bound_game(self, game: str) -> bool:
-        g = (game or "").lower()
-        keys = [
-            "counter-strike 2",
-            "valorant",
-            "overwatch 2",
-            "minecraft",
-            "cities: skylines",
-            "cities skylines",
-            "cities skylines ii",
-            "cities: skylines ii",
-            "cities skylines 2",
-        ]
-        return any(k in g for k in keys)
+        return self._game_spec(game).cpu_bound
 
     def _is_sim_racing(self, game: str) -> bool:
-        g = (game or "").lower()
-        keys = [
-            "assetto corsa competizione",
-            "assetto corsa",
-            "iracing",
-            "i racing",
-        ]
-        return any(k in g for k in keys)
+        return self._game_spec(game).sim_racing
 
     def _is_fps_shooter(self, game: str) -> bool:
-        g = (game or "").lower()
-        keys = [
-            "halo infinite",
-            "rust",
-            "apex legends",
-            "ready or not",
-            "call of duty",
-            "pubg",
-            "fortnite",
-            "overwatch 2",
-        ]
-        return any(k in g for k in keys)
+        return self._game_spec(game).fps_shooter
 
     def _is_cpu_heavy_sandbox(self, game: str) -> bool:
-        g = (game or "").lower()
-        keys = [
-            "minecraft",
-            "cities: skylines",
-            "cities skylines",
-        ]
-        return any(k in g for k in keys)
+        return self._game_spec(game).cpu_heavy_sandbox
 
     def _is_cpu_limited_game(self, game: str) -> bool:
-        return (
-            self._is_cpu_bound_game(game)
-            or self._is_cpu_heavy_sandbox(game)
-            or self._is_sim_racing(game)
-            or self._is_fps_shooter(game)
-        )
+        return self._game_spec(game).cpu_limited
 
     def _get_cpu_fps_ceiling_1080p_high(self, game: str) -> Optional[float]:
         """
@@ -1093,84 +1167,27 @@ class BenchmarkScraper(BaseScraper):
         根據解析度返回FPS倍數
         4K通常是1080p的25-30%，1440p是60-70%
         """
-        resolution_multipliers = {
-            "1280x720": 2.0,    # 720p (基準)
-            "1920x1080": 1.0,   # 1080p (基準)
-            "2560x1440": 0.65,  # 1440p
-            "3840x2160": 0.25,  # 4K
-            "720": 2.0,
-            "1080": 1.0,
-            "1440": 0.65,
-            "4K": 0.25,
-            "2160": 0.25
-        }
+        return _RES_MULT_DEFAULT.get(parse_resolution(resolution), 1.0)  # 預設1080p
 
-        for key, multiplier in resolution_multipliers.items():
-            if key in resolution:
-                return multiplier
-
-        return 1.0  # 預設1080p
-
-    def _get_resolution_multiplier_for_game(self, game: str, resolution: str) -> float:
+    def _get_resolution_multiplier_for_game(
+        self, game: str, resolution: str, spec: Optional[QuerySpec] = None
+    ) -> float:
         """
         依遊戲類型調整解析度縮放。
         - 電競/CPU-bound：解析度對 FPS 影響通常小於 AAA
         - 超重 3A：4K/1440 掉幅更大
         - 模擬賽車：介於兩者
         """
-        if self._is_cpu_bound_game(game):
-            esports = {
-                "1280x720": 1.25,
-                "1920x1080": 1.0,
-                "2560x1440": 0.85,
-                "3840x2160": 0.60,  # Lower for 4K to match real benchmarks
-                "720": 1.25,
-                "1080": 1.0,
-                "1440": 0.85,
-                "4K": 0.60,
-                "2160": 0.60,
-            }
-            for key, multiplier in esports.items():
-                if key in str(resolution):
-                    return multiplier
-            return 1.0
-
-        if self._is_sim_racing(game):
-            sim = {
-                "1280x720": 1.35,
-                "1920x1080": 1.0,
-                "2560x1440": 0.78,
-                "3840x2160": 0.38,
-                "720": 1.35,
-                "1080": 1.0,
-                "1440": 0.78,
-                "4K": 0.38,
-                "2160": 0.38,
-            }
-            for key, multiplier in sim.items():
-                if key in str(resolution):
-                    return multiplier
-            return 1.0
-
-        if self._is_ultra_heavy_aaa(game):
-            heavy = {
-                "1280x720": 1.8,
-                "1920x1080": 1.0,
-                "2560x1440": 0.60,
-                # 校正：重負載 3A 在 4K 的掉幅不要壓得比實際還低（否則 RT 時會不合理）
-                "3840x2160": 0.40,
-                "720": 1.8,
-                "1080": 1.0,
-                "1440": 0.60,
-                "4K": 0.40,
-                "2160": 0.40,
-            }
-            for key, multiplier in heavy.items():
-                if key in str(resolution):
-                    return multiplier
-            return 1.0
-
-        return self._get_resolution_multiplier(resolution)
+        spec = spec or QuerySpec.build(game, resolution, None)
+        if spec.cpu_bound:
+            table = _RES_MULT_ESPORTS
+        elif spec.sim_racing:
+            table = _RES_MULT_SIM
+        elif spec.ultra_heavy:
+            table = _RES_MULT_HEAVY
+        else:
+            table = _RES_MULT_DEFAULT
+        return table.get(spec.res, 1.0)
 
     def _get_ram_multiplier(self, game: str, ram_gb: Optional[float],
                            ram_type: Optional[str] = None, ram_speed_mhz: Optional[int] = None,
@@ -1293,19 +1310,17 @@ class BenchmarkScraper(BaseScraper):
 
         return quality_multipliers.get(settings, 1.0)
 
-    def _get_quality_multiplier_for_game(self, game: str, settings: str) -> float:
+    def _get_quality_multiplier_for_game(self, game: str, settings: str, spec: Optional[QuerySpec] = None) -> float:
         """
         依遊戲類型微調畫質縮放：
         - 電競/CPU-heavy：畫質影響偏小（Ultra 不要壓太低）
         - 超重 3A：Ultra 懲罰更重
         """
-        st = (settings or "High").strip() or "High"
-        # 支援像 "Ultra RT" / "High + RT" 這類字串：先抽出基礎畫質
-        base = st.split()[0].strip()
-        if base.lower() in {"low", "medium", "high", "ultra"}:
-            st = base.capitalize()
+        spec = spec or QuerySpec.build(game, "", settings)
+        # 基礎畫質（"Ultra RT" / "High + RT" → Ultra / High）
+        st = spec.quality
 
-        if self._is_cpu_bound_game(game) or self._is_cpu_heavy_sandbox(game):
+        if spec.cpu_bound or spec.cpu_heavy_sandbox:
             if st == "Ultra":
                 return 0.92
             if st == "High":
@@ -1315,7 +1330,7 @@ class BenchmarkScraper(BaseScraper):
             if st == "Low":
                 return 1.15
 
-        if self._is_sim_racing(game):
+        if spec.sim_racing:
             if st == "Ultra":
                 return 0.88
             if st == "High":
@@ -1325,7 +1340,7 @@ class BenchmarkScraper(BaseScraper):
             if st == "Low":
                 return 1.22
 
-        if self._is_fps_shooter(game):
+        if spec.fps_shooter:
             if st == "Ultra":
                 return 0.88
             if st == "High":
@@ -1335,7 +1350,7 @@ class BenchmarkScraper(BaseScraper):
             if st == "Low":
                 return 1.25
 
-        if self._is_ultra_heavy_aaa(game):
+        if spec.ultra_heavy:
             if st == "Ultra":
                 return 0.72
             if st == "High":
@@ -1360,6 +1375,7 @@ class BenchmarkScraper(BaseScraper):
         ram_speed_mhz: Optional[int] = None,
         ram_latency_ns: Optional[float] = None,
         rng: Optional[random.Random] = None,
+        spec: Optional[QuerySpec] = None,
     ) -> tuple:
         """
         預測使用率（%）。
@@ -1369,23 +1385,12 @@ class BenchmarkScraper(BaseScraper):
         - 不要永遠卡在 CPU 60%
         """
         r = rng or random
-        res = str(resolution or "")
-        st = (settings or "High").strip() or "High"
-        cpu_bound = self._is_cpu_bound_game(game)
-
-        # 解析度負載（越高越吃 GPU/VRAM）
-        if "3840" in res or "2160" in res or "4k" in res.lower():
-            res_load = 1.0
-        elif "2560" in res or "1440" in res:
-            res_load = 0.7
-        elif "1280" in res or "720" in res:
-            res_load = 0.5
-        else:
-            res_load = 0.8
+        spec = spec or QuerySpec.build(game, resolution, settings)
+        cpu_bound = spec.cpu_bound
 
-        # 畫質負載（越高越吃 GPU/VRAM）
-        st_load_map = {"Low": 0.75, "Medium": 0.9, "High": 1.0, "Ultra": 1.12}
-        st_load = st_load_map.get(st, 1.0)
+        # 解析度/畫質負載（越高越吃 GPU/VRAM；"Ultra RT" 以基礎畫質 Ultra 計）
+        res_load = spec.res_load
+        st_load = spec.st_load
 
         # CPU ratio：越強的 CPU，同樣 fps 下使用率通常更低
         cpu_score = self._get_cpu_performance_score(cpu_model)
@@ -1424,7 +1429,7 @@ class BenchmarkScraper(BaseScraper):
 
         # RAM usage（不是 VRAM）- 根據RAM規格調整
         extra = 0.0
-        gl = (game or "").lower()
+        gl = spec.game_id
         if "cities" in gl:
             extra += 10.0
         if "tarkov" in gl:
@@ -1480,97 +1485,16 @@ class BenchmarkScraper(BaseScraper):
         """
         根據CPU型號返回效能評分
         """
-        # 簡化的CPU效能評分
-        cpu_scores = {
-            # Intel Ultra series (Meteor Lake)
-            "Intel Core Ultra 9 285K": 2.5, "Intel Core Ultra 9 285": 2.4,
-            "Intel Core Ultra 7 265K": 2.3, "Intel Core Ultra 7 265": 2.2,
-            "Intel Core Ultra 5 245K": 2.1, "Intel Core Ultra 5 245": 2.0,
-
-            # Intel 14th Gen (Raptor Lake Refresh)
-            "i9-14900K": 2.4, "i9-14900KF": 2.4, "i9-14900": 2.35, "i9-14900F": 2.35,
-            "i7-14700K": 2.2, "i7-14700KF": 2.2, "i7-14700": 2.15, "i7-14700F": 2.15,
-            "i5-14600K": 2.0, "i5-14600KF": 2.0, "i5-14600": 1.95, "i5-14600F": 1.95,
-            "i5-14400": 1.85, "i5-14400F": 1.85,
-
-            # Intel 13th Gen (Raptor Lake)
-            "i9-13900K": 2.35, "i9-13900KF": 2.35, "i9-13900": 2.3, "i9-13900F": 2.3,
-            "i7-13700K": 2.1, "i7-13700KF": 2.1, "i7-13700": 2.05, "i7-13700F": 2.05,
-            "i5-13600K": 1.9, "i5-13600KF": 1.9, "i5-13600": 1.85, "i5-13600F": 1.85,
-            "i5-13500": 1.8, "i5-13500F": 1.8, "i5-13400": 1.75, "i5-13400F": 1.75,
-
-            # Intel 12th Gen (Alder Lake)
-            "i9-12900K": 2.1, "i9-12900KF": 2.1, "i9-12900": 2.05, "i9-12900F": 2.05,
-            "i7-12700K": 1.95, "i7-12700KF": 1.95, "i7-12700": 1.9, "i7-12700F": 1.9,
-            "i5-12600K": 1.7, "i5-12600KF": 1.7, "i5-12600": 1.65, "i5-12600F": 1.65,
-            "i5-12500": 1.6, "i5-12500F": 1.6, "i5-12400": 1.55, "i5-12400F": 1.55,
-
-            # Intel 11th Gen (Rocket Lake)
-            "i9-11900K": 1.8, "i9-11900KF": 1.8, "i9-11900": 1.75, "i9-11900F": 1.75,
-            "i7-11700K": 1.7, "i7-11700KF": 1.7, "i7-11700": 1.65, "i7-11700F": 1.65,
-            "i5-11600K": 1.5, "i5-11600KF": 1.5, "i5-11600": 1.45, "i5-11600F": 1.45,
-            "i5-11500": 1.4, "i5-11500F": 1.4, "i5-11400": 1.35, "i5-11400F": 1.35,
-
-            # Intel 10th Gen (Comet Lake)
-            "i9-10900K": 1.65, "i9-10900KF": 1.65, "i9-10900": 1.6, "i9-10900F": 1.6,
-            "i7-10700K": 1.55, "i7-10700KF": 1.55, "i7-10700": 1.5, "i7-10700F": 1.5,
-            "i5-10600K": 1.35, "i5-10600KF": 1.35, "i5-10600": 1.3, "i5-10600F": 1.3,
-            "i5-10500": 1.25, "i5-10500F": 1.25, "i5-10400": 1.2, "i5-10400F": 1.2,
-
-            # Intel 9th Gen (Coffee Lake Refresh)
-            "i9-9900K": 1.45, "i9-9900KF": 1.45, "i9-9900": 1.4, "i9-9900F": 1.4,
-            "i7-9700K": 1.35, "i7-9700KF": 1.35, "i7-9700": 1.3, "i7-9700F": 1.3,
-            "i5-9600K": 1.2, "i5-9600KF": 1.2, "i5-9600": 1.15, "i5-9600F": 1.15,
-            "i5-9500": 1.1, "i5-9500F": 1.1, "i5-9400": 1.05, "i5-9400F": 1.05,
-
-            # Intel 8th Gen (Coffee Lake)
-            "i7-8700K": 1.25, "i7-8700": 1.2, "i5-8600K": 1.1, "i5-8600": 1.05,
-            "i5-8500": 1.0, "i5-8400": 0.95, "i3-8350K": 0.9, "i3-8100": 0.85,
-
-            # Intel 7th Gen (Kaby Lake)
-            "i7-7700K": 1.15, "i7-7700": 1.1, "i5-7600K": 1.0, "i5-7600": 0.95,
-            "i5-7500": 0.9, "i5-7400": 0.85, "i3-7350K": 0.8, "i3-7300": 0.75, "i3-7100": 0.7,
-
-            # AMD Ryzen 9000 series (Zen 5)
-            "Ryzen 9 9950X": 2.23, "Ryzen 9 9950X3D": 2.25, "Ryzen 9 9900X": 2.1, "Ryzen 9 9900X3D": 2.15,
-            "Ryzen 7 9700X": 1.95, "Ryzen 7 9700X3D": 2.0, "Ryzen 5 9600X": 1.8, "Ryzen 5 9600X3D": 1.85,
-
-            # AMD Ryzen 8000/7000 series (Zen 4)
-            "Ryzen 9 7950X": 2.05, "Ryzen 9 7950X3D": 2.1, "Ryzen 9 7900X": 1.95, "Ryzen 9 7900X3D": 2.0,
-            "Ryzen 9 7900": 1.9, "Ryzen 7 7800X3D": 1.85, "Ryzen 7 7700X": 1.75, "Ryzen 7 7700X3D": 1.8,
-            "Ryzen 7 7700": 1.7, "Ryzen 5 7600X": 1.6, "Ryzen 5 7600X3D": 1.65, "Ryzen 5 7600": 1.55,
-
-            # AMD Ryzen 5000 series (Zen 3)
-            "Ryzen 9 5950X": 1.85, "Ryzen 9 5900X": 1.8, "Ryzen 9 5900": 1.75,
-            "Ryzen 7 5800X3D": 1.75, "Ryzen 7 5800X": 1.65, "Ryzen 7 5800": 1.6,
-            "Ryzen 5 5600X": 1.4, "Ryzen 5 5600X3D": 1.45, "Ryzen 5 5600": 1.35,
-
-            # AMD Ryzen 3000 series (Zen 2)
-            "Ryzen 9 3900X": 1.5, "Ryzen 9 3900": 1.45, "Ryzen 9 3950X": 1.55,
-            "Ryzen 7 3800X": 1.4, "Ryzen 7 3800XT": 1.4, "Ryzen 7 3800": 1.35,
-            "Ryzen 7 3700X": 1.35, "Ryzen 7 3700": 1.3, "Ryzen 5 3600X": 1.2,
-            "Ryzen 5 3600XT": 1.2, "Ryzen 5 3600": 1.15, "Ryzen 5 3500X": 1.1,
-            "Ryzen 5 3400G": 1.05, "Ryzen 3 3300X": 1.0, "Ryzen 3 3200G": 0.95, "Ryzen 3 3100": 0.9,
-
-            # AMD Ryzen 2000 series (Zen+)
-            "Ryzen 7 2700X": 1.15, "Ryzen 7 2700": 1.1, "Ryzen 5 2600X": 1.05, "Ryzen 5 2600": 1.0,
-            "Ryzen 5 2500X": 0.95, "Ryzen 5 2400G": 0.9, "Ryzen 3 2300X": 0.85, "Ryzen 3 2200G": 0.85,
-
-            # AMD Ryzen 1000 series (Zen)
-            "Ryzen 7 1800X": 1.0, "Ryzen 7 1700X": 0.95, "Ryzen 7 1700": 0.9,
-            "Ryzen 5 1600X": 0.9, "Ryzen 5 1600": 0.85, "Ryzen 5 1500X": 0.8,
-            "Ryzen 5 1400": 0.75, "Ryzen 3 1300X": 0.7, "Ryzen 3 1200": 0.65,
-        }
 
-        for key, score in cpu_scores.items():
-            if key.lower() in cpu_model.lower():
-                return score
+        # 簡化的CPU效能評分（"Ryzen 9 9950X3D" 不會再被 "Ryzen 9 9950X" 先比對到）
+        score = _score_table("cpus").get(cpu_model)
+        if score is not None:
+            return score
         # check overrides file for cpu
         try:
-            overrides = _load_hw_overrides().get("cpus", {}) or {}
-            for ok, val in overrides.items():
-                if ok.lower() in cpu_model.lower():
-                    return float(val)
+            val = _override_table("cpus").get(cpu_model)
+            if val is not None:
+                return float(val)
         except Exception:
             pass
 
@@ -1604,6 +1528,7 @@ class BenchmarkScraper(BaseScraper):
         settings: Optional[str],
         gpu: dict,
         cpu: dict,
+        deadline: Optional[Deadline] = None,
     ) -> Dict[str, Any]:
         """
         嘗試從多個來源抓取基準資料：
@@ -1611,11 +1536,13 @@ class BenchmarkScraper(BaseScraper):
         2) 站點爬蟲（TechPowerUp/GPUCheck/UL）
         """
         diagnostic_note: Optional[str] = None
+        budget_shed: Dict[str, Any] = {}
+        deadline_exceeded = False
 
         # 1) Google snippet
         try:
             if self.client:
-                svc = GoogleFpsSearchService(self.client)
+                svc = GoogleFpsSearchService(self.client, priority=self.api_priority)
                 data = await svc.search_fps(
                     game=game,
                     gpu=str(gpu.get("model") or ""),
@@ -1623,11 +1550,16 @@ class BenchmarkScraper(BaseScraper):
                     resolution=resolution,
                     settings=settings,
                     num=5,
+                    deadline=deadline,
                 )
                 if data and data.get("avg_fps"):
                     return data
                 if data and data.get("notes"):
                     diagnostic_note = str(data.get("notes"))
+                if data and data.get("budget_exhausted"):
+                    budget_shed = {k: data.get(k) for k in ("budget_exhausted", "budget_provider", "retry_after")}
+                if data and data.get("deadline_exceeded"):
+                    deadline_exceeded = True
         except Exception as e:
             diagnostic_note = f"Google FPS 搜尋失敗: {e}"
 
@@ -1638,6 +1570,9 @@ class BenchmarkScraper(BaseScraper):
         ]
 
         for source_name, fetch_func in sources:
+            if deadline is not None and deadline.expired():
+                deadline_exceeded = True
+                break
             try:
                 data = await fetch_func(game, resolution, gpu)
                 if data and data.get("avg_fps"):
@@ -1647,7 +1582,12 @@ class BenchmarkScraper(BaseScraper):
                 print(f"從 {source_name} 抓取失敗: {e}")
                 continue
 
-        return {"notes": diagnostic_note} if diagnostic_note else {}
+        out: Dict[str, Any] = {"notes": diagnostic_note} if diagnostic_note else {}
+        out.update(budget_shed)
+        if deadline_exceeded:
+            # 來源沒有全部查完：呼叫端應視為降級，而不是「查無資料」
+            out["deadline_exceeded"] = True
+        return out
     
     def _parse_fps_data(
         self,
@@ -1663,19 +1603,13 @@ class BenchmarkScraper(BaseScraper):
         fps_elements = soup.select(".fps-data, .benchmark-result")
         
         for element in fps_elements:
-            text = element.get_text()
-            
-            # 使用正則表達式提取 FPS 數值
-            avg_match = re.search(r'avg[:\s]+(\d+\.?\d*)', text, re.IGNORECASE)
-            p1_match = re.search(r'1%[:\s]+low[:\s]+(\d+\.?\d*)', text, re.IGNORECASE)
-            p01_match = re.search(r'0\.1%[:\s]+low[:\s]+(\d+\.?\d*)', text, re.IGNORECASE)
-            
-            if avg_match:
-                fps_data["avg_fps"] = float(avg_match.group(1))
-            if p1_match:
-                fps_data["p1_low"] = float(p1_match.group(1))
-            if p01_match:
-                fps_data["p0_1_low"] = float(p01_match.group(1))
+            # 單一預先編譯 pattern 一次掃描；每個欄位取第一個出現的數值
+            found: Dict[str, float] = {}
+            for m in _FPS_STAT_RE.finditer(element.get_text()):
+                key = m.lastgroup
+                if key not in found:
+                    found[key] = float(m.group(key))
+            fps_data.update(found)
         
         return fps_data
 
@@ -1827,9 +1761,10 @@ class BenchmarkScraper(BaseScraper):
         cpu_usage = random.uniform(50, 75)
 
         # 記憶體使用率 - 解析度相關
-        if "4K" in resolution or "3840" in resolution:
+        res = parse_resolution(resolution)
+        if res is Resolution.R2160:
             memory_usage = random.uniform(80, 95)
-        elif "1440" in resolution or "2560" in resolution:
+        elif res is Resolution.R1440:
             memory_usage = random.uniform(70, 85)
         else:
             memory_usage = random.uniform(55, 75)
@@ -1893,149 +1828,116 @@ class BenchmarkScraper(BaseScraper):
             "notes": f"由 seed 內 {src_key} 資料按效能分數比例估算（來源 GPU: {src_key}）",
         }
 
-    def _ensure_benchmark_completeness(
-        self,
-        fps_data: Dict[str, Any],
-        game: str,
-        resolution: str,
-        settings: str,
-        gpu_model: str,
-        cpu_model: str,
-    ) -> Dict[str, Any]:
+    def _ensure_benchmark_completeness(self, rec: BenchmarkRecord, spec: Optional[QuerySpec] = None) -> None:
         """
         針對「網搜只拿到 avg_fps」或「seed/插值缺 low」等情況補齊欄位，避免瓶頸分析顯示資料不足。
         - 若缺 p1_low / p0_1_low：用 deterministic 比例推估，並降低 confidence
-        - 若缺 usage：用預測使用率模型推估，並把數值寫回 notes
+        - 若缺 usage：用預測使用率模型推估
         """
-        d = dict(fps_data or {})
-        avg = d.get("avg_fps")
+        avg = rec.avg_fps
         if avg is None:
-            return d
+            return
+        spec = spec or QuerySpec.build(rec.game, rec.resolution, rec.settings)
 
         rng = self._make_deterministic_rng(
-            game=game,
-            resolution=resolution,
-            settings=settings,
-            gpu=gpu_model,
-            cpu=cpu_model,
+            game=rec.game,
+            resolution=rec.resolution,
+            settings=rec.settings,
+            gpu=rec.gpu,
+            cpu=rec.cpu,
             salt="complete",
         )
 
-        if d.get("p1_low") is None:
-            ratio = rng.uniform(0.86, 0.92) if self._is_cpu_bound_game(game) else rng.uniform(0.78, 0.88)
-            d["p1_low"] = round(float(avg) * ratio, 1)
-            d["confidence_override"] = min(float(d.get("confidence_override") or 0.75), 0.75)
-            d["notes"] = (str(d.get("notes") or "") + ("；" if d.get("notes") else "") + "1% low 為推估值").strip()
+        if rec.p1_low is None:
+            ratio = rng.uniform(0.86, 0.92) if spec.cpu_bound else rng.uniform(0.78, 0.88)
+            rec.p1_low = round(float(avg) * ratio, 1)
+            rec.cap_confidence(0.75, default=0.75)
+            rec.remarks.append("1% low 為推估值")
 
-        if d.get("p0_1_low") is None and d.get("p1_low") is not None:
+        if rec.p0_1_low is None and rec.p1_low is not None:
             ratio = rng.uniform(0.88, 0.95)
-            d["p0_1_low"] = round(float(d["p1_low"]) * ratio, 1)
-            d["confidence_override"] = min(float(d.get("confidence_override") or 0.75), 0.75)
-            d["notes"] = (str(d.get("notes") or "") + ("；" if d.get("notes") else "") + "0.1% low 為推估值").strip()
-
-        notes_text = str(d.get("notes") or "")
-        has_gpu = "GPU:" in notes_text
-        has_cpu = "CPU:" in notes_text
-        has_ram = "RAM:" in notes_text or "Memory:" in notes_text
-        if not (has_gpu and has_cpu and has_ram):
+            rec.p0_1_low = round(float(rec.p1_low) * ratio, 1)
+            rec.cap_confidence(0.75, default=0.75)
+            rec.remarks.append("0.1% low 為推估值")
+
+        if not rec.has_usage():
             ref_score = self._get_gpu_performance_score("RTX 3060")
-            tgt_score = self._get_gpu_performance_score(gpu_model)
+            tgt_score = self._get_gpu_performance_score(rec.gpu)
             perf_ratio = (tgt_score / ref_score) if ref_score and ref_score > 0 else 1.0
-            gpu_u, cpu_u, ram_u = self._calculate_usage_rates(
+            rec.set_usage(*self._calculate_usage_rates(
                 avg_fps=float(avg),
-                game=game,
-                resolution=resolution,
-                settings=settings,
+                game=rec.game,
+                resolution=rec.resolution,
+                settings=rec.settings,
                 gpu_perf_ratio=float(perf_ratio),
-                cpu_model=cpu_model,
+                cpu_model=rec.cpu,
                 rng=rng,
-            )
-            usage_note = f"GPU: {gpu_u:.0f}%, CPU: {cpu_u:.0f}%, RAM: {ram_u:.0f}%"
-            d["notes"] = (usage_note + ("；" + notes_text if notes_text else "")).strip()
-            d["confidence_override"] = min(float(d.get("confidence_override") or 0.8), 0.8)
+                spec=spec,
+            ))
+            rec.cap_confidence(0.8, default=0.8)
 
-        return d
-
-    def _apply_cpu_adjustment(self, fps_data: Dict[str, Any], game: str, cpu_model: str) -> Dict[str, Any]:
+    def _apply_cpu_adjustment(
+        self, fps_data: Dict[str, Any], game: str, cpu_model: str, spec: Optional[QuerySpec] = None
+    ) -> Dict[str, Any]:
         """
-        將「GPU-base」的 benchmark 依 CPU 模型做調整。
+        將「GPU-base」的 benchmark 依 CPU 模型做調整（dict 介面，供 tools 使用）。
         """
         d = dict(fps_data or {})
-        avg = d.get("avg_fps")
-        if avg is None:
+        if d.get("avg_fps") is None:
             return d
+        rec = BenchmarkRecord.from_payload(d)
+        self._adjust_record_for_cpu(rec, game=game, cpu_model=cpu_model, spec=spec)
+        return {**d, **rec.to_payload()}
+
+    def _adjust_record_for_cpu(
+        self, rec: BenchmarkRecord, game: str, cpu_model: str, spec: Optional[QuerySpec] = None
+    ) -> None:
+        avg = rec.avg_fps
+        if avg is None:
+            return
+        spec = spec or QuerySpec.build(game, rec.resolution, rec.settings or "High")
+        gpu_model = rec.gpu
 
         cpu_score = self._get_cpu_performance_score(str(cpu_model or ""))
         ref_cpu = self._get_cpu_performance_score("i5-12600K")
         cpu_ratio = (cpu_score / ref_cpu) if ref_cpu and ref_cpu > 0 else 1.0
 
-        if self._is_cpu_bound_game(game):
+        if spec.cpu_bound:
             cpu_factor = max(0.8, min(cpu_ratio, 1.6))
         else:
             cpu_factor = max(0.8, min(0.9 + 0.15 * cpu_ratio, 1.4))
 
         # Apply CPU scaling with additional jitter for hardware differentiation
-        cpu_jitter_rng = self._make_deterministic_rng(game=game, cpu=cpu_model, gpu=str(d.get("gpu") or ""), salt="cpu-adjust-fps")
+        cpu_jitter_rng = self._make_deterministic_rng(game=game, cpu=cpu_model, gpu=gpu_model, salt="cpu-adjust-fps")
         cpu_jitter = cpu_jitter_rng.uniform(0.98, 1.02)
+        rec.scale_fps(float(cpu_factor) * cpu_jitter)
 
-        def scale(x: Any) -> Optional[float]:
-            try:
-                if x is None:
-                    return None
-                return round(float(x) * float(cpu_factor) * cpu_jitter, 1)
-            except Exception:
-                return None
-
-        d["avg_fps"] = scale(d.get("avg_fps"))
-        d["p1_low"] = scale(d.get("p1_low"))
-        d["p0_1_low"] = scale(d.get("p0_1_low"))
-
-        # 清理舊 notes：避免 v2 混入已經「CPU adjusted」過的 notes，導致越疊越長/解析出錯
-        base_notes = str(d.get("notes") or "")
-        # 保留第一段（通常是最新的 usage），移除後面所有「CPU adjusted」或多段疊加
-        if base_notes:
-            base_notes = base_notes.split("|")[0].strip()
-            base_notes = base_notes.split("CPU adjusted:")[0].strip()
-            base_notes = base_notes.split("CPU adjusted：")[0].strip()
-
-        rng = self._make_deterministic_rng(game=game, cpu=str(cpu_model), gpu=str(d.get("gpu") or ""), salt="cpu-adjust-usage")
+        # 使用率依 CPU 重新推估；舊的「CPU adjusted」標記移除（避免 v2 資料越疊越長）
+        rng = self._make_deterministic_rng(game=game, cpu=str(cpu_model), gpu=gpu_model, salt="cpu-adjust-usage")
         ref_score = self._get_gpu_performance_score("RTX 3060")
-        tgt_score = self._get_gpu_performance_score(str(d.get("gpu") or "")) or ref_score
+        tgt_score = self._get_gpu_performance_score(gpu_model) or ref_score
         perf_ratio = (tgt_score / ref_score) if ref_score and ref_score > 0 else 1.0
-        gpu_u, cpu_u, ram_u = self._calculate_usage_rates(
-            avg_fps=float(d.get("avg_fps") or avg),
+        rec.set_usage(*self._calculate_usage_rates(
+            avg_fps=float(rec.avg_fps or avg),
             game=game,
-            resolution=str(d.get("resolution") or ""),
-            settings=str(d.get("settings") or "High"),
+            resolution=rec.resolution,
+            settings=rec.settings or "High",
             gpu_perf_ratio=float(perf_ratio),
             cpu_model=str(cpu_model or ""),
             rng=rng,
-        )
-        usage_note = f"GPU: {gpu_u:.0f}%, CPU: {cpu_u:.0f}%, RAM: {ram_u:.0f}%"
-        tail = base_notes.strip()
-        d["notes"] = (usage_note + (" | " + tail if tail else "") + f" | CPU adjusted: {cpu_model}").strip()
-        d["confidence_override"] = min(float(d.get("confidence_override") or 0.75), 0.75)
-        return d
+            spec=spec,
+        ))
+        rec.tags = [t for t in rec.tags if not t.startswith(("CPU adjusted:", "CPU adjusted："))]
+        rec.tags.append(f"CPU adjusted: {cpu_model}")
+        rec.cap_confidence(0.75, default=0.75)
 
-    def _sanitize_benchmark_payload(self, fps_data: Dict[str, Any]) -> Dict[str, Any]:
+    def _sanitize_record(self, rec: BenchmarkRecord) -> None:
         """
-        最終校正/驗證單筆 fps_data：
+        最終校正/驗證單筆結果：
         - 確保 avg >= p1 >= p0.1
         - clamp 不合理極端值
         """
-        d = dict(fps_data or {})
-
-        def to_f(x: Any) -> Optional[float]:
-            try:
-                if x is None:
-                    return None
-                return float(x)
-            except Exception:
-                return None
-
-        avg = to_f(d.get("avg_fps"))
-        p1 = to_f(d.get("p1_low"))
-        p01 = to_f(d.get("p0_1_low"))
+        avg, p1, p01 = rec.avg_fps, rec.p1_low, rec.p0_1_low
 
         # Allow high FPS for all games (remove arbitrary caps)
         fps_cap = 2000.0
@@ -2054,29 +1956,23 @@ class BenchmarkScraper(BaseScraper):
         if avg is not None and p01 is not None and p01 > avg:
             p01 = avg
 
-        if avg is not None:
-            d["avg_fps"] = round(avg, 1)
-        if p1 is not None:
-            d["p1_low"] = round(p1, 1)
-        if p01 is not None:
-            d["p0_1_low"] = round(p01, 1)
-
-        if d.get("notes") is not None:
-            d["notes"] = str(d.get("notes"))
-        if d.get("source") is not None:
-            d["source"] = str(d.get("source"))
-        if d.get("raw_snippet") is not None:
-            d["raw_snippet"] = str(d.get("raw_snippet"))
-
-        return d
+        rec.avg_fps = round(avg, 1) if avg is not None else None
+        rec.p1_low = round(p1, 1) if p1 is not None else None
+        rec.p0_1_low = round(p01, 1) if p01 is not None else None
 
-    def _check_vram(self, game: str, resolution: str, gpu: dict) -> Tuple[Optional[float], Optional[float], Optional[bool], Optional[float]]:
-        g = GAME_REQUIREMENTS_25.get(game)
+    def _check_vram(
+        self, game: str, resolution: str, gpu: dict, spec: Optional[QuerySpec] = None
+    ) -> Tuple[Optional[float], Optional[float], Optional[bool], Optional[float]]:
+        spec = spec or QuerySpec.build(game, resolution, None)
+        # 遊戲名稱大小寫/空白不同也能對到需求表；"4K"、"1440p" 這類解析度寫法轉成表內的寬x高
+        g = GAME_REQUIREMENTS_25.get(spec.game_name or game)
         if not g:
             return None, self._infer_selected_vram(gpu), None, None
 
         vram_by_res = (g.get("vramByResolution") or {})
         required = vram_by_res.get(resolution)
+        if required is None and spec.res is not None:
+            required = vram_by_res.get(spec.res.value)
         selected = self._infer_selected_vram(gpu)
         if required is None or selected is None:
             return float(required) if required is not None else None, selected, None, None
@@ -2092,7 +1988,7 @@ class BenchmarkScraper(BaseScraper):
                 pass
         model = str(gpu.get("model") or "").strip()
         if model:
-            meta = (self.gpu_meta or {}).get(model.lower())
+            meta = (self.gpu_meta or {}).get(hardware_identity.resolve(model))
             if meta and meta.get("vram_gb") is not None:
                 try:
                     return float(meta.get("vram_gb"))
@@ -2106,24 +2002,24 @@ class BenchmarkScraper(BaseScraper):
                 return None
         return None
 
-    def _calculate_confidence(self, fps_data: Dict[str, Any]) -> float:
+    def _calculate_confidence(self, rec: BenchmarkRecord) -> float:
         """計算資料可信度分數 (0.0 - 1.0)"""
         score = 0.0
         
         # 有 avg_fps 加 0.4
-        if fps_data.get("avg_fps") is not None:
+        if rec.avg_fps is not None:
             score += 0.4
         
         # 有 p1_low 加 0.3
-        if fps_data.get("p1_low") is not None:
+        if rec.p1_low is not None:
             score += 0.3
         
         # 有 p0_1_low 加 0.2
-        if fps_data.get("p0_1_low") is not None:
+        if rec.p0_1_low is not None:
             score += 0.2
         
         # 有額外資訊（CPU/GPU 使用率等）加 0.1
-        if fps_data.get("gpu_usage") or fps_data.get("cpu_usage"):
+        if rec.gpu_usage or rec.cpu_usage:
             score += 0.1
         
         return min(score, 1.0)
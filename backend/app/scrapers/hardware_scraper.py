@@ -17,6 +17,8 @@ class HardwareScraper(BaseScraper):
         self.base_url = "https://www.techpowerup.com"
         self.source_name = "TechPowerUp GPU Database"
         self.last_fetch_time: Optional[str] = None
+        # 網路來源失敗、改用內建清單時為 True（背景更新據此判斷要不要保留上一份快照）
+        self.used_fallback = False
     
     async def fetch_hardware_list(
         self,
@@ -30,6 +32,7 @@ class HardwareScraper(BaseScraper):
         await self.initialize()
         
         hardware_list = []
+        self.used_fallback = False
         
         # 範例：從 TechPowerUp 抓取 GPU 列表
         # 實際實作需要根據網站結構調整
@@ -47,6 +50,7 @@ class HardwareScraper(BaseScraper):
         except Exception as e:
             print(f"抓取硬體列表失敗: {e}")
             # 如果主要來源失敗，嘗試備用來源
+            self.used_fallback = True
             hardware_list = await self._fetch_from_fallback_source(category, search)
         
         return hardware_list
@@ -103,6 +107,7 @@ class HardwareScraper(BaseScraper):
         
         # 如果無法從網路取得，提供常用 GPU 列表（僅用於開發測試）
         if not gpu_list:
+            self.used_fallback = True
             gpu_list = self._get_default_gpu_list(search)
         
         return gpu_list
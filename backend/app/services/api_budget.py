@@ -0,0 +1,265 @@
+"""
+付費搜尋 API 額度管理（Google Custom Search / SerpApi）
+
+- 每個 provider 有每日與每分鐘上限（0 = 不限制）；每日計數以 UTC 日期計算並持久化到 JSON，
+  API server 與 tools/scripts 共用同一份計數
+- 優先等級：interactive（使用者請求）> prewarm（批次預熱/收集工具）> enrichment（背景補強）
+  低優先等級只能用到上限扣掉保留比例的部分，剩下的額度保留給 interactive，
+  批次工作不會把使用者請求需要的額度用光
+- 額度不足時：prewarm 等待每分鐘視窗釋放（有上限），其餘直接丟出 BudgetExhausted
+  由呼叫端降級（interactive 走預測模型、enrichment 延後重試）
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import IO, Any, Deque, Dict, Iterator, Optional
+
+try:
+    import fcntl
+
+    def _lock_file(f: IO[Any]) -> None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+
+    def _unlock_file(f: IO[Any]) -> None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+except ImportError:  # Windows
+    import msvcrt
+
+    def _lock_file(f: IO[Any]) -> None:
+        f.seek(0)
+        while True:
+            try:
+                # LK_LOCK 重試約 10 秒仍拿不到會丟 OSError，持續等待直到取得
+                msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                return
+            except OSError:
+                continue
+
+    def _unlock_file(f: IO[Any]) -> None:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+PRIORITY_INTERACTIVE = "interactive"
+PRIORITY_PREWARM = "prewarm"
+PRIORITY_ENRICHMENT = "enrichment"
+PRIORITIES = (PRIORITY_INTERACTIVE, PRIORITY_PREWARM, PRIORITY_ENRICHMENT)
+
+PROVIDER_GOOGLE_CSE = "google_cse"
+PROVIDER_SERPAPI = "serpapi"
+
+
+class BudgetExhausted(Exception):
+    """額度不足，本次呼叫被延後/捨棄；retry_after 為建議的重試秒數"""
+
+    def __init__(self, provider: str, priority: str, reason: str, retry_after: float):
+        super().__init__(f"{provider} 額度不足（{reason}, priority={priority}），約 {int(retry_after)} 秒後可重試")
+        self.provider = provider
+        self.priority = priority
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+@dataclass
+class ProviderLimits:
+    daily: int = 0
+    per_minute: int = 0
+
+
+def _today() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d")
+
+
+def _seconds_until_utc_midnight() -> float:
+    now = datetime.now(timezone.utc)
+    return float(86400 - (now.hour * 3600 + now.minute * 60 + now.second))
+
+
+def _cap(limit: int, reserve: float) -> int:
+    """扣掉保留比例後，該優先等級可用的上限（至少 1）"""
+    return max(1, int(limit * (1.0 - reserve)))
+
+
+@dataclass
+class ApiBudgetManager:
+    """
+    JSON 持久化格式：
+    {"version": 1, "day": "YYYY-MM-DD", "providers": {"google_cse": {"used": n, "by_priority": {...}, "shed": {...}}}}
+
+    每分鐘視窗只存在記憶體（單一 process 內的平滑化）；每日計數的「讀檔 → 累加 → 寫檔」
+    在跨 process 的 advisory lock（{file_path}.lock；POSIX 用 fcntl.flock、Windows 用 msvcrt.locking）
+    內完成，多個 process 同時執行時不會互相蓋掉計數。持有者中止時由 OS 釋放鎖，不需逾時接手。
+    鎖與檔案 I/O 都在 executor 執行緒中進行，不會阻塞 event loop。
+    """
+
+    file_path: str
+    _lock: asyncio.Lock
+    limits: Dict[str, ProviderLimits]
+    reserves: Dict[str, float]
+    prewarm_max_wait: float = 60.0
+    _data: Dict[str, Any] = field(default_factory=dict)
+    _minute: Dict[str, Deque[float]] = field(default_factory=dict)
+    _mtime: Optional[float] = None
+
+    @classmethod
+    def create_default(cls) -> "ApiBudgetManager":
+        base = os.path.normpath(os.path.join(os.path.dirname(__file__), "..", ".."))
+        fp = os.getenv("API_BUDGET_PATH") or os.path.join(base, "data", "api_budget.json")
+        return cls(
+            file_path=fp,
+            _lock=asyncio.Lock(),
+            limits={
+                PROVIDER_GOOGLE_CSE: ProviderLimits(
+                    daily=int(os.getenv("GOOGLE_CSE_DAILY_LIMIT", "100")),
+                    per_minute=int(os.getenv("GOOGLE_CSE_MINUTE_LIMIT", "60")),
+                ),
+                PROVIDER_SERPAPI: ProviderLimits(
+                    daily=int(os.getenv("SERPAPI_DAILY_LIMIT", "100")),
+                    per_minute=int(os.getenv("SERPAPI_MINUTE_LIMIT", "30")),
+                ),
+            },
+            reserves={
+                PRIORITY_INTERACTIVE: 0.0,
+                PRIORITY_PREWARM: float(os.getenv("API_BUDGET_RESERVE_PREWARM", "0.3")),
+                PRIORITY_ENRICHMENT: float(os.getenv("API_BUDGET_RESERVE_ENRICHMENT", "0.5")),
+            },
+            prewarm_max_wait=float(os.getenv("API_BUDGET_PREWARM_MAX_WAIT_SECONDS", "60")),
+        )
+
+    @contextmanager
+    def _file_lock(self) -> Iterator[None]:
+        os.makedirs(os.path.dirname(self.file_path), exist_ok=True)
+        # 鎖檔常駐不刪除：刪除後重建會讓不同 process 鎖在不同的 inode 上
+        with open(f"{self.file_path}.lock", "a+b") as f:
+            _lock_file(f)
+            try:
+                yield
+            finally:
+                _unlock_file(f)
+
+    def _reload_if_changed(self, force: bool = False) -> None:
+        try:
+            mtime = os.path.getmtime(self.file_path)
+        except OSError:
+            return
+        if mtime == self._mtime and not force:
+            return
+        try:
+            with open(self.file_path, "r", encoding="utf-8") as f:
+                raw = json.load(f) or {}
+            if isinstance(raw, dict):
+                self._data = raw
+            self._mtime = mtime
+        except Exception:
+            pass
+
+    def _roll_day(self) -> None:
+        day = _today()
+        if self._data.get("day") != day:
+            self._data = {"version": 1, "day": day, "providers": {}}
+
+    def _provider_state(self, provider: str) -> Dict[str, Any]:
+        providers = self._data.setdefault("providers", {})
+        st = providers.setdefault(provider, {})
+        st.setdefault("used", 0)
+        st.setdefault("by_priority", {})
+        st.setdefault("shed", {})
+        return st
+
+    def _save(self) -> None:
+        os.makedirs(os.path.dirname(self.file_path), exist_ok=True)
+        self._data["updated_at"] = datetime.now().isoformat()
+        # 多個 process 共用同一份檔案：tmp 檔名加上 pid
+        tmp = f"{self.file_path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self._data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, self.file_path)
+        try:
+            self._mtime = os.path.getmtime(self.file_path)
+        except OSError:
+            self._mtime = None
+
+    def _count_shed(self, st: Dict[str, Any], priority: str) -> None:
+        st["shed"][priority] = int(st["shed"].get(priority) or 0) + 1
+        self._save()
+
+    def _try_acquire(self, provider: str, priority: str) -> float:
+        """成功回傳 0；每分鐘視窗已滿回傳需等待秒數；每日額度不足丟出 BudgetExhausted"""
+        with self._file_lock():
+            # 鎖內一律重新讀檔：其他 process 的累加不會被這次寫入蓋掉
+            self._reload_if_changed(force=True)
+            self._roll_day()
+            st = self._provider_state(provider)
+            lim = self.limits.get(provider) or ProviderLimits()
+            reserve = self.reserves.get(priority, 0.0)
+
+            if lim.daily > 0 and int(st["used"]) >= _cap(lim.daily, reserve):
+                self._count_shed(st, priority)
+                raise BudgetExhausted(provider, priority, "daily", _seconds_until_utc_midnight())
+
+            now = time.monotonic()
+            window = self._minute.setdefault(provider, deque())
+            while window and now - window[0] >= 60.0:
+                window.popleft()
+            if lim.per_minute > 0 and len(window) >= _cap(lim.per_minute, reserve):
+                return max(0.05, 60.0 - (now - window[0]))
+
+            window.append(now)
+            st["used"] = int(st["used"]) + 1
+            st["by_priority"][priority] = int(st["by_priority"].get(priority) or 0) + 1
+            self._save()
+            return 0.0
+
+    def _record_shed(self, provider: str, priority: str) -> None:
+        with self._file_lock():
+            self._reload_if_changed(force=True)
+            self._roll_day()
+            self._count_shed(self._provider_state(provider), priority)
+
+    async def acquire(self, provider: str, priority: str = PRIORITY_INTERACTIVE) -> None:
+        """
+        預扣一次 API 呼叫額度；不足時丟出 BudgetExhausted。
+        只有 prewarm 會等待每分鐘視窗釋放（最多 prewarm_max_wait 秒）。
+        """
+        max_wait = self.prewarm_max_wait if priority == PRIORITY_PREWARM else 0.0
+        waited = 0.0
+        loop = asyncio.get_running_loop()
+        while True:
+            # asyncio 鎖讓同一 process 內同時只有一個執行緒改動記憶體狀態
+            async with self._lock:
+                wait = await loop.run_in_executor(None, self._try_acquire, provider, priority)
+                if wait <= 0:
+                    return
+                if waited + wait > max_wait:
+                    await loop.run_in_executor(None, self._record_shed, provider, priority)
+                    raise BudgetExhausted(provider, priority, "per_minute", wait)
+            await asyncio.sleep(wait)
+            waited += wait
+
+    async def snapshot(self) -> Dict[str, Any]:
+        """目前的使用量與各優先等級可用上限（/api-budget 用）"""
+        async with self._lock:
+            await asyncio.get_running_loop().run_in_executor(None, self._reload_if_changed)
+            self._roll_day()
+            out: Dict[str, Any] = {"day": self._data.get("day"), "providers": {}}
+            for provider, lim in self.limits.items():
+                st = self._provider_state(provider)
+                out["providers"][provider] = {
+                    "used": int(st["used"]),
+                    "daily_limit": lim.daily,
+                    "per_minute_limit": lim.per_minute,
+                    "caps": {p: (_cap(lim.daily, self.reserves.get(p, 0.0)) if lim.daily > 0 else None) for p in PRIORITIES},
+                    "by_priority": dict(st["by_priority"]),
+                    "shed": dict(st["shed"]),
+                }
+            return out
+
+
+api_budget = ApiBudgetManager.create_default()
@@ -0,0 +1,274 @@
+"""
+單筆基準結果（BenchmarkRecord）
+
+過去管線每一段都以 dict 傳遞並各自複製（{**cached, ...}、dict(fps_data)），GPU/CPU/RAM 使用率先被格式化進
+notes 字串，API 再對每筆結果用 regex 從 notes 解析回數值。BenchmarkRecord 在資料來源（快取 / seed / 網搜 / 預測）
+產生結果後建立一次，後續各段（RT/CPU 調整、補齊 low、VRAM 提示、校正）直接修改同一個物件：
+
+- 使用率、low、來源等級（source_tier）、置信度都是欄位
+- notes 由 tags（" | " 分隔）與 remarks（"；" 分隔）組成，只在輸出（to_payload / to_response）時才組成字串
+- 快取同時寫入數值使用率與 tags/remarks；舊版快取列只有 notes，載入時解析一次（parse_usage_note）
+"""
+from __future__ import annotations
+
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+# 來源等級：決定是否排入背景 enrichment、RT 懲罰是否已套用過等
+TIER_PREDICTED = "predicted"
+TIER_REAL = "real"
+TIER_SCALED = "scaled"
+TIER_WEB = "web"
+TIER_CACHE = "cache"
+TIER_UNKNOWN = "unknown"
+
+_TIER_BY_SOURCE = {
+    "Predicted Model": TIER_PREDICTED,
+    "Real Benchmark Database": TIER_REAL,
+    "Real Benchmark Database (scaled)": TIER_SCALED,
+    "GoogleSearchSnippet": TIER_WEB,
+    "TechPowerUp": TIER_WEB,
+    "GPUCheck": TIER_WEB,
+    "VideoCardBenchmark": TIER_WEB,
+    "Local Benchmark Cache": TIER_CACHE,
+    "Local Benchmark Cache (GPU-base)": TIER_CACHE,
+}
+
+# 舊 notes 中表示「RT/PT 已處理過」的字樣（避免重複懲罰）
+_RT_MARKERS = ("RT/PT", "啟用 RT", "啟用RT", "光追", "光線追蹤", "路徑追蹤")
+
+_HEAD_SPLIT_RE = re.compile(r"[|；;\n\r]+")
+_GPU_USAGE_RE = re.compile(r"GPU[:：\s]+(\d+(?:\.\d+)?)\s*(?:%|％)?", re.IGNORECASE)
+_CPU_USAGE_RE = re.compile(r"CPU[:：\s]+(\d+(?:\.\d+)?)\s*(?:%|％)?", re.IGNORECASE)
+_MEM_USAGE_RE = re.compile(r"(?:RAM|Memory|記憶體)[:：\s]+(\d+(?:\.\d+)?)\s*(?:%|％)?", re.IGNORECASE)
+_USAGE_SEGMENT_RE = re.compile(r"^\s*GPU[:：\s]+\d", re.IGNORECASE)
+
+
+def tier_for_source(source: Any) -> str:
+    return _TIER_BY_SOURCE.get(str(source or ""), TIER_UNKNOWN)
+
+
+def parse_usage_note(notes: Any) -> Tuple[Optional[float], Optional[float], Optional[float]]:
+    """
+    從舊格式 notes 解析 GPU/CPU/RAM 使用率（只用於沒有數值欄位的舊快取列 / 舊 client）。
+    相容格式：
+    - GPU: 63%, CPU: 99%, RAM: 80%
+    - GPU：63％ CPU：99％ RAM：80％
+    - 多段 notes（以 | / ； 等分隔）→ 取第一組（當前結果放在最前面）
+    """
+    if not notes:
+        return None, None, None
+    # 取最前段，避免 v2 汙染或多 CPU 疊加造成解析到錯段
+    head = _HEAD_SPLIT_RE.split(str(notes), maxsplit=1)[0]
+
+    def first_num(pattern: "re.Pattern[str]") -> Optional[float]:
+        m = pattern.search(head)
+        if not m:
+            return None
+        try:
+            return float(m.group(1))
+        except Exception:
+            return None
+
+    return first_num(_GPU_USAGE_RE), first_num(_CPU_USAGE_RE), first_num(_MEM_USAGE_RE)
+
+
+def _opt_float(x: Any) -> Optional[float]:
+    try:
+        return None if x is None else float(x)
+    except Exception:
+        return None
+
+
+def _split_legacy_notes(notes: str) -> Tuple[List[str], List[str]]:
+    """舊 notes → (tags, remarks)；使用率段落會去掉（由數值欄位重新產生）"""
+    chunks = [c.strip() for c in notes.split("；")]
+    tags = [s.strip() for s in chunks[0].split("|") if s.strip() and not _USAGE_SEGMENT_RE.match(s)]
+    remarks = [c for c in chunks[1:] if c and not _USAGE_SEGMENT_RE.match(c)]
+    return tags, remarks
+
+
+class BenchmarkRecord:
+    """單一 game × resolution × settings × GPU × CPU 的結果（管線內共用同一個物件，不再逐段複製 dict）"""
+
+    __slots__ = (
+        "game", "resolution", "settings", "gpu", "cpu",
+        "avg_fps", "p1_low", "p0_1_low",
+        "gpu_usage", "cpu_usage", "memory_usage",
+        "source", "source_tier", "confidence_override", "confidence_score",
+        "tags", "remarks", "rt_applied", "raw_snippet", "model_version",
+        "ram_gb", "ram_type", "ram_speed_mhz", "ram_latency_ns", "storage_type",
+        "timestamp", "is_degraded", "bottleneck_analysis",
+        "vram_required_gb", "vram_selected_gb", "vram_is_enough", "vram_margin_gb",
+    )
+
+    def __init__(
+        self,
+        avg_fps: Optional[float] = None,
+        p1_low: Optional[float] = None,
+        p0_1_low: Optional[float] = None,
+        source: str = "",
+        source_tier: Optional[str] = None,
+    ):
+        self.game = ""
+        self.resolution = ""
+        self.settings = ""
+        self.gpu = ""
+        self.cpu = ""
+        self.avg_fps = avg_fps
+        self.p1_low = p1_low
+        self.p0_1_low = p0_1_low
+        self.gpu_usage: Optional[float] = None
+        self.cpu_usage: Optional[float] = None
+        self.memory_usage: Optional[float] = None
+        self.source = source
+        self.source_tier = source_tier or tier_for_source(source)
+        self.confidence_override: Optional[float] = None
+        self.confidence_score = 0.0
+        self.tags: List[str] = []
+        self.remarks: List[str] = []
+        self.rt_applied = False
+        self.raw_snippet = ""
+        self.model_version: Optional[int] = None
+        self.ram_gb: Optional[float] = None
+        self.ram_type: Optional[str] = None
+        self.ram_speed_mhz: Optional[int] = None
+        self.ram_latency_ns: Optional[float] = None
+        self.storage_type: Optional[str] = None
+        self.timestamp = ""
+        self.is_degraded = False
+        self.bottleneck_analysis: Optional[dict] = None
+        self.vram_required_gb: Optional[float] = None
+        self.vram_selected_gb: Optional[float] = None
+        self.vram_is_enough: Optional[bool] = None
+        self.vram_margin_gb: Optional[float] = None
+
+    @classmethod
+    def from_payload(cls, d: Dict[str, Any], source: Optional[str] = None) -> "BenchmarkRecord":
+        """
+        由來源 dict（預測 / seed / 網搜結果，或快取列）建立。
+        source：覆寫顯示用來源（例如快取命中顯示 "Local Benchmark Cache"）；source_tier 仍依原始來源判斷。
+        """
+        origin = str(d.get("source") or "")
+        rec = cls(
+            avg_fps=_opt_float(d.get("avg_fps")),
+            p1_low=_opt_float(d.get("p1_low")),
+            p0_1_low=_opt_float(d.get("p0_1_low")),
+            source=source or origin,
+            source_tier=tier_for_source(origin),
+        )
+        for name in ("game", "resolution", "settings", "gpu", "cpu"):
+            if d.get(name):
+                setattr(rec, name, str(d.get(name)))
+        rec.confidence_override = _opt_float(d.get("confidence_override"))
+        rec.raw_snippet = str(d.get("raw_snippet") or "")
+        rec.model_version = d.get("model_version")
+        rec.ram_gb = d.get("ram_gb")
+        rec.ram_type = d.get("ram_type")
+        rec.ram_speed_mhz = d.get("ram_speed_mhz")
+        rec.ram_latency_ns = d.get("ram_latency_ns")
+        rec.storage_type = d.get("storage_type")
+
+        notes = str(d.get("notes") or "")
+        if "note_tags" in d:
+            # 新格式：數值與 notes 結構都已存好，不需解析
+            rec.tags = [str(t) for t in d.get("note_tags") or []]
+            rec.remarks = [str(t) for t in d.get("note_remarks") or []]
+            rec.rt_applied = bool(d.get("rt_applied"))
+        else:
+            rec.tags, rec.remarks = _split_legacy_notes(notes)
+            rec.rt_applied = bool(d.get("rt_applied")) or any(k in notes for k in _RT_MARKERS)
+
+        usage = (d.get("gpu_usage"), d.get("cpu_usage"), d.get("memory_usage"))
+        if all(u is None for u in usage) and notes:
+            usage = parse_usage_note(notes)
+        rec.set_usage(*usage)
+        return rec
+
+    def set_usage(self, gpu: Any, cpu: Any, memory: Any) -> None:
+        # 與 notes 顯示一致（整數 %）
+        vals = [_opt_float(v) for v in (gpu, cpu, memory)]
+        self.gpu_usage, self.cpu_usage, self.memory_usage = (None if v is None else float(round(v)) for v in vals)
+
+    def has_usage(self) -> bool:
+        return self.gpu_usage is not None and self.cpu_usage is not None and self.memory_usage is not None
+
+    def scale_fps(self, factor: float) -> None:
+        for name in ("avg_fps", "p1_low", "p0_1_low"):
+            v = getattr(self, name)
+            if v is not None:
+                setattr(self, name, round(float(v) * float(factor), 1))
+
+    def cap_confidence(self, cap: float, default: float) -> None:
+        """confidence_override 取 min（尚未設定時以 default 計）"""
+        cur = self.confidence_override if self.confidence_override is not None else default
+        self.confidence_override = min(float(cur), float(cap))
+
+    def render_notes(self) -> Optional[str]:
+        parts: List[str] = []
+        if self.has_usage():
+            parts.append(f"GPU: {self.gpu_usage:.0f}%, CPU: {self.cpu_usage:.0f}%, RAM: {self.memory_usage:.0f}%")
+        parts.extend(t for t in self.tags if t)
+        text = "；".join([p for p in [" | ".join(parts)] + self.remarks if p]).strip()
+        return text or None
+
+    def to_payload(self) -> Dict[str, Any]:
+        """快取列 / 相容 dict 介面（tools 讀 avg_fps、notes…）"""
+        return {
+            "avg_fps": self.avg_fps,
+            "p1_low": self.p1_low,
+            "p0_1_low": self.p0_1_low,
+            "notes": self.render_notes(),
+            "raw_snippet": self.raw_snippet,
+            "source": self.source,
+            "confidence_override": self.confidence_override,
+            "model_version": self.model_version,
+            "ram_gb": self.ram_gb,
+            "storage_type": self.storage_type,
+            "gpu_usage": self.gpu_usage,
+            "cpu_usage": self.cpu_usage,
+            "memory_usage": self.memory_usage,
+            "note_tags": list(self.tags),
+            "note_remarks": list(self.remarks),
+            "rt_applied": self.rt_applied,
+        }
+
+    def to_response(self) -> Dict[str, Any]:
+        """API 回應（欄位對應 app.api.benchmarks.BenchmarkResult）"""
+        return {
+            "game": self.game,
+            "resolution": self.resolution,
+            "settings": self.settings,
+            "gpu": self.gpu,
+            "cpu": self.cpu,
+            "avg_fps": self.avg_fps,
+            "p1_low": self.p1_low,
+            "p0_1_low": self.p0_1_low,
+            "source": self.source,
+            "timestamp": self.timestamp,
+            "notes": self.render_notes(),
+            "confidence_score": self.confidence_score,
+            "is_incomplete": self.is_incomplete,
+            "is_degraded": self.is_degraded,
+            "bottleneck_analysis": self.bottleneck_analysis,
+            "vram_required_gb": self.vram_required_gb,
+            "vram_selected_gb": self.vram_selected_gb,
+            "vram_is_enough": self.vram_is_enough,
+            "vram_margin_gb": self.vram_margin_gb,
+            "ram_gb": self.ram_gb,
+            "ram_type": self.ram_type,
+            "ram_speed_mhz": self.ram_speed_mhz,
+            "ram_latency_ns": self.ram_latency_ns,
+            "storage_type": self.storage_type,
+            "gpu_usage": self.gpu_usage,
+            "cpu_usage": self.cpu_usage,
+            "memory_usage": self.memory_usage,
+        }
+
+    @property
+    def is_incomplete(self) -> bool:
+        return self.avg_fps is None or self.p1_low is None
+
+    @property
+    def notes(self) -> Optional[str]:
+        return self.render_notes()
@@ -0,0 +1,199 @@
+"""
+依賴變更偵測：hw_performance_override.json / MODEL_VERSION 變動時，只讓相依的快取資料失效
+
+- 上次套用的 override 內容與 MODEL_VERSION 記在 data/cache_dependencies.json
+- override 檔 hash 沒變、版本也沒變 → 不做任何事（不掃描 v1/v2）
+- 有變動時比對新舊 override，只取出分數有變的 GPU/CPU，透過 v1/v2 的依賴索引找出相依的預測資料並刪除；
+  下次查詢時由現行模型（與新的 override）重新產生
+- 真實資料（非 Predicted Model）不受 override/模型版本影響，不會被刪除
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from app.db import benchmark_store, benchmark_store_v2
+
+
+def _read_overrides(path: str) -> Dict[str, Dict[str, Any]]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            raw = json.load(f) or {}
+    except FileNotFoundError:
+        raw = {}
+    return {
+        "gpus": dict(raw.get("gpus") or {}),
+        "cpus": dict(raw.get("cpus") or {}),
+    }
+
+
+def _digest(overrides: Dict[str, Any]) -> str:
+    return hashlib.sha256(json.dumps(overrides, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def _changed_names(old: Dict[str, Any], new: Dict[str, Any]) -> List[str]:
+    """新增、刪除或分數改變的型號"""
+    return sorted(k for k in set(old) | set(new) if old.get(k) != new.get(k))
+
+
+@dataclass
+class DependencyTracker:
+    state_path: str
+    overrides_path: str
+    _lock: asyncio.Lock
+    watch_interval_seconds: float = 30.0
+    _task: Optional[asyncio.Task] = None
+    _overrides_mtime: Optional[float] = None
+
+    @classmethod
+    def create_default(cls) -> "DependencyTracker":
+        base = os.path.normpath(os.path.join(os.path.dirname(__file__), "..", ".."))
+        return cls(
+            state_path=os.path.join(base, "data", "cache_dependencies.json"),
+            overrides_path=os.path.join(base, "data", "hw_performance_override.json"),
+            _lock=asyncio.Lock(),
+            watch_interval_seconds=float(os.getenv("DEPENDENCY_WATCH_SECONDS", "30")),
+        )
+
+    def _load_state(self) -> Dict[str, Any]:
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                return json.load(f) or {}
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            print(f"讀取快取依賴狀態失敗: {e}")
+            return {}
+
+    def _save_state(self, state: Dict[str, Any]) -> None:
+        os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+        tmp = f"{self.state_path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, self.state_path)
+
+    async def invalidate(
+        self,
+        gpus: Iterable[str] = (),
+        cpus: Iterable[str] = (),
+        games: Iterable[str] = (),
+        stale_model_version: Optional[Any] = None,
+        predicted_only: bool = True,
+        dry_run: bool = False,
+    ) -> Dict[str, int]:
+        """
+        刪除相依的 v1/v2 資料，回傳各 store 的筆數。
+        GPU/CPU 以「包含」比對（與 override 的套用規則相同）；v2 是 GPU-base，不受 CPU 影響。
+        """
+        gpus, cpus, games = list(gpus), list(cpus), list(games)
+        v1_keys = await benchmark_store.find_dependents(
+            gpus=gpus,
+            cpus=cpus,
+            games=games,
+            substring=True,
+            predicted_only=predicted_only,
+            stale_model_version=stale_model_version,
+        )
+        v2_keys = await benchmark_store_v2.find_dependents(
+            gpus=gpus,
+            games=games,
+            substring=True,
+            predicted_only=predicted_only,
+            stale_model_version=stale_model_version,
+        )
+        if dry_run:
+            return {"v1": len(v1_keys), "v2": len(v2_keys)}
+        return {
+            "v1": await benchmark_store.delete_keys(v1_keys),
+            "v2": await benchmark_store_v2.delete_keys(v2_keys),
+        }
+
+    async def sync(self, model_version: Optional[Any] = None, dry_run: bool = False) -> Dict[str, Any]:
+        """比對 override 檔與 MODEL_VERSION；第一次執行只記錄基準，不刪除資料"""
+        if model_version is None:
+            # 延遲 import：benchmark_scraper 會間接 import services
+            from app.scrapers.benchmark_scraper import BenchmarkScraper
+
+            model_version = BenchmarkScraper.MODEL_VERSION
+
+        async with self._lock:
+            try:
+                self._overrides_mtime = os.path.getmtime(self.overrides_path)
+            except OSError:
+                self._overrides_mtime = None
+            overrides = _read_overrides(self.overrides_path)
+            digest = _digest(overrides)
+            state = self._load_state()
+            result: Dict[str, Any] = {"changed": False, "model_version": model_version, "overrides_hash": digest[:12]}
+
+            if state and state.get("overrides_hash") == digest and state.get("model_version") == model_version:
+                return result
+
+            if state:
+                old = state.get("overrides") or {}
+                gpus = _changed_names(old.get("gpus") or {}, overrides["gpus"])
+                cpus = _changed_names(old.get("cpus") or {}, overrides["cpus"])
+                stale = model_version if state.get("model_version") != model_version else None
+                removed = await self.invalidate(gpus=gpus, cpus=cpus, stale_model_version=stale, dry_run=dry_run)
+                result.update(
+                    changed=True,
+                    gpus=gpus,
+                    cpus=cpus,
+                    model_version_changed=stale is not None,
+                    removed=removed,
+                )
+            else:
+                result["baseline"] = True
+
+            if not dry_run:
+                self._save_state({
+                    "model_version": model_version,
+                    "overrides_hash": digest,
+                    "overrides": overrides,
+                    "updated_at": datetime.now().isoformat(),
+                })
+            return result
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except (asyncio.CancelledError, Exception):
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        """啟動時同步一次；之後定期檢查 override 檔 mtime（DEPENDENCY_WATCH_SECONDS=0 則不監看）"""
+        while True:
+            try:
+                result = await self.sync()
+                if result.get("changed"):
+                    print(f"快取依賴變更，已失效相依資料: {result}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"快取依賴同步失敗: {e}")
+            if self.watch_interval_seconds <= 0:
+                return
+            while True:
+                await asyncio.sleep(self.watch_interval_seconds)
+                try:
+                    mtime: Optional[float] = os.path.getmtime(self.overrides_path)
+                except OSError:
+                    mtime = None
+                if mtime != self._overrides_mtime:
+                    break
+
+
+dependency_tracker = DependencyTracker.create_default()
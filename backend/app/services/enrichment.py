@@ -0,0 +1,136 @@
+"""
+背景 web enrichment
+
+由預測模型（Predicted Model）回應的組合會被記錄到持久化佇列（app.db.enrichment_queue）。
+背景 worker 在 global rate limiter 之下逐一處理：跑 Google 搜尋與站點爬蟲，
+找到真實數據就寫回 v1 快取，之後的查詢即可命中真實資料。
+使用者請求不必等待網路抓取，資料品質在關鍵路徑之外逐步提升。
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+from typing import List, Optional
+
+from app.db.enrichment_queue import enrichment_queue
+from app.scrapers.base_scraper import global_rate_limiter
+from app.services.api_budget import PRIORITY_ENRICHMENT, BudgetExhausted
+
+
+async def enqueue_enrichment(
+    game: str,
+    resolution: str,
+    settings: Optional[str],
+    gpu: dict,
+    cpu: dict,
+    reason: str = "",
+    delay_seconds: float = 0.0,
+) -> bool:
+    """記錄需要背景補強的組合；已在佇列中（或冷卻期內）回傳 False"""
+    effective_settings = (settings or "High").strip() or "High"
+    try:
+        added = await enrichment_queue.enqueue(
+            game=game,
+            resolution=resolution,
+            settings=effective_settings,
+            gpu=str(gpu.get("model") or "Unknown GPU"),
+            cpu=str(cpu.get("model") or "Unknown CPU"),
+            reason=reason,
+            delay_seconds=delay_seconds,
+        )
+    except Exception as e:
+        print(f"寫入 enrichment 佇列失敗: {e}")
+        return False
+    if added:
+        enrichment_worker.notify()
+    return added
+
+
+class EnrichmentWorker:
+    """在 app 生命週期內常駐的背景 worker（startup 啟動、shutdown 停止）"""
+
+    def __init__(self):
+        self.concurrency = max(1, int(os.getenv("ENRICH_WORKERS", "1")))
+        self.idle_poll_seconds = float(os.getenv("ENRICH_POLL_SECONDS", "30"))
+        self.enabled = os.getenv("ENRICH_ENABLED", "1").strip().lower() not in ("0", "false", "no")
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def notify(self) -> None:
+        """有新 job 時喚醒閒置中的 worker"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def start(self) -> None:
+        if not self.enabled or self._tasks:
+            return
+        self._wakeup = asyncio.Event()
+        for i in range(self.concurrency):
+            self._tasks.append(asyncio.create_task(self._run(i)))
+
+    async def stop(self) -> None:
+        for t in self._tasks:
+            t.cancel()
+        for t in self._tasks:
+            try:
+                await t
+            except (asyncio.CancelledError, Exception):
+                pass
+        self._tasks = []
+        self._wakeup = None
+
+    async def _idle(self) -> None:
+        wait = await enrichment_queue.next_due_in()
+        timeout = self.idle_poll_seconds if wait is None else min(self.idle_poll_seconds, max(wait, 0.5))
+        if self._wakeup is None:
+            await asyncio.sleep(timeout)
+            return
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+        if self._wakeup is not None:
+            self._wakeup.clear()
+
+    async def _run(self, worker_id: int) -> None:
+        # 延遲 import：benchmark_scraper 本身會 import 這個模組
+        from app.scrapers.benchmark_scraper import BenchmarkScraper
+
+        scraper: Optional[BenchmarkScraper] = None
+        try:
+            while True:
+                job = await enrichment_queue.claim_next()
+                if job is None:
+                    await self._idle()
+                    continue
+
+                await global_rate_limiter.wait()
+                if scraper is None:
+                    scraper = BenchmarkScraper()
+                    scraper.rate_limiter = global_rate_limiter
+                    # 搜尋 API 額度：enrichment 等級最低，額度偏低時先讓給使用者請求
+                    scraper.api_priority = PRIORITY_ENRICHMENT
+                    await scraper.initialize()
+                try:
+                    found = await scraper.enrich_from_web(
+                        job["game"],
+                        job["resolution"],
+                        job["settings"],
+                        {"category": "gpu", "model": job["gpu"]},
+                        {"category": "cpu", "model": job["cpu"]},
+                    )
+                    await enrichment_queue.complete(job["key"], found=found)
+                except asyncio.CancelledError:
+                    raise
+                except BudgetExhausted as e:
+                    # 額度不足不算失敗：延後到額度恢復後再試
+                    await enrichment_queue.defer(job["key"], max(self.idle_poll_seconds, e.retry_after), str(e))
+                except Exception as e:
+                    print(f"背景 enrichment 失敗 (worker={worker_id}, {job.get('game')} / {job.get('gpu')} / {job.get('cpu')}): {e}")
+                    await enrichment_queue.fail(job["key"], str(e))
+        finally:
+            if scraper is not None:
+                await scraper.close()
+
+
+enrichment_worker = EnrichmentWorker()
@@ -0,0 +1,213 @@
+"""
+FPS 數字擷取
+
+- 單一預先編譯的 regex，一次掃描；每個數字只產生一個候選（含 confidence 與 span）
+- 結果頁面以串流方式讀取：最多讀 max_bytes，邊讀邊去除標記、邊擷取，
+  候選數量足夠就提前停止，每個頁面的記憶體與 CPU 都有上限
+"""
+from __future__ import annotations
+
+import codecs
+import html
+import re
+from dataclasses import dataclass
+from typing import Iterator, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import httpx
+
+
+@dataclass
+class FpsCandidate:
+    avg_fps: float
+    raw: str
+    confidence: float
+    # 在來源文字中的位置 (start, end)
+    span: Tuple[int, int] = (0, 0)
+
+
+# --- 合併後的單一 pattern（snippet/標題/頁面文字共用，一次掃描） ---
+# - avg: 可選的「平均」字眼前綴（有前綴的候選 confidence 較高）
+# - lo/hi: 數值或範圍（"60-70 fps" 取平均）；範圍必須有分隔符，避免 "RTX 4090 120 fps" 被當成範圍
+# - (?<![\d.]) 避免從數字中段開始比對（串流分段掃描時也不會截到半個數字）
+_FPS_RE = re.compile(
+    r"(?:(?P<avg>average\s*fps|avg\s*fps|average|avg|mean|平均|around|about)[\s:=\-]{0,8})?"
+    r"(?<![\d.])(?P<lo>\d+(?:\.\d+)?)"
+    r"(?:\s*(?:-|to|~)\s*(?P<hi>\d+(?:\.\d+)?))?"
+    r"\s*fps",
+    re.IGNORECASE,
+)
+_MIN_FPS = 5.0
+_MAX_FPS = 1000.0
+
+
+def _iter_fps_matches(text: str, pos: int = 0, endpos: Optional[int] = None) -> Iterator[Tuple[re.Match, float]]:
+    """逐一產生 (match, 數值)；範圍取平均值，只保留合理範圍 (5~1000)"""
+    end = len(text) if endpos is None else endpos
+    for m in _FPS_RE.finditer(text, pos, end):
+        v = float(m.group("lo"))
+        hi = m.group("hi")
+        if hi:
+            v = (v + float(hi)) / 2.0
+        if _MIN_FPS <= v <= _MAX_FPS:
+            yield m, v
+
+
+def extract_fps_candidates(text: str, pos: int = 0, endpos: Optional[int] = None) -> List[FpsCandidate]:
+    """
+    從文字抓數字（單一 pattern、一次掃描，每個數字只產生一個候選）：
+    - 支援 "120 FPS", "avg 144 fps", "平均 165 fps", "60-70 fps" 等
+    - 有 avg/average 等字眼 confidence 0.8，否則 0.6
+    """
+    if not text:
+        return []
+    return [
+        FpsCandidate(avg_fps=v, raw=m.group(0), confidence=0.8 if m.group("avg") else 0.6, span=m.span())
+        for m, v in _iter_fps_matches(text, pos, endpos)
+    ]
+
+
+# --- 站點專用擷取（TechPowerUp / GPUCheck / Guru3D / UserBenchmark） ---
+_SITE_DOMAINS = ("techpowerup.com", "gpucheck.com", "guru3d.com", "userbenchmark.com")
+_SITE_CONTEXT_WORDS = ("average", "avg", "benchmark", "median", "mean")
+_SITE_CONTEXT_CHARS = 120
+
+# --- 標記去除 ---
+_SKIP_BLOCK_OPEN_RE = re.compile(r"<(script|style|noscript|svg)\b", re.IGNORECASE)
+_TAG_RE = re.compile(r"<[^>]*>")
+_WS_RE = re.compile(r"\s+")
+
+
+class _MarkupStripper:
+    """增量去除 HTML 標記；tag 或 script/style 區塊跨 chunk 時也能正確處理"""
+
+    def __init__(self):
+        self._buf = ""
+        self._skip_until: Optional[str] = None
+
+    def feed(self, chunk: str, final: bool = False) -> str:
+        buf = self._buf + chunk
+        out: List[str] = []
+        while buf:
+            if self._skip_until:
+                idx = buf.lower().find(self._skip_until)
+                if idx < 0:
+                    # 保留可能被切斷的結尾標籤
+                    buf = buf[-len(self._skip_until):]
+                    break
+                close = buf.find(">", idx)
+                if close < 0:
+                    buf = buf[idx:]
+                    break
+                buf = buf[close + 1:]
+                self._skip_until = None
+                continue
+            m = _SKIP_BLOCK_OPEN_RE.search(buf)
+            if m:
+                out.append(buf[: m.start()])
+                self._skip_until = "</" + m.group(1).lower()
+                buf = buf[m.end():]
+                continue
+            lt = buf.rfind("<")
+            if not final and lt > buf.rfind(">"):
+                # 尚未結束的 tag 留到下一個 chunk
+                out.append(buf[:lt])
+                buf = buf[lt:]
+            else:
+                out.append(buf)
+                buf = ""
+            break
+        self._buf = "" if final else buf
+        text = _TAG_RE.sub(" ", "".join(out))
+        return _WS_RE.sub(" ", html.unescape(text))
+
+
+class PageFpsExtractor:
+    """
+    串流頁面 FPS 擷取器：feed() 每次餵入一段已解碼文字，done 為 True 時即可停止讀取。
+    尾端保留 SCAN_MARGIN 個字元到下一輪再掃描，避免數字/單位被 chunk 切斷。
+    """
+
+    SCAN_MARGIN = 64
+
+    def __init__(self, domain: str, max_candidates: int = 20):
+        self.domain = (domain or "").lower()
+        self.is_site = any(x in self.domain for x in _SITE_DOMAINS)
+        self.max_candidates = max(1, int(max_candidates))
+        self.text = ""
+        self._pos = 0
+        self._stripper = _MarkupStripper()
+        self._tight: List[FpsCandidate] = []
+        self._loose: List[FpsCandidate] = []
+
+    @property
+    def done(self) -> bool:
+        return bool(self._tight) or len(self._loose) >= self.max_candidates
+
+    def feed(self, chunk: str, final: bool = False) -> None:
+        seg = self._stripper.feed(chunk, final=final)
+        if seg:
+            if self.text.endswith(" ") and seg.startswith(" "):
+                seg = seg[1:]
+            self.text += seg
+        limit = len(self.text) if final else len(self.text) - self.SCAN_MARGIN
+        if limit > self._pos and not self.done:
+            self._scan(self._pos, limit)
+            # 已擷取的 match 不會重複；被 limit 切斷的 match 下一輪會從 limit - SCAN_MARGIN 重新掃到
+            self._pos = max(self._pos, limit - self.SCAN_MARGIN)
+
+    def _scan(self, start: int, end: int) -> None:
+        t = self.text
+        for m, v in _iter_fps_matches(t, start, end):
+            self._pos = m.end()
+            if not self.is_site:
+                conf = 0.8 if m.group("avg") else 0.6
+            elif m.group("avg"):
+                # 站點頁面上明確標示 average/avg 的數字：直接採用
+                conf = 0.9 if "userbenchmark" in self.domain else 0.85
+                self._tight.append(FpsCandidate(avg_fps=v, raw=m.group(0), confidence=conf, span=m.span()))
+                return
+            else:
+                ctx = t[max(0, m.start() - _SITE_CONTEXT_CHARS): m.end() + _SITE_CONTEXT_CHARS].lower()
+                # prefer contexts with these keywords
+                if any(k in ctx for k in _SITE_CONTEXT_WORDS):
+                    conf = 0.8
+                elif "userbenchmark.com" in self.domain:
+                    # accept more liberally from userbenchmark but with lower confidence
+                    conf = 0.6
+                else:
+                    conf = 0.65
+            self._loose.append(FpsCandidate(avg_fps=v, raw=m.group(0), confidence=conf, span=m.span()))
+            if len(self._loose) >= self.max_candidates:
+                return
+
+    def candidates(self) -> List[FpsCandidate]:
+        if self._tight:
+            return self._tight[:1]
+        return list(self._loose)
+
+
+async def fetch_page_candidates(
+    client: httpx.AsyncClient,
+    url: str,
+    timeout: float = 15.0,
+    max_bytes: int = 512 * 1024,
+    max_candidates: int = 20,
+) -> List[FpsCandidate]:
+    """串流讀取頁面（最多 max_bytes）並擷取 FPS 候選；候選足夠就提前停止下載"""
+    extractor = PageFpsExtractor(urlparse(url).netloc, max_candidates=max_candidates)
+    read = 0
+    async with client.stream("GET", url, timeout=timeout) as resp:
+        encoding = resp.charset_encoding or "utf-8"
+        try:
+            decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        except LookupError:
+            decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        async for chunk in resp.aiter_bytes():
+            chunk = chunk[: max_bytes - read]
+            read += len(chunk)
+            extractor.feed(decoder.decode(chunk))
+            if extractor.done or read >= max_bytes:
+                break
+    extractor.feed(decoder.decode(b"", final=True), final=True)
+    return extractor.candidates()
@@ -1,20 +1,21 @@
 from __future__ import annotations
 
+import asyncio
 import os
-import re
-from dataclasses import dataclass
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import httpx
 
 from app.cache.global_cache import cache_manager
-
-
-@dataclass
-class FpsCandidate:
-    avg_fps: float
-    raw: str
-    confidence: float
+from app.services.api_budget import (
+    PRIORITY_INTERACTIVE,
+    PROVIDER_GOOGLE_CSE,
+    PROVIDER_SERPAPI,
+    BudgetExhausted,
+    api_budget,
+)
+from app.services.fps_extraction import FpsCandidate, extract_fps_candidates, fetch_page_candidates
+from app.services.request_budget import Deadline, clamp_timeout
 
 
 class GoogleFpsSearchService:
@@ -24,8 +25,22 @@ class GoogleFpsSearchService:
     - 只用 snippet/標題做數字解析（避免網站反爬/動態渲染）
     """
 
-    def __init__(self, client: httpx.AsyncClient):
+    # 磁碟持久化快取的 namespace（付費查詢回應重啟後仍可重用）
+    CACHE_NAMESPACE = "google_cse"
+
+    def __init__(self, client: httpx.AsyncClient, priority: str = PRIORITY_INTERACTIVE):
         self.client = client
+        # API 額度的優先等級（interactive / prewarm / enrichment，見 app.services.api_budget）
+        self.priority = priority
+        self.cache_ttl_seconds = int(os.getenv("GOOGLE_CSE_CACHE_TTL_SECONDS", "86400"))
+        # 每批併發的 query 數（由嚴到寬分批，上一批沒結果才送下一批）與結果頁面的併發上限
+        self.concurrency = max(1, int(os.getenv("GOOGLE_FPS_CONCURRENCY", "2")))
+        self.page_concurrency = max(1, int(os.getenv("GOOGLE_FPS_PAGE_CONCURRENCY", "4")))
+        # 提前結束門檻：已完成的結果合併後 confidence 達標，就不再等較嚴格但較慢的 query/頁面，取消其餘 task
+        self.early_stop_confidence = float(os.getenv("GOOGLE_FPS_EARLY_CONFIDENCE", "0.7"))
+        # 結果頁面 fallback：每頁最多讀取的位元組數與候選數
+        self.page_max_bytes = max(1024, int(os.getenv("GOOGLE_PAGE_MAX_BYTES", "524288")))
+        self.page_max_candidates = max(1, int(os.getenv("GOOGLE_PAGE_MAX_CANDIDATES", "20")))
 
     def _is_configured(self) -> bool:
         # Support both SerpApi and Google Custom Search API
@@ -37,8 +52,12 @@ class GoogleFpsSearchService:
     def _use_serpapi(self) -> bool:
         return bool(os.getenv("SERPAPI_KEY"))
 
+    def _provider(self) -> str:
+        return PROVIDER_SERPAPI if self._use_serpapi() else PROVIDER_GOOGLE_CSE
+
     def _cache_key(self, q: str, num: int) -> str:
-        return f"google_cse:{num}:{q}"
+        # 兩個 provider 的回應格式不同（organic_results / items）：key 含 provider，切換 SERPAPI_KEY 時不會讀到另一邊的回應
+        return f"google_cse:{self._provider()}:{num}:{q}"
 
     def _build_query_candidates(
         self,
@@ -48,6 +67,17 @@ class GoogleFpsSearchService:
         resolution: str,
         settings: Optional[str],
     ) -> List[str]:
+        return [q for _, q in self._build_query_families(game, gpu, cpu, resolution, settings)]
+
+    def _build_query_families(
+        self,
+        game: str,
+        gpu: str,
+        cpu: str,
+        resolution: str,
+        settings: Optional[str],
+    ) -> List[Tuple[str, str]]:
+        """回傳 [(family, query)]；family 用於快取命中統計"""
         g = (game or "").strip()
         gpu_s = (gpu or "").strip()
         cpu_s = (cpu or "").strip()
@@ -60,55 +90,27 @@ class GoogleFpsSearchService:
 
         # 由嚴到寬：盡量命中實測文章/表格
         cands = [
-            with_cpu,
-            strict,
-            f"\"{g}\" {gpu_s} {res} benchmark FPS",
-            f"\"{g}\" {gpu_s} FPS",
-            f"{g} {gpu_s} FPS {res}",
+            ("with_cpu", with_cpu),
+            ("strict", strict),
+            ("benchmark", f"\"{g}\" {gpu_s} {res} benchmark FPS"),
+            ("gpu_only", f"\"{g}\" {gpu_s} FPS"),
+            ("loose", f"{g} {gpu_s} FPS {res}"),
         ]
         # 去重
-        out: List[str] = []
+        out: List[Tuple[str, str]] = []
         seen = set()
-        for q in cands:
+        for family, q in cands:
             qn = " ".join(q.split())
             if qn and qn not in seen:
                 seen.add(qn)
-                out.append(qn)
+                out.append((family, qn))
         return out
 
     def _extract_fps_candidates(self, text: str) -> List[FpsCandidate]:
-        """
-        從 snippet/標題抓數字：
-        - 支援 "120 FPS", "avg 144 fps", "平均 165 fps" 等
-        - 只取合理範圍 (5~1000)
-        """
+        """從 snippet/標題抓數字（見 app.services.fps_extraction.extract_fps_candidates）"""
         if not text:
             return []
-
-        t = " ".join(str(text).split())
-        cands: List[FpsCandidate] = []
-
-        patterns = [
-            r"(?:avg|average|平均|around|about)\s*[:=]?\s*(\d+(?:\.\d+)?)\s*(?:-|to|~)?\s*(\d+(?:\.\d+)?)?\s*fps",
-            r"(\d+(?:\.\d+)?)\s*(?:-|to|~)?\s*(\d+(?:\.\d+)?)?\s*fps",
-        ]
-        for p in patterns:
-            for m in re.finditer(p, t, re.IGNORECASE):
-                try:
-                    v1 = float(m.group(1))
-                    v2 = m.group(2)
-                    if v2:
-                        v2 = float(v2)
-                        v = (v1 + v2) / 2.0  # 取範圍的平均值
-                    else:
-                        v = v1
-                except Exception:
-                    continue
-                if 5.0 <= v <= 1000.0:
-                    # 基礎置信度：有 avg/average 等字眼更高
-                    conf = 0.8 if any(word in m.group(0).lower() for word in ["avg", "average", "平均", "around", "about"]) else 0.6
-                    cands.append(FpsCandidate(avg_fps=v, raw=m.group(0), confidence=conf))
-        return cands
+        return extract_fps_candidates(" ".join(str(text).split()))
 
     def _pick_best_fps(self, candidates: List[FpsCandidate]) -> Optional[Tuple[float, float]]:
         if not candidates:
@@ -135,7 +137,9 @@ class GoogleFpsSearchService:
 
         return None
 
-    async def _call_cse(self, q: str, num: int) -> Dict[str, Any]:
+    async def _call_cse(self, q: str, num: int, timeout: float = 15.0) -> Dict[str, Any]:
+        # 先預扣額度；不足時丟出 BudgetExhausted（不發出請求）
+        await api_budget.acquire(self._provider(), self.priority)
         if self._use_serpapi():
             # Use SerpApi
             api_key = os.getenv("SERPAPI_KEY", "")
@@ -148,10 +152,102 @@ class GoogleFpsSearchService:
             url = "https://www.googleapis.com/customsearch/v1"
             params = {"key": api_key, "cx": cx, "q": q, "num": str(num)}
 
-        r = await self.client.get(url, params=params, timeout=15.0)
+        r = await self.client.get(url, params=params, timeout=timeout)
         r.raise_for_status()
         return r.json()
 
+    async def _cached_cse(
+        self,
+        q: str,
+        num: int,
+        family: str,
+        deadline: Optional[Deadline] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        先查快取（記憶體/Redis → 磁碟），未命中才呼叫 API 並寫回。
+        多個請求同時查同一個 query 只會送出一次 API 呼叫（cache_manager.get_or_set）。
+        API 失敗回傳 None；額度不足時 BudgetExhausted 直接往上丟。
+        """
+
+        async def load() -> Optional[Dict[str, Any]]:
+            try:
+                return await self._call_cse(q, num=num, timeout=clamp_timeout(15.0, deadline))
+            except BudgetExhausted:
+                raise
+            except Exception:
+                return None
+
+        return await cache_manager.get_or_set(
+            self._cache_key(q, num),
+            load,
+            ttl_seconds=self.cache_ttl_seconds,
+            namespace=self.CACHE_NAMESPACE,
+            family=f"google_cse:{family}",
+        )
+
+    def _result_items(self, data: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """SerpApi 用 organic_results，Google Custom Search API 用 items"""
+        if self._use_serpapi():
+            return (data or {}).get("organic_results") or []
+        return (data or {}).get("items") or []
+
+    async def _cancel_pending(self, tasks: List["asyncio.Task"]) -> None:
+        """取消尚未完成的 task（提前結束時釋放剩餘 API 呼叫/頁面抓取）"""
+        for t in tasks:
+            if not t.done():
+                t.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _first_pick(
+        self,
+        groups: List[Tuple[str, List["asyncio.Task"]]],
+        candidates_of: Callable[[Any], List[FpsCandidate]],
+        ordered: List[FpsCandidate],
+    ) -> Optional[Tuple[Tuple[float, float], str]]:
+        """
+        邊完成邊處理 groups（[(query, tasks)]，由嚴到寬）的結果，回傳 ((avg, confidence), query)：
+        - 依 group 順序累積候選（較嚴格的 group 全部完成才往下），第一個可用結果即回傳
+        - 已完成的所有結果（含順序在後的 group）合併後 confidence 達 early_stop_confidence 時直接回傳，
+          不再等待較慢的 task
+        ordered 會就地延伸（跨批次累積）；未完成的 task 由呼叫端取消
+        """
+        owner = {t: i for i, (_, tasks) in enumerate(groups) for t in tasks}
+        got: Dict["asyncio.Task", List[FpsCandidate]] = {}
+        pending = set(owner)
+        nxt = 0
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for t in done:
+                got[t] = candidates_of(t.result())
+            while nxt < len(groups) and all(t in got for t in groups[nxt][1]):
+                for t in groups[nxt][1]:
+                    ordered.extend(got[t])
+                pick = self._pick_best_fps(ordered)
+                if pick:
+                    return pick, groups[nxt][0]
+                nxt += 1
+            if pending:
+                early = ordered + [c for t, cands in got.items() if owner[t] >= nxt for c in cands]
+                pick = self._pick_best_fps(early)
+                if pick and pick[1] >= self.early_stop_confidence:
+                    return pick, groups[max(owner[t] for t in done)][0]
+        return None
+
+    async def _fetch_page_candidates(self, link: str, deadline: Optional[Deadline] = None) -> List[FpsCandidate]:
+        # 串流讀取：最多 page_max_bytes，候選足夠即停止下載（站點專用 heuristics 在 fps_extraction 內）
+        try:
+            return await fetch_page_candidates(
+                self.client,
+                link,
+                timeout=clamp_timeout(15.0, deadline),
+                max_bytes=self.page_max_bytes,
+                max_candidates=self.page_max_candidates,
+            )
+        except Exception:
+            # 無法抓取頁面則跳過
+            return []
+
     async def search_fps(
         self,
         game: str,
@@ -160,6 +256,7 @@ class GoogleFpsSearchService:
         resolution: str,
         settings: Optional[str],
         num: int = 5,
+        deadline: Optional[Deadline] = None,
     ) -> Dict[str, Any]:
         if not self._is_configured():
             return {
@@ -169,130 +266,137 @@ class GoogleFpsSearchService:
                 "source": "GoogleSearchSnippet",
             }
 
-        queries = self._build_query_candidates(game, gpu, cpu, resolution, settings)
+        queries = self._build_query_families(game, gpu, cpu, resolution, settings)
         all_candidates: List[FpsCandidate] = []
         picked_snippet = ""
-
-        for q in queries:
-            cache_key = self._cache_key(q, num)
-            cached = await cache_manager.get(cache_key)
-            if cached is None:
-                try:
-                    data = await self._call_cse(q, num=num)
-                    await cache_manager.set(cache_key, data, ttl_seconds=3600)
-                except Exception as e:
-                    # 不中斷，繼續下一個 query
-                    continue
-            else:
-                data = cached
-
-            # Handle different response formats
-            if self._use_serpapi():
-                # SerpApi format
-                items = (data or {}).get("organic_results") or []
-                for it in items:
-                    snip = (it or {}).get("snippet") or ""
-                    title = (it or {}).get("title") or ""
-                    cands = self._extract_fps_candidates(f"{title} {snip}")
-                    if cands:
-                        picked_snippet = snip or title
-                        all_candidates.extend(cands)
-            else:
-                # Google Custom Search API format
-                items = (data or {}).get("items") or []
-                for it in items:
-                    snip = (it or {}).get("snippet") or ""
-                    title = (it or {}).get("title") or ""
-                    cands = self._extract_fps_candidates(f"{title} {snip}")
-                    if cands:
-                        picked_snippet = snip or title
-                        all_candidates.extend(cands)
-
-            best = self._pick_best_fps(all_candidates)
-            if best:
-                avg, conf = best
-                return {
-                    "avg_fps": round(avg, 1),
-                    "p1_low": None,
-                    "p0_1_low": None,
-                    "raw_snippet": picked_snippet[:500],
-                    "notes": f"Google snippet 解析（query={q})",
-                    "source": "GoogleSearchSnippet",
-                    "confidence_override": conf,
-                }
-        # 若 snippet 無法解析到數字，嘗試抓取每個 search result 的實際頁面（fallback）
-        # 這會提高抓取成功率，但也會增加延遲與流量
-        for q in queries:
+        responses: Dict[str, Dict[str, Any]] = {}
+        best: Optional[Tuple[float, float]] = None
+        best_q = ""
+        shed: List[BudgetExhausted] = []
+        # 有 query/頁面因請求預算用盡而沒送出（回傳 deadline_exceeded，呼叫端視為降級）
+        cut_short: List[bool] = []
+
+        # 1) 由嚴到寬分批（每批 concurrency 個 query）併發查詢；上一批沒有可用結果才送出下一批，
+        #    避免命中時仍把寬鬆 query 的付費額度用掉。
+        #    同一批內較嚴格的 query 優先；confidence 達 early_stop_confidence 即取消其餘 query（見 _first_pick）
+        async def run_query(family: str, q: str) -> Tuple[str, Optional[Dict[str, Any]]]:
+            if deadline is not None and deadline.expired():
+                cut_short.append(True)
+                return q, None
             try:
-                data = await self._call_cse(q, num=num)
-            except Exception:
-                continue
-            # Handle different response formats for page scraping
-            if self._use_serpapi():
-                items = (data or {}).get("organic_results") or []
-            else:
-                items = (data or {}).get("items") or []
-            for it in items:
+                return q, await self._cached_cse(q, num, family, deadline)
+            except BudgetExhausted as e:
+                shed.append(e)
+                return q, None
+
+        def snippet_candidates(result: Tuple[str, Optional[Dict[str, Any]]]) -> List[FpsCandidate]:
+            nonlocal picked_snippet
+            q, data = result
+            if data is None:
+                # 不中斷，繼續下一個 query
+                return []
+            responses[q] = data
+            out: List[FpsCandidate] = []
+            for it in self._result_items(data):
+                snip = (it or {}).get("snippet") or ""
+                title = (it or {}).get("title") or ""
+                cands = self._extract_fps_candidates(f"{title} {snip}")
+                if cands:
+                    picked_snippet = snip or title
+                    out.extend(cands)
+            return out
+
+        for i in range(0, len(queries), self.concurrency):
+            wave = queries[i : i + self.concurrency]
+            tasks = [asyncio.create_task(run_query(family, q)) for family, q in wave]
+            try:
+                found = await self._first_pick(
+                    [(q, [t]) for (_, q), t in zip(wave, tasks)],
+                    snippet_candidates,
+                    all_candidates,
+                )
+            finally:
+                await self._cancel_pending(tasks)
+            if found:
+                best, best_q = found
+                break
+
+        if best:
+            avg, conf = best
+            return {
+                "avg_fps": round(avg, 1),
+                "p1_low": None,
+                "p0_1_low": None,
+                "raw_snippet": picked_snippet[:500],
+                "notes": f"Google snippet 解析（query={best_q})",
+                "source": "GoogleSearchSnippet",
+                "confidence_override": conf,
+            }
+
+        # 2) 若 snippet 無法解析到數字，併發抓取 search result 的實際頁面（fallback）
+        # 這會提高抓取成功率，但也會增加延遲與流量；與 snippet 階段共用同一批（已快取的）查詢結果。
+        # 頁面抓取不花 API 額度，全部一起送出；結果仍依 query 由嚴到寬累積（提前結束規則同 snippet 階段）
+        page_sem = asyncio.Semaphore(self.page_concurrency)
+
+        async def run_page(link: str) -> List[FpsCandidate]:
+            async with page_sem:
+                if deadline is not None and deadline.expired():
+                    cut_short.append(True)
+                    return []
+                return await self._fetch_page_candidates(link, deadline)
+
+        page_groups: List[Tuple[str, List["asyncio.Task"]]] = []
+        seen_links = set()
+        for _, q in queries:
+            group = []
+            for it in self._result_items(responses.get(q)):
                 link = (it or {}).get("link") or ""
-                if not link:
-                    continue
-                try:
-                    resp = await self.client.get(link, timeout=15.0)
-                    text = resp.text or ""
-                except Exception:
-                    # 無法抓取頁面則跳過
-                    continue
-                # domain-specific extraction first (site-specific heuristics)
-                page_cands = []
-                try:
-                    from urllib.parse import urlparse
-
-                    domain = urlparse(link).netloc.lower()
-                    # Site-specific heuristics (TechPowerUp / GPUCheck / Guru3D / UserBenchmark)
-                    if any(x in domain for x in ("techpowerup.com", "gpucheck.com", "guru3d.com", "userbenchmark.com")):
-                        import re
-
-                        # UserBenchmark often uses 'Average' or table labels; try a tighter pattern first
-                        m = re.search(r"(?:average|avg|mean|average fps|avg fps)[:\\s\\-]{0,8}(\\d+(?:\\.\\d+)?)\\s*fps", text, re.IGNORECASE)
-                        if m:
-                            page_cands.append(FpsCandidate(avg_fps=float(m.group(1)), raw=m.group(0), confidence=0.9 if 'userbenchmark' in domain else 0.85))
-                        else:
-                            # fallback: search for 'FPS' nearby numbers within 100 chars and weight by context keywords
-                            for m in re.finditer(r"(\\d+(?:\\.\\d+)?)\\s*fps", text, re.IGNORECASE):
-                                ctx_start = max(0, m.start() - 120)
-                                ctx = text[ctx_start : m.end() + 120].lower()
-                                # prefer contexts with these keywords
-                                if any(k in ctx for k in ("average", "avg", "benchmark", "median", "mean", "avg fps", "average fps")):
-                                    conf = 0.8
-                                elif "userbenchmark.com" in domain:
-                                    # accept more liberally from userbenchmark but with lower confidence
-                                    conf = 0.6
-                                else:
-                                    conf = 0.65
-                                try:
-                                    page_cands.append(FpsCandidate(avg_fps=float(m.group(1)), raw=m.group(0), confidence=conf))
-                                except Exception:
-                                    continue
-                except Exception:
-                    page_cands = []
-
-                # 如果 site-specific 沒抓到，再做一般擷取
-                if not page_cands:
-                    page_cands = self._extract_fps_candidates(text)
-                if page_cands:
-                    all_candidates.extend(page_cands)
-            best = self._pick_best_fps(all_candidates)
-            if best:
-                avg, conf = best
-                return {
-                    "avg_fps": round(avg, 1),
-                    "p1_low": None,
-                    "p0_1_low": None,
-                    "raw_snippet": f"page_parse_from_query={q}"[:500].replace('\\n',' '),
-                    "notes": f"Google result page 解析（query={q})",
-                    "source": "GoogleResultPage",
-                    "confidence_override": conf,
-                }
+                if link and link not in seen_links:
+                    seen_links.add(link)
+                    group.append(asyncio.create_task(run_page(link)))
+            if group:
+                page_groups.append((q, group))
+
+        page_tasks = [t for _, group in page_groups for t in group]
+        try:
+            found = await self._first_pick(page_groups, lambda cands: cands, all_candidates)
+        finally:
+            await self._cancel_pending(page_tasks)
+        if found:
+            best, best_q = found
+
+        if best:
+            avg, conf = best
+            return {
+                "avg_fps": round(avg, 1),
+                "p1_low": None,
+                "p0_1_low": None,
+                "raw_snippet": f"page_parse_from_query={best_q}"[:500].replace('\\n',' '),
+                "notes": f"Google result page 解析（query={best_q})",
+                "source": "GoogleResultPage",
+                "confidence_override": conf,
+            }
+
+        if shed:
+            # 有 query 因額度不足沒有送出：與「查過但找不到」區分，呼叫端可延後重試
+            return {
+                "avg_fps": None,
+                "confidence_override": 0.0,
+                "notes": str(shed[0]),
+                "source": "GoogleSearchSnippet",
+                "budget_exhausted": True,
+                "budget_provider": shed[0].provider,
+                "retry_after": max(e.retry_after for e in shed),
+            }
+
+        if cut_short:
+            return {
+                "avg_fps": None,
+                "confidence_override": 0.0,
+                "notes": "Google 搜尋超出請求時間預算，未查完所有 query",
+                "source": "GoogleSearchSnippet",
+                "deadline_exceeded": True,
+            }
 
         return {
             "avg_fps": None,
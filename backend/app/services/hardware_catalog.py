@@ -0,0 +1,696 @@
+"""
+硬體目錄索引（/api/hardware、/api/hardware/brands 用）
+
+seed（data/hardware_seed.json）與爬蟲清單合併、去重、分類與 metadata 對照都在建立索引時一次算好，
+每個請求只需依類別取出清單再套用過濾條件。
+
+- 啟動時先以 seed + 上次成功的爬蟲快照（data/hardware_catalog_snapshot.json）建立索引，不等網路
+- 背景排程定期重新爬取（HARDWARE_REFRESH_HOURS，加上隨機 jitter 避免多個 worker 同時打外站）；
+  失敗時以指數退避重試，並保留上一份成功的清單
+- 請求路徑完全不碰網路，只讀取記憶體中的索引；回應附上爬蟲快照的年齡
+- search 以預先建立的 token/前綴/trigram 索引（hardware_search.SearchIndex）排序比對，不再逐筆做子字串比對
+- 分頁（cursor）與 facet 計數（brand / series / category / VRAM）也由索引預先算好的欄位提供
+- 型號去重與 metadata 對照都以 hardware_identity 的 canonical id 為 key（"Intel Core i9-13900K" 與 "i9-13900K" 同一筆）
+- seed 檔或硬體別名表（hardware_identity）改變時重建；重建完成才替換 self._index（讀取端不會看到一半的結果）
+"""
+from __future__ import annotations
+
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import random
+import re
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from collections import Counter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from app.services.hardware_identity import hardware_identity
+from app.services.hardware_search import SearchIndex
+
+_SERIES_TOKENS_RE = re.compile(r'(RTX|GTX|RX|RDNA|Core|Arc|Radeon|Threadripper|Ryzen)', re.IGNORECASE)
+
+
+def normalize_model_key(s: Optional[str]) -> str:
+    """
+    型號的 canonical id（hardware_identity 共用規則）：
+    "Ryzen 7 7800X3D"、"7800X3D"、"AMD Ryzen 7 7800X3D" 與 "Intel Core i9-13900K"、"i9-13900K" 各自合併
+    """
+    return hardware_identity.resolve(s)
+
+
+def storage_type_key(model: str, generation: str) -> str:
+    gen = (generation or "").lower()
+    m = (model or "").lower()
+    if "nvme" in gen or "nvme" in m or "m.2" in m or "m2" in m:
+        return "nvme"
+    if "sata" in gen or "sata" in m:
+        return "sata"
+    if "hdd" in gen or "hdd" in m or "hard drive" in m:
+        return "hdd"
+    return "other"
+
+
+# VRAM facet 門檻（GB）；與 min_vram_gb 過濾相同語意（≥ 門檻）
+VRAM_FACET_THRESHOLDS = (4, 6, 8, 12, 16, 20, 24)
+
+
+def series_keys(model: str, generation: str, category: str, storage_type: str) -> Tuple[str, ...]:
+    """facet 用的系列值：storage 為 nvme/sata/hdd，其他為世代 + 型號中的系列字樣（與 /hardware/brands 相同）"""
+    if category == "storage":
+        return (storage_type,) if storage_type != "other" else ()
+    keys = [generation] if generation else []
+    for token in _SERIES_TOKENS_RE.findall(model or ""):
+        token = token.upper()
+        if token not in keys:
+            keys.append(token)
+    return tuple(keys)
+
+
+@dataclass
+class _Entry:
+    """單一目錄項目與預先算好的過濾欄位"""
+
+    item: Dict[str, Any]
+    category: str
+    model_l: str
+    brand_l: str
+    generation_l: str
+    storage_type: str
+    vram_gb: float
+    ram_gb: float
+    # category||normalize_model_key（分頁 cursor 用）
+    key: str = ""
+    series: Tuple[str, ...] = ()
+
+
+def compute_facets(entries: Iterable[_Entry]) -> Dict[str, List[Dict[str, Any]]]:
+    """依預先算好的欄位計數；值依數量排序（同數量依名稱）"""
+    brands: Counter = Counter()
+    series: Counter = Counter()
+    categories: Counter = Counter()
+    vram: Counter = Counter()
+    for e in entries:
+        categories[e.category] += 1
+        brand = e.item.get("brand")
+        if brand:
+            brands[brand] += 1
+        series.update(e.series)
+        if e.vram_gb:
+            for t in VRAM_FACET_THRESHOLDS:
+                if e.vram_gb >= t:
+                    vram[t] += 1
+
+    def ordered(counter: Counter) -> List[Dict[str, Any]]:
+        return [{"value": k, "count": n} for k, n in sorted(counter.items(), key=lambda kv: (-kv[1], str(kv[0])))]
+
+    return {
+        "category": ordered(categories),
+        "brand": ordered(brands),
+        "series": ordered(series),
+        "vram": [{"value": f"{t}GB+", "min_vram_gb": t, "count": vram[t]} for t in VRAM_FACET_THRESHOLDS if vram[t]],
+    }
+
+
+def encode_cursor(version: str, offset: int, last_key: str) -> str:
+    raw = json.dumps({"v": version, "o": offset, "k": last_key}, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """格式錯誤時拋出 ValueError"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(raw)
+        offset = int(data["o"])
+    except Exception as e:
+        raise ValueError(f"無效的 cursor: {e}")
+    if offset < 0:
+        raise ValueError("無效的 cursor: offset < 0")
+    return {"version": str(data.get("v") or ""), "offset": offset, "key": str(data.get("k") or "")}
+
+
+@dataclass
+class CatalogPage:
+    """query_page 的結果：一頁項目、過濾後總數、下一頁 cursor 與 facet"""
+
+    index: "CatalogIndex"
+    items: List[Dict[str, Any]]
+    total: int
+    next_cursor: Optional[str] = None
+    facets: Optional[Dict[str, List[Dict[str, Any]]]] = None
+
+
+@dataclass
+class CatalogIndex:
+    """某一版 seed + 爬蟲清單建立的唯讀索引"""
+
+    entries: List[_Entry]
+    by_category: Dict[str, List[_Entry]]
+    seed_meta: Dict[str, Dict[str, Any]]
+    brands: List[Dict[str, Any]]
+    source: str
+    timestamp: str
+    # 型號搜尋索引（doc id = entries 的位置）
+    search: Optional[SearchIndex] = None
+    # 預先算好的 facet：key 為 category（"" = 全部）
+    facets: Dict[str, Dict[str, List[Dict[str, Any]]]] = field(default_factory=dict)
+    # 內容導出的版本（seed metadata + 合併後項目 + 來源）；ETag 與分頁 cursor 用，內容相同的重建版本不變
+    version: str = ""
+    # 爬蟲清單取得時間（epoch）；沒有爬蟲清單時為 None
+    scraped_at_epoch: Optional[float] = None
+    built_at: str = field(default_factory=lambda: datetime.now().isoformat())
+
+    def snapshot_age_seconds(self) -> Optional[float]:
+        if self.scraped_at_epoch is None:
+            return None
+        return round(max(0.0, time.time() - self.scraped_at_epoch), 1)
+
+
+def _normalize_item(it: Any) -> Optional[dict]:
+    # 延遲 import：app.api.hardware 本身會 import 這個模組（模組已載入後只是 dict 查詢）
+    from app.api.hardware import HardwareItem, infer_brand_from_model_backend, infer_category_from_model_backend
+
+    if it is None:
+        return None
+    if isinstance(it, HardwareItem):
+        it = it.model_dump()
+    if not isinstance(it, dict):
+        return None
+    cat = it.get("category")
+    model = it.get("model")
+    # If category missing, attempt to infer from model/generation/brand
+    if not cat and model:
+        inferred = infer_category_from_model_backend(model, it.get("generation"), it.get("brand"))
+        if inferred:
+            cat = inferred
+    if not cat or not model:
+        return None
+    brand = it.get("brand") or infer_brand_from_model_backend(model)
+    return {
+        "category": cat,
+        "model": model,
+        "generation": it.get("generation"),
+        "release_year": it.get("release_year") or it.get("year"),
+        "brand": brand,
+        "capacity_gb": it.get("capacity_gb"),
+        "selected": False,
+    }
+
+
+def _merge_items(seed_items: List[dict], scraped_items: List[Any]) -> List[dict]:
+    """seed 與爬蟲清單合併：同一 category + model key 只留一筆，爬蟲欄位優先、seed 補缺"""
+    merged_map: Dict[str, dict] = {}
+    merged_order: List[str] = []
+
+    def upsert(d: dict, prefer_new: bool) -> None:
+        key = f"{str(d.get('category') or '').strip().lower()}||{normalize_model_key(d.get('model'))}"
+        if key not in merged_map:
+            merged_map[key] = d
+            merged_order.append(key)
+            return
+        cur = merged_map[key]
+        for f in ("brand", "generation", "release_year", "capacity_gb"):
+            if prefer_new:
+                cur[f] = d.get(f) or cur.get(f)
+            else:
+                cur[f] = cur.get(f) or d.get(f)
+
+    for it in seed_items:
+        n = _normalize_item(it)
+        if n:
+            upsert(n, prefer_new=False)
+    for it in scraped_items:
+        n = _normalize_item(it)
+        if n:
+            upsert(n, prefer_new=True)
+
+    # 跨類別去重：相同 model key 合併，保留先出現者並補齊缺漏欄位
+    final_map: Dict[str, dict] = {}
+    final_order: List[str] = []
+    for k in merged_order:
+        item = merged_map[k]
+        nm = normalize_model_key(item.get("model"))
+        if not nm:
+            key = f"{item.get('category') or ''}||{item.get('model') or ''}"
+            if key not in final_map:
+                final_map[key] = item
+                final_order.append(key)
+            continue
+        if nm not in final_map:
+            final_map[nm] = dict(item)
+            final_order.append(nm)
+            continue
+        cur = final_map[nm]
+        for f in ("brand", "generation", "release_year", "capacity_gb"):
+            cur[f] = cur.get(f) or item.get(f)
+        if not cur.get("category") and item.get("category"):
+            cur["category"] = item.get("category")
+    return [final_map[k] for k in final_order]
+
+
+def _aggregate_brands(raw_items: List[Any]) -> List[Dict[str, Any]]:
+    brands_map: Dict[str, set] = {}
+    for it in raw_items:
+        if not isinstance(it, dict):
+            it = {
+                "model": getattr(it, "model", None),
+                "generation": getattr(it, "generation", None),
+                "brand": getattr(it, "brand", None),
+            }
+        brand = (it.get("brand") or "").strip()
+        if not brand:
+            continue
+        series = brands_map.setdefault(brand, set())
+        gen = it.get("generation") or ""
+        if gen:
+            series.add(gen)
+        for token in _SERIES_TOKENS_RE.findall(it.get("model") or ""):
+            series.add(token.upper())
+    return [{"name": b, "series": sorted(s)} for b, s in brands_map.items()]
+
+
+def build_index(
+    seed: Dict[str, Any],
+    seed_source: Optional[str],
+    scraped_items: List[Any],
+    scraped_source: Optional[str],
+    scraped_at: Optional[str],
+    scraped_at_epoch: Optional[float] = None,
+    seed_at: Optional[str] = None,
+) -> CatalogIndex:
+    raw_seed = [it for it in (seed.get("items") or []) if it]
+    seed_items = [
+        {
+            "category": it.get("category"),
+            "model": it.get("model"),
+            "generation": it.get("generation"),
+            "release_year": it.get("release_year"),
+            "brand": it.get("brand"),
+            "capacity_gb": it.get("capacity_gb"),
+            "selected": False,
+        }
+        for it in raw_seed
+    ]
+    seed_meta: Dict[str, Dict[str, Any]] = {}
+    for it in raw_seed:
+        k = normalize_model_key(it.get("model"))
+        if k:
+            seed_meta[k] = it
+
+    entries: List[_Entry] = []
+    by_category: Dict[str, List[_Entry]] = {}
+    for item in _merge_items(seed_items, scraped_items or []):
+        model = item.get("model") or ""
+        generation = item.get("generation") or ""
+        model_key = normalize_model_key(model)
+        meta = seed_meta.get(model_key, {})
+        category = item.get("category") or ""
+        storage_type = storage_type_key(model, generation)
+        entry = _Entry(
+            item=item,
+            category=category,
+            model_l=model.lower(),
+            brand_l=(item.get("brand") or "").lower(),
+            generation_l=generation.lower(),
+            storage_type=storage_type,
+            vram_gb=meta.get("vram_gb", 0) or 0,
+            ram_gb=meta.get("ram_gb", 0) or 0,
+            key=f"{category}||{model_key}",
+            series=series_keys(model, generation, category, storage_type),
+        )
+        entries.append(entry)
+        by_category.setdefault(entry.category, []).append(entry)
+
+    source_parts = [p for p in ((scraped_source if scraped_items else None), seed_source) if p]
+    if len(source_parts) > 1:
+        source = "merged:" + "+".join(source_parts)
+    elif source_parts:
+        source = source_parts[0]
+    else:
+        source = scraped_source or "seed"
+
+    digest = hashlib.sha1()
+    digest.update(json.dumps(raw_seed, sort_keys=True, default=str).encode("utf-8"))
+    digest.update(json.dumps([e.item for e in entries], sort_keys=True, default=str).encode("utf-8"))
+    # 只有 seed 時用 seed 檔的時間：同一份 seed 在重建/重啟/多個 worker 間版本與 body 都相同
+    timestamp = scraped_at if scraped_items and scraped_at else (seed_at or datetime.now().isoformat())
+    digest.update(f"{source}|{timestamp}".encode("utf-8"))
+
+    return CatalogIndex(
+        entries=entries,
+        version=digest.hexdigest(),
+        by_category=by_category,
+        facets={"": compute_facets(entries), **{c: compute_facets(es) for c, es in by_category.items()}},
+        search=SearchIndex([
+            (e.item.get("model") or "", e.item.get("brand") or "", e.item.get("generation") or "", e.category)
+            for e in entries
+        ]),
+        seed_meta=seed_meta,
+        brands=_aggregate_brands(list(scraped_items or []) + raw_seed),
+        source=source,
+        timestamp=timestamp,
+        scraped_at_epoch=scraped_at_epoch if scraped_items else None,
+    )
+
+
+def _iso(ts: Optional[float]) -> Optional[str]:
+    return datetime.fromtimestamp(ts).isoformat() if ts else None
+
+
+class HardwareCatalog:
+    """常駐的硬體目錄；請求只讀取目前的 CatalogIndex"""
+
+    def __init__(self, seed_path: Optional[str] = None, snapshot_path: Optional[str] = None):
+        base = os.path.normpath(os.path.join(os.path.dirname(__file__), "..", ".."))
+        self.seed_path = seed_path or os.path.join(base, "data", "hardware_seed.json")
+        self.snapshot_path = snapshot_path or os.getenv("HARDWARE_SNAPSHOT_PATH") or os.path.join(
+            base, "data", "hardware_catalog_snapshot.json"
+        )
+        # 背景重新爬取：間隔、jitter 比例、失敗後的初始重試間隔（之後每次加倍，最多到 refresh_seconds）
+        self.refresh_enabled = os.getenv("HARDWARE_REFRESH_ENABLED", "1").strip().lower() not in ("0", "false", "no")
+        self.refresh_seconds = max(60.0, float(os.getenv("HARDWARE_REFRESH_HOURS", "6")) * 3600)
+        self.refresh_jitter = min(0.5, max(0.0, float(os.getenv("HARDWARE_REFRESH_JITTER", "0.1"))))
+        self.retry_seconds = max(1.0, float(os.getenv("HARDWARE_RETRY_SECONDS", "60")))
+        self._index: Optional[CatalogIndex] = None
+        self._seed: Dict[str, Any] = {}
+        self._seed_mtime: Optional[float] = None
+        # 建立索引時的 hardware_identity generation（別名表改變時 model key 也會變）
+        self._identity_generation: Optional[int] = None
+        self._scraped: List[Any] = []
+        self._scraped_source: Optional[str] = None
+        self._scraped_at: Optional[str] = None
+        self._scraped_epoch: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+        # 索引重建後呼叫（例如預先產生常用查詢的壓縮回應）
+        self._listeners: List[Callable[[CatalogIndex], None]] = []
+        # 排程狀態（GET /api/hardware/catalog）
+        self.failures = 0
+        self.last_attempt_at: Optional[float] = None
+        self.last_success_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.next_refresh_at: Optional[float] = None
+
+    def _seed_changed(self) -> bool:
+        try:
+            mtime: Optional[float] = os.path.getmtime(self.seed_path)
+        except OSError:
+            mtime = None
+        return (
+            self._index is None
+            or mtime != self._seed_mtime
+            or hardware_identity.current_generation() != self._identity_generation
+        )
+
+    def _load_seed(self) -> None:
+        self._identity_generation = hardware_identity.current_generation()
+        try:
+            self._seed_mtime = os.path.getmtime(self.seed_path)
+            with open(self.seed_path, "r", encoding="utf-8") as f:
+                self._seed = json.load(f) or {}
+        except Exception as e:
+            print(f"載入硬體 seed 失敗: {e}")
+            self._seed = {}
+
+    def _rebuild(self) -> CatalogIndex:
+        seed_source = f"seed:{os.path.basename(self.seed_path)}" if self._seed else None
+        index = build_index(
+            self._seed, seed_source, self._scraped, self._scraped_source, self._scraped_at, self._scraped_epoch,
+            seed_at=_iso(self._seed_mtime),
+        )
+        self._index = index
+        for listener in list(self._listeners):
+            try:
+                listener(index)
+            except Exception as e:
+                print(f"硬體目錄重建通知失敗: {e}")
+        return index
+
+    def add_listener(self, listener: Callable[[CatalogIndex], None]) -> None:
+        self._listeners.append(listener)
+
+    def get(self) -> CatalogIndex:
+        """目前的索引（seed 檔有變更時先重建）"""
+        if self._seed_changed():
+            self._load_seed()
+            return self._rebuild()
+        return self._index
+
+    def set_scraped(
+        self,
+        items: List[Any],
+        source: Optional[str],
+        fetched_at: Optional[str],
+        fetched_epoch: Optional[float] = None,
+    ) -> CatalogIndex:
+        """更新爬蟲清單並重建索引"""
+        self._scraped = list(items or [])
+        self._scraped_source = source
+        self._scraped_at = fetched_at
+        self._scraped_epoch = fetched_epoch if fetched_epoch is not None else time.time()
+        if self._index is None or self._seed_changed():
+            self._load_seed()
+        return self._rebuild()
+
+    def query(
+        self,
+        category: Optional[str] = None,
+        search: Optional[str] = None,
+        brand: Optional[str] = None,
+        series: Optional[str] = None,
+        min_vram_gb: Optional[int] = None,
+        min_ram_gb: Optional[int] = None,
+    ) -> Tuple[CatalogIndex, List[dict]]:
+        index, entries = self._filter(category, search, brand, series, min_vram_gb, min_ram_gb)
+        return index, [e.item for e in entries]
+
+    def query_page(
+        self,
+        category: Optional[str] = None,
+        search: Optional[str] = None,
+        brand: Optional[str] = None,
+        series: Optional[str] = None,
+        min_vram_gb: Optional[int] = None,
+        min_ram_gb: Optional[int] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        facets: bool = False,
+    ) -> CatalogPage:
+        """
+        分頁查詢；limit 為 None 時回傳全部（與 query 相同）。
+        cursor 記錄索引版本、offset 與上一頁最後一筆的 key：索引在翻頁間重建時，改從該 key 之後繼續，
+        不會因為前面插入/移除項目而重複或漏掉。格式錯誤的 cursor 拋出 ValueError。
+        """
+        index, entries = self._filter(category, search, brand, series, min_vram_gb, min_ram_gb)
+        start = 0
+        if cursor:
+            pos = decode_cursor(cursor)
+            start = pos["offset"]
+            if pos["version"] != index.version[:16] and pos["key"]:
+                for i, e in enumerate(entries):
+                    if e.key == pos["key"]:
+                        start = i + 1
+                        break
+        page = entries[start:] if limit is None else entries[start:start + limit]
+        end = start + len(page)
+        next_cursor = encode_cursor(index.version[:16], end, page[-1].key) if page and end < len(entries) else None
+
+        facet_counts = None
+        if facets:
+            unfiltered = not (search or brand or series or min_vram_gb or min_ram_gb)
+            if unfiltered and (category or "") in index.facets:
+                facet_counts = index.facets[category or ""]
+            else:
+                facet_counts = compute_facets(entries)
+        return CatalogPage(
+            index=index,
+            items=[e.item for e in page],
+            total=len(entries),
+            next_cursor=next_cursor,
+            facets=facet_counts,
+        )
+
+    def _filter(
+        self,
+        category: Optional[str],
+        search: Optional[str],
+        brand: Optional[str],
+        series: Optional[str],
+        min_vram_gb: Optional[int],
+        min_ram_gb: Optional[int],
+    ) -> Tuple[CatalogIndex, List[_Entry]]:
+        index = self.get()
+        entries = index.by_category.get(category, []) if category else index.entries
+        if search:
+            # 有搜尋字串時改依搜尋分數排序；索引找不到（例如只輸入型號中段的數字）才退回子字串比對
+            ranked = self.search(search, category=category, index=index)
+            if ranked:
+                entries = [e for e, _score in ranked]
+            else:
+                term = search.lower()
+                entries = [
+                    e for e in entries
+                    if term in e.model_l or term in e.brand_l or (e.generation_l and term in e.generation_l)
+                ]
+        brand_l = brand.lower() if brand else None
+        series_l = series.lower() if series else None
+
+        out: List[_Entry] = []
+        for e in entries:
+            if brand_l and e.brand_l and brand_l not in e.brand_l:
+                continue
+            if series_l:
+                # storage: allow series=nvme/sata/hdd to work even if generation is SATA/HDD etc.
+                if e.category == "storage" and series_l in ("nvme", "sata", "hdd"):
+                    if e.storage_type != series_l:
+                        continue
+                elif not ((e.generation_l and series_l in e.generation_l) or (e.model_l and series_l in e.model_l)):
+                    continue
+            if min_vram_gb and e.vram_gb < min_vram_gb:
+                continue
+            if min_ram_gb and e.ram_gb < min_ram_gb:
+                continue
+            out.append(e)
+        return index, out
+
+    def search(
+        self,
+        q: Optional[str],
+        category: Optional[str] = None,
+        limit: Optional[int] = None,
+        index: Optional[CatalogIndex] = None,
+    ) -> List[Tuple[_Entry, float]]:
+        """型號搜尋（排序 + 錯字容忍）；/api/hardware/suggest 的自動完成也用這個"""
+        index = index or self.get()
+        if index.search is None:
+            return []
+        hits = index.search.search(q, categories=[category] if category else None, limit=limit)
+        return [(index.entries[doc_id], score) for doc_id, score in hits]
+
+    def _load_snapshot(self) -> bool:
+        """載入上次成功的爬蟲快照（啟動時使用，檔案很小，同步讀取）"""
+        try:
+            with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                snap = json.load(f) or {}
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            print(f"讀取硬體目錄快照失敗: {e}")
+            return False
+        items = [it for it in (snap.get("items") or []) if isinstance(it, dict)]
+        if not items:
+            return False
+        self.set_scraped(items, snap.get("source"), snap.get("fetched_at"), snap.get("fetched_epoch"))
+        return True
+
+    def _save_snapshot(self) -> None:
+        os.makedirs(os.path.dirname(self.snapshot_path), exist_ok=True)
+        tmp = f"{self.snapshot_path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "version": 1,
+                    "source": self._scraped_source,
+                    "fetched_at": self._scraped_at,
+                    "fetched_epoch": self._scraped_epoch,
+                    "items": self._scraped,
+                },
+                f,
+                ensure_ascii=False,
+                indent=2,
+            )
+        os.replace(tmp, self.snapshot_path)
+
+    async def refresh_scraped(self) -> bool:
+        """
+        重新爬取並重建索引；成功時寫入快照。
+        爬蟲拿不到資料而退回內建清單時視為失敗：已有成功的快照就保留，沒有才先用內建清單。
+        """
+        from app.scrapers.hardware_scraper import HardwareScraper
+
+        self.last_attempt_at = time.time()
+        scraper = HardwareScraper()
+        try:
+            items = await scraper.fetch_hardware_list()
+        finally:
+            await scraper.close()
+        items = [it if isinstance(it, dict) else it.model_dump() for it in (items or [])]
+        if not items or scraper.used_fallback:
+            self.last_error = "爬蟲無資料，使用內建清單" if items else "爬蟲無資料"
+            if items and not self._scraped:
+                self.set_scraped(items, scraper.get_source_name(), scraper.get_last_fetch_time())
+            return False
+        self.set_scraped(items, scraper.get_source_name(), scraper.get_last_fetch_time())
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, self._save_snapshot)
+        except Exception as e:
+            print(f"寫入硬體目錄快照失敗: {e}")
+        self.last_success_at = time.time()
+        self.last_error = None
+        return True
+
+    def _jittered(self, seconds: float) -> float:
+        return seconds * (1.0 + random.uniform(-self.refresh_jitter, self.refresh_jitter))
+
+    def start(self) -> None:
+        """以 seed + 磁碟快照建立索引（不等網路），再啟動背景排程"""
+        self.get()
+        self._load_snapshot()
+        if self.refresh_enabled and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        # 快照還新：等到快照滿 refresh_seconds 再爬；沒有快照則立即爬（仍加一點 jitter）
+        age = self._index.snapshot_age_seconds() if self._index is not None else None
+        delay = self._jittered(max(0.0, self.refresh_seconds - age)) if age is not None else random.uniform(0, 5)
+        while True:
+            self.next_refresh_at = time.time() + delay
+            await asyncio.sleep(delay)
+            try:
+                ok = await self.refresh_scraped()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"硬體目錄爬蟲清單更新失敗: {e}")
+                ok = False
+            if ok:
+                self.failures = 0
+                delay = self._jittered(self.refresh_seconds)
+            else:
+                self.failures += 1
+                backoff = min(self.refresh_seconds, self.retry_seconds * (2 ** min(self.failures - 1, 16)))
+                delay = self._jittered(backoff)
+
+    def status(self) -> Dict[str, Any]:
+        index = self.get()
+        return {
+            "source": index.source,
+            "items": len(index.entries),
+            "scraped_items": len(self._scraped),
+            "snapshot_age_seconds": index.snapshot_age_seconds(),
+            "built_at": index.built_at,
+            "refresh_enabled": self.refresh_enabled and self._task is not None,
+            "failures": self.failures,
+            "last_error": self.last_error,
+            "last_attempt_at": _iso(self.last_attempt_at),
+            "last_success_at": _iso(self.last_success_at),
+            "next_refresh_at": _iso(self.next_refresh_at),
+            "identity": hardware_identity.stats(),
+        }
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except (asyncio.CancelledError, Exception):
+            pass
+        self._task = None
+
+
+hardware_catalog = HardwareCatalog()
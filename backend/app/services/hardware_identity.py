@@ -0,0 +1,239 @@
+"""
+硬體型號身分解析（API / 爬蟲 / 快取 store 共用）
+
+同一顆 GPU/CPU 可能被寫成 "NVIDIA GeForce RTX 4070 Ti"、"RTX 4070Ti"、"rtx 4070 ti"、"Intel Core i9-13900K"、
+"i9-13900K"、"7800X3D"……各層各自 lower()/子字串比對，會造成快取未命中或取到不同的分數。
+這裡把自由輸入的型號字串轉成 canonical id（例如 "rtx 4070 ti"、"i9 13900k"、"ryzen 7 7800x3d"）：
+
+- 正規化：去掉括號註記與商標符號、標點改空白、小寫；去掉開頭的廠牌字（NVIDIA/GeForce/AMD/Intel、
+  Samsung/WD/Western Digital/Kingston/Crucial、i3~i9 與 Ultra 前的 Core、RX 前的 Radeon）；拆開黏在一起的系列與型號（RTX4090 → rtx 4090、
+  7900XTX → 7900 xtx、4070Ti → 4070 ti）
+- 別名表：data/hardware_aliases.json（手動維護的特殊寫法）+ seed 型號的唯一型號碼（7800x3d → ryzen 7 7800x3d）
+- 結果以 dict 快取（同一字串只正規化一次）；seed / 別名檔 mtime 改變時清空
+- IdentityTable：以 canonical id 為 key 的對照表（分數表、seed metadata…）；找不到完全相同的 id 時，
+  取「整個 token 序列出現在型號中」最長的項目（"ryzen 9 9950x" 不會吃到 "ryzen 9 9950x3d"）
+"""
+from __future__ import annotations
+
+import json
+import os
+import re
+from typing import Any, Dict, Generic, Iterable, List, Optional, Tuple, TypeVar
+
+_PAREN_RE = re.compile(r'\(.*?\)')
+_NON_WORD_RE = re.compile(r'[^0-9a-z\u4e00-\u9fff]+')
+# 黏在一起的系列 + 型號：rtx4090、gtx1660、rx7900
+_SERIES_GLUE_RE = re.compile(r'^(rtx|gtx|gt|rx|arc)(\d.*)$')
+# 黏在型號後面的 GPU 後綴：7900xtx、4070ti、4080super、7900gre
+_GPU_SUFFIX_RE = re.compile(r'^(\d{3,4})(ti|super|xtx|xt|gre)$')
+_CAPACITY_RE = re.compile(r'^\d+(gb|tb|mb)$')
+_CORE_FOLLOWERS = {"i3", "i5", "i7", "i9", "ultra"}
+_VENDOR_WORDS = {"nvidia", "geforce", "amd", "intel", "samsung", "wd", "kingston", "crucial"}
+
+# 別名表與 seed 的位置；讀不到時只用正規化
+_BASE_DIR = os.path.normpath(os.path.join(os.path.dirname(__file__), "..", ".."))
+_ALIASES_PATH = os.path.join(_BASE_DIR, "data", "hardware_aliases.json")
+_SEED_PATH = os.path.join(_BASE_DIR, "data", "hardware_seed.json")
+
+# 正規化結果快取的上限（超過就整個清空；型號字串種類有限，正常用不到）
+_MAX_MEMO = 50000
+
+V = TypeVar("V")
+
+
+def canonical_key(text: Any) -> str:
+    """只做正規化（不查別名表）"""
+    if not text:
+        return ""
+    s = _PAREN_RE.sub(" ", str(text).lower())
+    tokens: List[str] = []
+    for tok in _NON_WORD_RE.split(s):
+        if not tok:
+            continue
+        m = _SERIES_GLUE_RE.match(tok)
+        if m:
+            tokens.append(m.group(1))
+            tok = m.group(2)
+        m = _GPU_SUFFIX_RE.match(tok)
+        if m:
+            tokens.extend(m.groups())
+            continue
+        tokens.append(tok)
+
+    # 去掉開頭的廠牌字（可能連續出現："nvidia geforce rtx"、"amd radeon rx"、"intel core i9"）
+    while tokens:
+        head = tokens[0]
+        nxt = tokens[1] if len(tokens) > 1 else ""
+        if head in _VENDOR_WORDS and nxt:
+            tokens.pop(0)
+        elif head == "western" and nxt == "digital" and len(tokens) > 2:
+            del tokens[:2]
+        elif head == "core" and nxt in _CORE_FOLLOWERS:
+            tokens.pop(0)
+        elif head == "radeon" and nxt == "rx":
+            tokens.pop(0)
+        else:
+            break
+    return " ".join(tokens)
+
+
+class HardwareIdentity:
+    """自由輸入的型號 → canonical id（含別名表與快取）"""
+
+    def __init__(self, aliases_path: str = _ALIASES_PATH, seed_path: str = _SEED_PATH):
+        self.aliases_path = aliases_path
+        self.seed_path = seed_path
+        self._aliases: Dict[str, str] = {}
+        self._display: Dict[str, str] = {}
+        self._memo: Dict[str, str] = {}
+        self._mtimes: Optional[Tuple[Optional[float], Optional[float]]] = None
+        # 別名表/seed 每重新載入一次 +1（以 canonical id 建立的索引據此判斷是否要重建）
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _mtime(path: str) -> Optional[float]:
+        try:
+            return os.path.getmtime(path)
+        except OSError:
+            return None
+
+    def _ensure_loaded(self) -> None:
+        mtimes = (self._mtime(self.aliases_path), self._mtime(self.seed_path))
+        if mtimes == self._mtimes:
+            return
+        self._mtimes = mtimes
+        self._memo = {}
+        self.generation += 1
+        aliases: Dict[str, str] = {}
+        display: Dict[str, str] = {}
+
+        # seed：canonical id → 顯示名稱；只出現在單一 id 中的型號碼（含數字、≥ 4 字元、不是容量）作為別名
+        try:
+            with open(self.seed_path, "r", encoding="utf-8") as f:
+                seed = json.load(f) or {}
+        except Exception:
+            seed = {}
+        owners: Dict[str, set] = {}
+        for it in seed.get("items") or []:
+            model = (it or {}).get("model")
+            cid = canonical_key(model)
+            if not cid:
+                continue
+            display.setdefault(cid, str(model))
+            for tok in cid.split(" "):
+                owners.setdefault(tok, set()).add(cid)
+        for code, ids in owners.items():
+            # "7900" 同時出現在 ryzen 9 7900 與 rx 7900 xt 時無法判斷是哪一個，不當別名
+            if (
+                len(ids) == 1 and len(code) >= 4 and any(ch.isdigit() for ch in code)
+                and not _CAPACITY_RE.match(code) and code not in display
+            ):
+                aliases[code] = next(iter(ids))
+
+        # 手動別名（優先）
+        try:
+            with open(self.aliases_path, "r", encoding="utf-8") as f:
+                raw = json.load(f) or {}
+        except FileNotFoundError:
+            raw = {}
+        except Exception as e:
+            print(f"載入硬體別名表失敗: {e}")
+            raw = {}
+        for group in ("gpu", "cpu", "storage"):
+            for alias, target in (raw.get(group) or {}).items():
+                a, t = canonical_key(alias), canonical_key(target)
+                if a and t and a != t:
+                    aliases[a] = t
+
+        self._aliases = aliases
+        self._display = display
+
+    def resolve(self, text: Any) -> str:
+        """型號字串 → canonical id（空字串表示無法辨識）"""
+        s = str(text or "")
+        cid = self._memo.get(s)
+        if cid is not None:
+            self.hits += 1
+            return cid
+        self._ensure_loaded()
+        self.misses += 1
+        key = canonical_key(s)
+        cid = self._aliases.get(key, key)
+        if len(self._memo) >= _MAX_MEMO:
+            self._memo = {}
+        self._memo[s] = cid
+        return cid
+
+    def same(self, a: Any, b: Any) -> bool:
+        ca = self.resolve(a)
+        return bool(ca) and ca == self.resolve(b)
+
+    def display_name(self, text: Any) -> str:
+        """canonical id 對應的 seed 型號名稱（沒有時回傳原字串）"""
+        cid = self.resolve(text)
+        return self._display.get(cid) or str(text or "")
+
+    def current_generation(self) -> int:
+        """檢查檔案 mtime（必要時重新載入）後回傳 generation"""
+        self._ensure_loaded()
+        return self.generation
+
+    def reload(self) -> None:
+        self._mtimes = None
+        self._ensure_loaded()
+
+    def stats(self) -> Dict[str, int]:
+        self._ensure_loaded()
+        return {
+            "generation": self.generation,
+            "aliases": len(self._aliases),
+            "memo": len(self._memo),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+class IdentityTable(Generic[V]):
+    """
+    以 canonical id 為 key 的對照表。
+    lookup：完全相同的 id 優先；否則取 token 序列完整出現在型號 id 中、最長的項目（結果快取）。
+    """
+
+    def __init__(self, entries: Iterable[Tuple[Any, V]], identity: Optional[HardwareIdentity] = None):
+        self._identity = identity or hardware_identity
+        self._by_id: Dict[str, V] = {}
+        for name, value in entries:
+            cid = self._identity.resolve(name)
+            if cid:
+                # 同一 id 有多個寫法（"Arc A770" / "Intel Arc A770"）時保留第一個
+                self._by_id.setdefault(cid, value)
+        self._ids_longest_first = sorted(self._by_id, key=len, reverse=True)
+        self._memo: Dict[str, Optional[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def __contains__(self, text: Any) -> bool:
+        return self.match_id(text) is not None
+
+    def match_id(self, text: Any) -> Optional[str]:
+        cid = self._identity.resolve(text)
+        if not cid:
+            return None
+        if cid in self._by_id:
+            return cid
+        if cid in self._memo:
+            return self._memo[cid]
+        padded = f" {cid} "
+        found = next((k for k in self._ids_longest_first if f" {k} " in padded), None)
+        self._memo[cid] = found
+        return found
+
+    def get(self, text: Any, default: Optional[V] = None) -> Optional[V]:
+        mid = self.match_id(text)
+        return self._by_id[mid] if mid is not None else default
+
+
+hardware_identity = HardwareIdentity()
@@ -0,0 +1,262 @@
+"""
+硬體型號搜尋索引（/api/hardware?search=、/api/hardware/suggest 用）
+
+建立 CatalogIndex 時一併建立，之後唯讀；查詢不再逐筆做子字串比對。
+- token：型號/品牌/世代小寫後依非英數字切開（"Core i9-13900K" → core, i9, 13900k）；
+  另外加入相鄰 token 的連寫（"Ryzen 7" → ryzen7、"4070 Ti" → 4070ti）與字母/數字邊界的拆分（"i9" → i, 9），
+  讓 "ryzen7 9700"、"4070ti s" 這類輸入也能直接命中
+- 前綴：詞彙表排序後以 bisect 取出某前綴的所有 token（等同 trie 的子樹，但用兩個 list 就好，建立/查詢都比較快）
+- 錯字容忍：token 的 trigram postings 找出候選詞，再以編輯距離（含相鄰對調）確認，長度 ≥ 4 才啟用
+- 每個查詢 token 都要命中（AND）；分數 = 各 token 最佳命中權重（完整 > 前綴 > 錯字）× 欄位權重（型號 > 品牌/世代）
+"""
+from __future__ import annotations
+
+import re
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+_SPLIT_RE = re.compile(r'[^0-9a-z\u4e00-\u9fff]+')
+_SEGMENT_RE = re.compile(r'[a-z]+|[0-9]+|[\u4e00-\u9fff]+')
+
+# 欄位權重：型號命中優先於品牌/世代
+_FIELD_WEIGHTS = (("model", 1.0), ("generation", 0.7), ("brand", 0.7))
+# 命中權重
+_EXACT = 1.0
+_PREFIX = 0.75
+_FUZZY = 0.5
+_SPLIT = 0.9
+# 品牌的常見別名（"geforce 3080"、"radeon 7900"）；只加在品牌欄位
+_BRAND_ALIASES = {
+    "nvidia": ("geforce",),
+    "amd": ("radeon",),
+    "western digital": ("wd",),
+}
+# 單一 token 前綴可展開的詞彙上限（1~2 字元的前綴才可能碰到）
+_MAX_PREFIX_EXPANSION = 256
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """小寫後依非英數字切開"""
+    if not text:
+        return []
+    return [t for t in _SPLIT_RE.split(str(text).lower()) if t]
+
+
+def _segments(token: str) -> List[str]:
+    return _SEGMENT_RE.findall(token)
+
+
+def _index_tokens(text: Optional[str]) -> Set[str]:
+    words = tokenize(text)
+    out: Set[str] = set(words)
+    for a, b in zip(words, words[1:]):
+        out.add(a + b)
+    for w in words:
+        segs = _segments(w)
+        if len(segs) < 2:
+            continue
+        # 開頭片段只在兩段時加入（i9 → i、rtx4070 → rtx）；7800x3d 這類多段型號以前綴比對
+        if len(segs) == 2:
+            out.add(segs[0])
+        # 從片段邊界開始的後綴（7800x3d → x3d, 3d；7900xtx → xtx），讓 "x3d" 能找到所有 X3D 型號
+        pos = 0
+        for seg in segs[:-1]:
+            pos += len(seg)
+            if len(w) - pos >= 2:
+                out.add(w[pos:])
+    return out
+
+
+def _trigrams(token: str) -> Set[str]:
+    padded = f"^{token}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _within_distance(a: str, b: str, limit: int) -> bool:
+    """Damerau-Levenshtein（相鄰對調算一次）是否 ≤ limit；超過 limit 提前結束"""
+    if abs(len(a) - len(b)) > limit:
+        return False
+    prev2: List[int] = []
+    prev = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        row_min = i
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            v = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                v = min(v, prev2[j - 2] + 1)
+            cur[j] = v
+            row_min = min(row_min, v)
+        if row_min > limit:
+            return False
+        prev2, prev = prev, cur
+    return prev[len(b)] <= limit
+
+
+class SearchIndex:
+    """
+    以 doc id（CatalogIndex.entries 的位置）建立的倒排索引。
+    docs 的每一筆為 (model, brand, generation, category)。
+    """
+
+    def __init__(self, docs: Sequence[Tuple[str, str, str, str]]):
+        self._categories: List[str] = []
+        self._model_l: List[str] = []
+        postings: Dict[str, Dict[int, float]] = {}
+        for doc_id, (model, brand, generation, category) in enumerate(docs):
+            self._categories.append(category or "")
+            self._model_l.append(" ".join(tokenize(model)))
+            fields = {"model": model, "brand": brand, "generation": generation}
+            for name, weight in _FIELD_WEIGHTS:
+                tokens = _index_tokens(fields[name])
+                if name == "brand":
+                    tokens.update(_BRAND_ALIASES.get((brand or "").strip().lower(), ()))
+                for tok in tokens:
+                    bucket = postings.setdefault(tok, {})
+                    if bucket.get(doc_id, 0.0) < weight:
+                        bucket[doc_id] = weight
+        self._postings = postings
+        self._vocab: List[str] = sorted(postings)
+        grams: Dict[str, List[int]] = {}
+        for vid, tok in enumerate(self._vocab):
+            if len(tok) >= 3:
+                for g in _trigrams(tok):
+                    grams.setdefault(g, []).append(vid)
+        self._grams = grams
+
+    def __len__(self) -> int:
+        return len(self._categories)
+
+    # --- 單一 token 的候選詞 ---
+
+    def _prefix_tokens(self, prefix: str) -> List[str]:
+        lo = bisect_left(self._vocab, prefix)
+        hi = bisect_left(self._vocab, prefix + "\uffff", lo)
+        if hi - lo > _MAX_PREFIX_EXPANSION:
+            hi = lo + _MAX_PREFIX_EXPANSION
+        return self._vocab[lo:hi]
+
+    def _fuzzy_tokens(self, token: str) -> List[str]:
+        if len(token) < 4:
+            return []
+        limit = 1 if len(token) < 8 else 2
+        counts: Dict[int, int] = {}
+        for g in _trigrams(token):
+            for vid in self._grams.get(g, ()):
+                counts[vid] = counts.get(vid, 0) + 1
+        # token 有 len 個 trigram，每 1 次編輯最多破壞 3 個；共同 trigram 太少的不必算距離
+        need = max(1, len(token) - 3 * limit)
+        out = []
+        for vid, n in counts.items():
+            if n < need:
+                continue
+            cand = self._vocab[vid]
+            if _within_distance(token, cand, limit) or (
+                len(cand) > len(token) and _within_distance(token, cand[:len(token)], limit)
+            ):
+                out.append(cand)
+        return out
+
+    def _match_token(self, token: str, fuzzy: bool) -> Dict[int, float]:
+        """token → {doc_id: 權重}；完整/前綴都沒有時才嘗試錯字"""
+        scores: Dict[int, float] = {}
+
+        def add(tok: str, kind: float) -> None:
+            for doc_id, fw in self._postings.get(tok, {}).items():
+                s = kind * fw
+                if scores.get(doc_id, 0.0) < s:
+                    scores[doc_id] = s
+
+        add(token, _EXACT)
+        for tok in self._prefix_tokens(token):
+            if tok != token:
+                # 前綴越接近完整 token 分數越高
+                add(tok, _PREFIX + (_EXACT - _PREFIX) * 0.5 * len(token) / len(tok))
+        if scores or not fuzzy:
+            return scores
+        for tok in self._fuzzy_tokens(token):
+            add(tok, _FUZZY)
+        return scores
+
+    def _match_query_token(self, token: str) -> Dict[int, float]:
+        """依序：完整/前綴 → 拆成片段 → 錯字 → 片段錯字（錯字放在拆段之後，rtx4070ti 才不會被當成 rtx4070 的錯字）"""
+        segs = _segments(token)
+        for fuzzy in (False, True):
+            scores = self._match_token(token, fuzzy)
+            if scores:
+                return scores
+            if len(segs) >= 2:
+                scores = self._match_segments(segs, fuzzy)
+                if scores:
+                    return scores
+        return {}
+
+    def _match_segments(self, segs: List[str], fuzzy: bool) -> Dict[int, float]:
+        """連寫的多段輸入（rtx4070ti）：拆成片段後全部命中才算"""
+        combined: Optional[Dict[int, float]] = None
+        for seg in segs:
+            part = self._match_token(seg, fuzzy)
+            if combined is None:
+                combined = part
+            else:
+                combined = {d: s + part[d] for d, s in combined.items() if d in part}
+            if not combined:
+                return {}
+        return {d: _SPLIT * s / len(segs) for d, s in (combined or {}).items()}
+
+    # --- 查詢 ---
+
+    def search(
+        self,
+        query: Optional[str],
+        categories: Optional[Iterable[str]] = None,
+        limit: Optional[int] = None,
+    ) -> List[Tuple[int, float]]:
+        """回傳 [(doc_id, score)]，依分數排序；查詢沒有可用 token 時回傳空 list"""
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens:
+            return []
+        allowed = set(categories) if categories else None
+
+        # 依命中數由少到多取交集，交集很快縮小
+        matched = [self._match_query_token(t) for t in tokens]
+        matched.sort(key=len)
+        total: Dict[int, float] = {}
+        for i, scores in enumerate(matched):
+            if not scores:
+                return []
+            if i == 0:
+                total = {
+                    d: s for d, s in scores.items()
+                    if allowed is None or self._categories[d] in allowed
+                }
+            else:
+                total = {d: s + scores[d] for d, s in total.items() if d in scores}
+            if not total:
+                return []
+
+        phrase = " ".join(tokens)
+        n = len(tokens)
+
+        def rank(item: Tuple[int, float]) -> Tuple[float, int]:
+            doc_id, score = item
+            model = self._model_l[doc_id]
+            # 型號與查詢完全相同 > 以查詢開頭 > 包含整段查詢；同分維持目錄原本的順序
+            if model == phrase:
+                bonus = 0.3
+            elif model.startswith(phrase):
+                bonus = 0.2
+            elif phrase in model:
+                bonus = 0.1
+            else:
+                bonus = 0.0
+            return (-(score / n + bonus), doc_id)
+
+        ranked = sorted(total.items(), key=rank)
+        if limit is not None:
+            ranked = ranked[:limit]
+        return [(d, round(s / n, 3)) for d, s in ranked]
+
+    def stats(self) -> Dict[str, int]:
+        return {"docs": len(self._categories), "tokens": len(self._vocab), "trigrams": len(self._grams)}
@@ -0,0 +1,204 @@
+"""
+查詢條件的正規化（game / resolution / settings 每個請求只解析一次）
+
+原本解析度、畫質、RT/PT 與遊戲類型散落在各個倍數函式中各自做子字串掃描，規則也不一致
+（例如 RT 判斷有的會把 "Optimized" 裡的 "pt" 當成路徑追蹤、有的認不得 "High+RT"；
+使用率的畫質負載直接拿 "Ultra RT" 查表而落回預設值）。QuerySpec 在請求開始時建立一次：
+
+- res：解析度 enum（720p / 1080p / 1440p / 4K；無法辨識為 None，倍數與負載比照 1080p）
+- quality：基礎畫質（"Ultra RT" → Ultra；非 Low/Medium/High/Ultra 時保留原字串）
+- rt：是否明確要求 RT/PT（以 token 判斷）
+- game_id：小寫、空白正規化的遊戲 id；game_name：已知遊戲清單中的正式名稱（大小寫不同也能對到）
+- 遊戲類型旗標與衍生負載（res_load / st_load、RT 倍數）
+
+同一組輸入的 QuerySpec 以 lru_cache 共用（預熱工具大量呼叫時不必重複解析）。
+"""
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from enum import Enum
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+from app.data.game_requirements import GAME_REQUIREMENTS_25
+
+
+class Resolution(str, Enum):
+    R720 = "1280x720"
+    R1080 = "1920x1080"
+    R1440 = "2560x1440"
+    R2160 = "3840x2160"
+
+
+# 依序比對（完整寬高優先，其次常見簡寫）；與原本各倍數表的 key 順序相同
+_RESOLUTION_PATTERNS: Tuple[Tuple[str, Resolution], ...] = (
+    ("1280x720", Resolution.R720),
+    ("1920x1080", Resolution.R1080),
+    ("2560x1440", Resolution.R1440),
+    ("3840x2160", Resolution.R2160),
+    ("720", Resolution.R720),
+    ("1080", Resolution.R1080),
+    ("1440", Resolution.R1440),
+    ("4k", Resolution.R2160),
+    ("2160", Resolution.R2160),
+)
+
+# 解析度負載（越高越吃 GPU/VRAM；使用率推估用）
+_RES_LOAD: Dict[Optional[Resolution], float] = {
+    Resolution.R720: 0.5,
+    Resolution.R1080: 0.8,
+    Resolution.R1440: 0.7,
+    Resolution.R2160: 1.0,
+    None: 0.8,
+}
+# 畫質負載（越高越吃 GPU/VRAM）
+_QUALITY_LOAD = {"Low": 0.75, "Medium": 0.9, "High": 1.0, "Ultra": 1.12}
+_BASE_QUALITIES = {"low", "medium", "high", "ultra"}
+
+_RT_TOKENS = {"rt", "pt"}
+_RT_PHRASES = ("ray tracing", "raytracing", "path tracing", "pathtracing", "光追", "光線追蹤", "路徑追蹤")
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+# 遊戲類型（小寫子字串比對）
+ULTRA_HEAVY_AAA = ("alan wake 2", "cyberpunk 2077", "starfield", "dragon's dogma 2")
+CPU_BOUND_GAMES = (
+    "counter-strike 2",
+    "valorant",
+    "overwatch 2",
+    "minecraft",
+    "cities: skylines",
+    "cities skylines",
+    "cities skylines ii",
+    "cities: skylines ii",
+    "cities skylines 2",
+)
+SIM_RACING_GAMES = ("assetto corsa competizione", "assetto corsa", "iracing", "i racing")
+FPS_SHOOTERS = (
+    "halo infinite",
+    "rust",
+    "apex legends",
+    "ready or not",
+    "call of duty",
+    "pubg",
+    "fortnite",
+    "overwatch 2",
+)
+CPU_HEAVY_SANDBOX = ("minecraft", "cities: skylines", "cities skylines")
+
+# 只對「已知支援 RT/PT 的遊戲」套用懲罰（避免把不支援的遊戲也硬降 FPS）
+RT_MULTIPLIERS: Tuple[Tuple[str, float], ...] = (
+    # 特別重的 RT/PT
+    ("alan wake 2", 0.60),
+    # Cyberpunk：最終調整，RTX 5090 4K Ultra RT 約 45-50fps（相對不開 RT 下降約 10-15%）
+    ("cyberpunk 2077", 0.9),
+    # Elden Ring：你期望 5080+14900K 開 RT 仍可 110+，因此只做輕度懲罰
+    ("elden ring", 0.90),
+    # 中度懲罰
+    ("hogwarts legacy", 0.75),
+    ("fortnite", 0.80),
+    ("minecraft", 0.70),
+    ("control", 0.75),
+    ("metro exodus", 0.70),
+)
+RT_NOTE_ENABLED = "已啟用 RT/PT（FPS 會明顯下降）"
+RT_NOTE_UNKNOWN = "已勾選 RT/PT，但此遊戲的 RT/PT 支援未知：未額外調降 FPS"
+
+_KNOWN_GAMES = {" ".join(name.lower().split()): name for name in GAME_REQUIREMENTS_25}
+
+
+def _norm(s: Optional[str]) -> str:
+    return " ".join((s or "").strip().split())
+
+
+def parse_resolution(resolution: Optional[str]) -> Optional[Resolution]:
+    r = str(resolution or "").lower()
+    for pattern, res in _RESOLUTION_PATTERNS:
+        if pattern in r:
+            return res
+    return None
+
+
+def base_quality(settings: str) -> str:
+    """支援 "Ultra RT" / "High + RT" / "High+RT" 這類字串：先抽出基礎畫質"""
+    tokens = _TOKEN_RE.findall(settings.lower())
+    if tokens and tokens[0] in _BASE_QUALITIES:
+        return tokens[0].capitalize()
+    return settings
+
+
+def wants_rt(settings: str) -> bool:
+    s = settings.lower()
+    if any(p in s for p in _RT_PHRASES):
+        return True
+    return any(t in _RT_TOKENS for t in _TOKEN_RE.findall(s))
+
+
+def _has(game_id: str, keys: Tuple[str, ...]) -> bool:
+    return any(k in game_id for k in keys)
+
+
+@dataclass(frozen=True)
+class QuerySpec:
+    game: str
+    game_id: str
+    game_name: Optional[str]
+    resolution: str
+    res: Optional[Resolution]
+    settings: str
+    quality: str
+    rt: bool
+    ultra_heavy: bool
+    cpu_bound: bool
+    sim_racing: bool
+    fps_shooter: bool
+    cpu_heavy_sandbox: bool
+    res_load: float
+    st_load: float
+    rt_multiplier: float
+    rt_note: Optional[str]
+
+    @property
+    def cpu_limited(self) -> bool:
+        return self.cpu_bound or self.cpu_heavy_sandbox or self.sim_racing or self.fps_shooter
+
+    @classmethod
+    def build(cls, game: Optional[str], resolution: Optional[str], settings: Optional[str]) -> "QuerySpec":
+        return _build_spec(str(game or ""), str(resolution or ""), settings)
+
+
+@lru_cache(maxsize=4096)
+def _build_spec(game: str, resolution: str, settings: Optional[str]) -> QuerySpec:
+    effective_settings = (settings or "High").strip() or "High"
+    game_id = _norm(game).lower()
+    res = parse_resolution(resolution)
+    quality = base_quality(effective_settings)
+    rt = wants_rt(effective_settings)
+
+    rt_multiplier, rt_note = 1.0, None
+    if rt:
+        rt_note = RT_NOTE_UNKNOWN
+        for key, mult in RT_MULTIPLIERS:
+            if key in game_id:
+                rt_multiplier, rt_note = float(mult), RT_NOTE_ENABLED
+                break
+
+    return QuerySpec(
+        game=game,
+        game_id=game_id,
+        game_name=_KNOWN_GAMES.get(game_id),
+        resolution=resolution,
+        res=res,
+        settings=effective_settings,
+        quality=quality,
+        rt=rt,
+        ultra_heavy=_has(game_id, ULTRA_HEAVY_AAA),
+        cpu_bound=_has(game_id, CPU_BOUND_GAMES),
+        sim_racing=_has(game_id, SIM_RACING_GAMES),
+        fps_shooter=_has(game_id, FPS_SHOOTERS),
+        cpu_heavy_sandbox=_has(game_id, CPU_HEAVY_SANDBOX),
+        res_load=_RES_LOAD[res],
+        st_load=_QUALITY_LOAD.get(quality, 1.0),
+        rt_multiplier=rt_multiplier,
+        rt_note=rt_note,
+    )
@@ -0,0 +1,65 @@
+"""
+請求延遲預算（deadline）
+
+每個 /benchmarks/search 請求建立一個 Deadline，沿著 cache → web → predict 各階段往下傳：
+- web 階段只能在剩餘預算內等待，逾時即放棄（本地快取讀取很便宜，不受預算限制）
+- 降級的預測不寫回本地快取，避免覆蓋既有的真實數據
+- predict（_generate_mock_data）為純計算，永遠可用，作為預算用盡時的保底
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from typing import Any, Awaitable, Optional
+
+
+class DeadlineExceeded(Exception):
+    """請求預算已用盡"""
+
+
+class Deadline:
+    """以 monotonic clock 計算的請求截止時間"""
+
+    def __init__(self, budget_seconds: float):
+        self.budget_seconds = max(0.0, float(budget_seconds))
+        self.expires_at = time.monotonic() + self.budget_seconds
+
+    @classmethod
+    def from_env(cls) -> "Deadline":
+        return cls(float(os.getenv("BENCHMARK_REQUEST_BUDGET_SECONDS", "8.0")))
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0.0
+
+    def clamp(self, timeout: Optional[float]) -> float:
+        """把單次操作的 timeout 壓在剩餘預算內"""
+        remaining = self.remaining()
+        if timeout is None:
+            return remaining
+        return max(0.0, min(float(timeout), remaining))
+
+    async def run(self, aw: Awaitable[Any], timeout: Optional[float] = None) -> Any:
+        """
+        在剩餘預算內等待 aw；超時會取消 aw 並丟出 DeadlineExceeded。
+        """
+        limit = self.clamp(timeout)
+        if limit <= 0.0:
+            # 預算已用盡：不要留下未 await 的 coroutine
+            if asyncio.iscoroutine(aw):
+                aw.close()
+            raise DeadlineExceeded("請求預算已用盡")
+        try:
+            return await asyncio.wait_for(aw, timeout=limit)
+        except asyncio.TimeoutError as e:
+            raise DeadlineExceeded(f"超出請求預算（{self.budget_seconds:.1f}s）") from e
+
+
+def clamp_timeout(timeout: float, deadline: Optional[Deadline]) -> float:
+    """deadline 可為 None 的便利函式（沿用原本 timeout）"""
+    if deadline is None:
+        return timeout
+    return deadline.clamp(timeout)
@@ -19,6 +19,7 @@ from __future__ import annotations
 
 import argparse
 import json
+import re
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, Tuple, Optional
@@ -46,22 +47,58 @@ def _parse_v2_key(k: str) -> Optional[Tuple[str, str, str, str]]:
     game, res, st, gpu = [p.strip() for p in parts]
     if not game or not res or not st or not gpu:
         return None
-    # normalize setting to Title-case base token (e.g. "ultra rt" -> "Ultra RT")
+    return game, res, st, gpu
+
+
+_SNIPPET_GAME_RE = re.compile(r"基於真實基準預測 - (.+?) @ ")
+
+
+def _display_settings(st: str) -> str:
+    # canonical key 全小寫：還原成 Title-case 的基礎畫質（"ultra rt" -> "Ultra RT"）；非全小寫的舊 key 保留原樣
+    if st != st.lower():
+        return st
     st_tokens = st.split()
     if not st_tokens:
-        st_norm = st
-    else:
-        base = st_tokens[0].capitalize()
-        tail = " ".join(st_tokens[1:])
-        st_norm = (base + (" " + tail.upper() if tail else "")).strip()
-    return game, res, st_norm, gpu
+        return st
+    base = st_tokens[0].capitalize()
+    tail = " ".join(st_tokens[1:])
+    return (base + (" " + tail.upper() if tail else "")).strip()
+
+
+def _display_game(game: str, raw_snippet: str) -> str:
+    # 已知遊戲用正式名稱；否則從預測 raw_snippet 取回原始大小寫（"cyberpunk 2077" -> "Cyberpunk 2077"）
+    if game != game.lower():
+        return game
+    from app.services.query_spec import QuerySpec
+
+    name = QuerySpec.build(game, "", None).game_name
+    if name:
+        return name
+    m = _SNIPPET_GAME_RE.search(raw_snippet or "")
+    if m and m.group(1).strip().lower() == game:
+        return m.group(1).strip()
+    return game
+
+
+def _display_combo(game: str, st: str, hw: Tuple[str, ...], value: Dict[str, Any]) -> Tuple[str, str, Tuple[str, ...]]:
+    """
+    v1/v2 的 key 是 canonical（全小寫、硬體為 canonical id），直接拿來預測會與線上路徑的結果不同：
+    還原成使用者請求時的顯示名稱後再呼叫 _generate_mock_data
+    """
+    from app.services.hardware_identity import hardware_identity
+
+    return (
+        _display_game(game, str(value.get("raw_snippet") or "")),
+        _display_settings(st),
+        tuple(hardware_identity.display_name(h) for h in hw),
+    )
 
 
 def _parse_v1_key(k: str) -> Optional[Tuple[str, str, str, str, str]]:
-    # v1: game|res|settings|gpu|cpu
+    # v1: game||res||settings||gpu||cpu（舊版為單一 "|"）
     if not k or "|" not in k:
         return None
-    parts = k.split("|")
+    parts = k.split("||") if "||" in k else k.split("|")
     if len(parts) != 5:
         return None
     game, res, st, gpu, cpu = [p.strip() for p in parts]
@@ -119,6 +156,7 @@ def main() -> int:
             if not parsed:
                 continue
             game, res, st, gpu = parsed
+            game, st, (gpu,) = _display_combo(game, st, (gpu,), v)
             refreshed = scraper._generate_mock_data(
                 game=game,
                 resolution=res,
@@ -167,6 +205,7 @@ def main() -> int:
             if not parsed:
                 continue
             game, res, st, gpu, cpu = parsed
+            game, st, (gpu, cpu) = _display_combo(game, st, (gpu, cpu), v)
             refreshed = scraper._generate_mock_data(
                 game=game,
                 resolution=res,
@@ -1,6 +1,6 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
-"""
+r"""
 批量更新 backend/data/hardware_seed.json 的 benchmarks 區塊（用 Google Programmable Search snippet 解析 FPS）
 
 為什麼需要這個腳本？
@@ -24,6 +24,7 @@ from typing import Any, Dict, List, Optional, Tuple
 import httpx
 from dotenv import load_dotenv, find_dotenv
 
+from app.services.api_budget import PRIORITY_PREWARM, BudgetExhausted
 from app.services.google_fps_search import GoogleFpsSearchService
 from app.data.game_requirements import GAME_REQUIREMENTS_25
 
@@ -88,6 +89,8 @@ async def fetch_one(
     num: int,
 ) -> Optional[Dict[str, Any]]:
     data = await svc.search_fps(game=game, gpu=gpu, cpu=cpu, resolution=resolution, settings=setting, num=num)
+    if data and data.get("budget_exhausted"):
+        raise BudgetExhausted(str(data.get("budget_provider")), PRIORITY_PREWARM, "batch", float(data.get("retry_after") or 0.0))
     if not data or data.get("avg_fps") is None:
         return None
     avg = float(data["avg_fps"])
@@ -134,13 +137,17 @@ async def main_async(args: argparse.Namespace) -> int:
     print(f"Mode: {'WRITE' if args.write else 'DRY-RUN'}")
 
     async with httpx.AsyncClient(timeout=30.0) as client:
-        svc = GoogleFpsSearchService(client)
+        # 批次工作使用 prewarm 額度等級：保留一部分每日額度給 API server 的使用者請求
+        svc = GoogleFpsSearchService(client, priority=PRIORITY_PREWARM)
 
         updated = 0
         skipped = 0
         failed = 0
 
+        budget_error: Optional[BudgetExhausted] = None
         for game in games:
+            if budget_error:
+                break
             for gpu in gpus:
                 # 若已存在且未要求覆蓋，跳過
                 table = ensure_path(seed, ["benchmarks", game, resolution, setting])
@@ -148,7 +155,12 @@ async def main_async(args: argparse.Namespace) -> int:
                     skipped += 1
                     continue
 
-                got = await fetch_one(svc, game, gpu, cpu, resolution, setting, num=args.num)
+                try:
+                    got = await fetch_one(svc, game, gpu, cpu, resolution, setting, num=args.num)
+                except BudgetExhausted as e:
+                    budget_error = e
+                    print(f"[STOP] {e}")
+                    break
                 if not got:
                     failed += 1
                     continue
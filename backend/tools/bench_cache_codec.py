@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+快取值編碼量測：CacheCodec 各組合（json/msgpack/pickle × none/zlib/zstd）的 CPU 與大小
+
+代表性資料：
+- cse_response：Google CSE 回應（10 筆 items，含 pagemap/htmlSnippet，形狀與 _call_cse 回傳相同）
+- benchmark_rows：data/benchmarks_cache_v2.json 的前 N 筆基準資料
+- small_record：單一基準結果（低於壓縮門檻，量測 header 與序列化本身的成本）
+
+Redis 記憶體：指定 --url 時對每種編碼寫入一次並讀 MEMORY USAGE；未指定時只列出編碼後 bytes。
+
+用法：
+    python tools/bench_cache_codec.py [--rows 200] [--loops 2000] [--url redis://localhost:6379/15]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.cache.codec import MSGPACK_AVAILABLE, ZSTD_AVAILABLE, CacheCodec  # noqa: E402
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+
+def _cse_response() -> Dict[str, Any]:
+    items = []
+    for i in range(10):
+        title = f"RTX 4070 Super Cyberpunk 2077 1440p Ultra benchmark part {i} | Tom's Hardware"
+        snippet = (
+            f"In our testing the RTX 4070 Super averaged {90 + i} fps at 1440p Ultra with DLSS Quality, "
+            f"with 1% lows of {70 + i} fps. The Core i7-13700K was paired with 32GB DDR5-6000 memory ..."
+        )
+        items.append({
+            "kind": "customsearch#result",
+            "title": title,
+            "htmlTitle": title.replace("RTX 4070 Super", "<b>RTX 4070 Super</b>"),
+            "link": f"https://www.example-hardware-site.com/reviews/rtx-4070-super-cyberpunk-{i}",
+            "displayLink": "www.example-hardware-site.com",
+            "snippet": snippet,
+            "htmlSnippet": snippet.replace("fps", "<b>fps</b>"),
+            "formattedUrl": f"https://www.example-hardware-site.com/reviews/rtx-4070-super-cyberpunk-{i}",
+            "pagemap": {
+                "metatags": [{
+                    "og:title": title,
+                    "og:description": snippet,
+                    "og:image": f"https://cdn.example-hardware-site.com/img/{i}.jpg",
+                    "twitter:card": "summary_large_image",
+                }],
+                "cse_thumbnail": [{"src": f"https://encrypted-tbn0.gstatic.com/images?q=tbn:{i}", "width": "300", "height": "168"}],
+            },
+        })
+    return {
+        "kind": "customsearch#search",
+        "queries": {"request": [{"searchTerms": "Cyberpunk 2077 RTX 4070 Super 1440p fps", "count": 10, "startIndex": 1}]},
+        "searchInformation": {"searchTime": 0.41, "totalResults": "182000"},
+        "items": items,
+    }
+
+
+def _benchmark_rows(n: int) -> Dict[str, Any]:
+    path = BACKEND_DIR / "data" / "benchmarks_cache_v2.json"
+    try:
+        items = json.loads(path.read_text(encoding="utf-8")).get("items") or {}
+    except Exception as e:
+        print(f"讀取 {path} 失敗: {e}")
+        items = {}
+    return dict(list(items.items())[:n])
+
+
+def _codecs() -> Dict[str, CacheCodec]:
+    serializers = ["json"] + (["msgpack"] if MSGPACK_AVAILABLE else []) + ["pickle"]
+    compressions = ["none", "zlib"] + (["zstd"] if ZSTD_AVAILABLE else [])
+    out = {}
+    for s in serializers:
+        for c in compressions:
+            out[f"{s}+{c}"] = CacheCodec(serializer=s, compression=c)
+    return out
+
+
+def _per_op_us(fn: Callable[[], Any], loops: int) -> float:
+    start = time.perf_counter()
+    for _ in range(loops):
+        fn()
+    return (time.perf_counter() - start) / loops * 1e6
+
+
+def _memory_usage(client: Any, key: str, blob: bytes) -> Optional[int]:
+    try:
+        client.set(key, blob, ex=60)
+        return int(client.memory_usage(key) or 0)
+    except Exception:
+        return None
+    finally:
+        client.delete(key)
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=200, help="benchmark_rows 取幾筆")
+    ap.add_argument("--loops", type=int, default=2000)
+    ap.add_argument("--url", default="", help="實際 redis-server，量測 MEMORY USAGE")
+    args = ap.parse_args()
+
+    client = None
+    if args.url:
+        import redis
+
+        client = redis.Redis.from_url(args.url)
+        client.ping()
+
+    payloads = {
+        "cse_response": _cse_response(),
+        "benchmark_rows": _benchmark_rows(args.rows),
+        "small_record": {"avg_fps": 142.0, "p1_low": 101.0, "source": "Google (Snippet)", "confidence": 0.82},
+    }
+    if not MSGPACK_AVAILABLE:
+        print("（msgpack 未安裝，略過 msgpack）")
+    if not ZSTD_AVAILABLE:
+        print("（zstandard 未安裝，略過 zstd）")
+
+    for name, value in payloads.items():
+        # 大資料減少迴圈數，讓每組量測時間相近
+        loops = max(20, args.loops // max(1, len(json.dumps(value)) // 2048))
+        print(f"\n== {name} (json {len(json.dumps(value))} bytes, loops={loops}) ==")
+        header = f"{'codec':<16}{'bytes':>9}{'ratio':>7}{'encode us':>11}{'decode us':>11}"
+        if client is not None:
+            header += f"{'redis mem':>11}"
+        print(header)
+        baseline: List[int] = []
+        for label, codec in _codecs().items():
+            blob = codec.encode(value)
+            assert codec.decode(blob) == json.loads(json.dumps(value)) or label.startswith("pickle")
+            enc = _per_op_us(lambda: codec.encode(value), loops)
+            dec = _per_op_us(lambda: codec.decode(blob), loops)
+            if not baseline:
+                baseline.append(len(blob))
+            line = f"{label:<16}{len(blob):>9}{len(blob) / baseline[0]:>7.2f}{enc:>11.1f}{dec:>11.1f}"
+            if client is not None:
+                mem = _memory_usage(client, f"bench:codec:{label}", blob)
+                line += f"{mem if mem is not None else '-':>11}"
+            print(line)
+
+    if client is not None:
+        client.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+FPS 擷取器 microbenchmark：舊版（每次呼叫重新跑兩個 pattern）vs 單一預先編譯 pattern
+
+google_fps_refs.json / site_fps_refs.json 只保存了查詢組合與結果，沒有保存原始 snippet，
+因此以各筆的 (game, gpu, cpu, resolution, settings) 套進常見的搜尋結果樣式產生 snippet 語料。
+
+用法：
+    python tools/bench_fps_extractor.py [--rounds 20]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from app.services.fps_extraction import extract_fps_candidates
+
+ROOT = Path(__file__).resolve().parents[1]
+REF_FILES = [ROOT / "data" / "google_fps_refs.json", ROOT / "data" / "site_fps_refs.json"]
+
+TEMPLATES = [
+    "{game} {gpu} {res} {settings} benchmark - avg {a} fps, 1% low {b} fps with {cpu}.",
+    "{gpu} + {cpu}: {game} runs at around {a}-{c} FPS on {settings} ({res}).",
+    "We tested {game} at {res}. The {gpu} averaged {a} fps; the previous gen managed {b}fps.",
+    "{game} 效能測試：{gpu} 在 {res} {settings} 畫質平均 {a} fps，最低 {b} fps",
+    "{gpu} review | {game} {res} {settings}: {a} FPS (avg), {c} FPS (max). Tested with {cpu}.",
+    "Is {cpu} a bottleneck for {gpu}? In {game} we saw about {a} fps at {res}.",
+]
+
+
+def _legacy_extract(text: str) -> List[tuple]:
+    """舊版 GoogleFpsSearchService._extract_fps_candidates（兩個 pattern、呼叫時才 compile）"""
+    if not text:
+        return []
+    t = " ".join(str(text).split())
+    cands = []
+    patterns = [
+        r"(?:avg|average|平均|around|about)\s*[:=]?\s*(\d+(?:\.\d+)?)\s*(?:-|to|~)?\s*(\d+(?:\.\d+)?)?\s*fps",
+        r"(\d+(?:\.\d+)?)\s*(?:-|to|~)?\s*(\d+(?:\.\d+)?)?\s*fps",
+    ]
+    for p in patterns:
+        for m in re.finditer(p, t, re.IGNORECASE):
+            try:
+                v1 = float(m.group(1))
+                v2 = m.group(2)
+                v = (v1 + float(v2)) / 2.0 if v2 else v1
+            except Exception:
+                continue
+            if 5.0 <= v <= 1000.0:
+                conf = 0.8 if any(w in m.group(0).lower() for w in ["avg", "average", "平均", "around", "about"]) else 0.6
+                cands.append((v, m.group(0), conf))
+    return cands
+
+
+def _new_extract(text: str) -> list:
+    if not text:
+        return []
+    return extract_fps_candidates(" ".join(str(text).split()))
+
+
+def build_corpus(seed: int = 42) -> List[str]:
+    rng = random.Random(seed)
+    rows: List[Dict] = []
+    for p in REF_FILES:
+        if p.exists():
+            rows.extend(json.loads(p.read_text(encoding="utf-8")).get("results", []))
+    snippets = []
+    for r in rows:
+        a = rng.randint(30, 240)
+        fields = {
+            "game": r.get("game") or "",
+            "gpu": r.get("gpu") or "",
+            "cpu": r.get("cpu") or "",
+            "res": r.get("resolution") or "",
+            "settings": r.get("settings") or "",
+            "a": a,
+            "b": max(5, a - rng.randint(10, 40)),
+            "c": a + rng.randint(5, 30),
+        }
+        # 一筆結果 = 標題 + snippet
+        snippets.append(rng.choice(TEMPLATES).format(**fields) + " " + rng.choice(TEMPLATES).format(**fields))
+    return snippets
+
+
+def bench(name: str, fn: Callable[[str], list], corpus: List[str], rounds: int) -> float:
+    total = 0
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for s in corpus:
+            total += len(fn(s))
+    elapsed = time.perf_counter() - start
+    n = len(corpus) * rounds
+    print(f"{name:<8} {n / elapsed:>12,.0f} snippets/s   candidates/snippet={total / n:.2f}")
+    return n / elapsed
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rounds", type=int, default=20)
+    args = ap.parse_args()
+
+    corpus = build_corpus()
+    if not corpus:
+        print("no refs rows found in", [str(p) for p in REF_FILES])
+        return 2
+    print(f"corpus: {len(corpus)} snippets x {args.rounds} rounds")
+    legacy = bench("legacy", _legacy_extract, corpus, args.rounds)
+    new = bench("single", _new_extract, corpus, args.rounds)
+    print(f"speedup: {new / legacy:.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
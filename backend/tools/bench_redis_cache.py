@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Redis 快取 event loop 阻塞量測：舊版同步 redis.Redis vs CacheManager（redis.asyncio + pool + pipeline）
+
+量測方式：背景 ticker 每 5ms 醒來一次，記錄最大延遲（loop stall）；同時跑 N 個併發請求，
+每個請求做 get/set。同步 client 在 async 函式內呼叫時，每次網路往返都會卡住整個 event loop。
+兩邊都以 CacheManager 的 CacheCodec（CACHE_CODEC / CACHE_COMPRESSION）編碼/解碼，Redis 中的值格式相同。
+
+Redis 來源（擇一）：
+    --url redis://localhost:6379/0   使用實際的 redis-server
+    （未指定）                       使用 fakeredis.TcpFakeServer（pip install fakeredis）
+
+另外量測 Redis 無法連線時 CacheManager.initialize() 的啟動耗時（--unreachable-host）。
+
+用法：
+    python tools/bench_redis_cache.py [--requests 50] [--keys 20]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import multiprocessing
+import time
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+try:
+    import redis
+except ImportError:
+    print("需要 redis 套件：pip install redis")
+    raise SystemExit(2)
+
+
+async def _ticker(stop: asyncio.Event, lags: List[float], interval: float = 0.005) -> None:
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(max(0.0, time.perf_counter() - t0 - interval))
+
+
+async def measure(name: str, request: Callable[[int], Awaitable[None]], n: int) -> None:
+    stop = asyncio.Event()
+    lags: List[float] = []
+    ticker = asyncio.create_task(_ticker(stop, lags))
+    await asyncio.sleep(0.02)
+    start = time.perf_counter()
+    await asyncio.gather(*(request(i) for i in range(n)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await ticker
+    lags_ms = sorted(x * 1000 for x in lags) or [0.0]
+    p99 = lags_ms[min(len(lags_ms) - 1, int(len(lags_ms) * 0.99))]
+    print(
+        f"{name:<22} total={elapsed * 1000:8.1f}ms  loop stall max={lags_ms[-1]:7.2f}ms "
+        f"p99={p99:6.2f}ms median={statistics.median(lags_ms):5.2f}ms"
+    )
+
+
+def _serve_fake(conn) -> None:
+    import fakeredis
+
+    server = fakeredis.TcpFakeServer(("127.0.0.1", 0), server_type="redis")
+    conn.send(server.server_address[:2])
+    server.serve_forever()
+
+
+def _start_fake_server() -> Tuple[str, int, Callable[[], None]]:
+    """在獨立 process 執行 fakeredis TCP server（避免與量測中的 event loop 搶 GIL）"""
+    try:
+        import fakeredis  # noqa: F401
+    except ImportError:
+        print("未指定 --url 時需要 fakeredis：pip install fakeredis")
+        raise SystemExit(2)
+    parent, child = multiprocessing.Pipe()
+    proc = multiprocessing.Process(target=_serve_fake, args=(child,), daemon=True)
+    proc.start()
+    host, port = parent.recv()
+    return host, port, proc.terminate
+
+
+async def main_async(args: argparse.Namespace) -> int:
+    shutdown: Optional[Callable[[], None]] = None
+    if args.url:
+        u = urlparse(args.url)
+        host, port, db = u.hostname or "localhost", u.port or 6379, int((u.path or "/0").strip("/") or 0)
+    else:
+        host, port, shutdown = _start_fake_server()
+        db = 0
+    os.environ.update({"REDIS_HOST": str(host), "REDIS_PORT": str(port), "REDIS_DB": str(db)})
+
+    from app.cache.cache_manager import CacheManager
+
+    payload: Dict[str, object] = {"avg_fps": 123.4, "items": [{"title": "x" * 80, "snippet": "y" * 200}] * 5}
+    keys = [f"bench:{i}" for i in range(args.keys)]
+
+    manager = CacheManager()
+    codec = manager.codec
+    print(f"codec: {codec.describe()}")
+
+    # 舊版：同步 client 直接在 async 函式中呼叫（值是 codec 的二進位格式，不能 decode_responses）
+    sync_client = redis.Redis(host=host, port=port, db=db, decode_responses=False)
+    sync_client.ping()
+
+    async def sync_request(i: int) -> None:
+        for k in keys:
+            raw = sync_client.get(k)
+            if raw is None or codec.decode(raw) is None:
+                sync_client.set(k, codec.encode(payload), ex=60)
+
+    async def sync_multi(i: int) -> None:
+        for k in keys:
+            codec.decode(sync_client.get(k))
+
+    await manager.initialize()
+    if not manager.use_redis:
+        print("CacheManager 無法連線 Redis")
+        return 2
+
+    async def async_request(i: int) -> None:
+        for k in keys:
+            if await manager._get_hot(k) is None:
+                await manager._set_hot(k, payload, 60)
+
+    async def async_multi(i: int) -> None:
+        await manager.get_many(keys)
+
+    sync_client.flushdb()
+    await measure("sync get/setex", sync_request, args.requests)
+    sync_client.flushdb()
+    await measure("async get/setex", async_request, args.requests)
+    await measure("sync get x keys", sync_multi, args.requests)
+    await measure("async get_many (MGET)", async_multi, args.requests)
+
+    sync_client.close()
+    await manager.close()
+    if shutdown:
+        shutdown()
+
+    # Redis 無法連線時的啟動耗時（connect timeout 之內降級為記憶體快取）
+    os.environ["REDIS_HOST"] = args.unreachable_host
+    m2 = CacheManager()
+    t0 = time.perf_counter()
+    await m2.initialize()
+    print(f"initialize() with unreachable redis ({args.unreachable_host}): {time.perf_counter() - t0:.2f}s, use_redis={m2.use_redis}")
+    await m2.close()
+    return 0
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--url", default="", help="實際 redis-server，例如 redis://localhost:6379/15（會清空該 db）")
+    ap.add_argument("--requests", type=int, default=50, help="併發請求數")
+    ap.add_argument("--keys", type=int, default=20, help="每個請求存取的 key 數")
+    ap.add_argument("--unreachable-host", default="10.255.255.1")
+    args = ap.parse_args()
+    return asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
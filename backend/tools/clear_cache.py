@@ -23,9 +23,8 @@ async def clear_cache():
         settings="Ultra"
     )
 
+    await cache_manager.delete_many([svc._cache_key(q, 5) for q in queries], namespace=svc.CACHE_NAMESPACE)
     for q in queries:
-        key = svc._cache_key(q, 5)
-        await cache_manager.delete(key)
         print(f"Cleared cache for: {q}")
 
     print("Cache cleared successfully")
@@ -13,6 +13,7 @@ import httpx
 import sys
 # allow running from tools/ with relative imports
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from app.services.api_budget import PRIORITY_PREWARM
 from app.services.google_fps_search import GoogleFpsSearchService
 
 
@@ -72,12 +73,17 @@ RT_SUPPORTED = {
 }
 
 
+class _BudgetStop(Exception):
+    pass
+
+
 async def collect(api_key: str, cx: str, out_path: str, max_queries: int = 500) -> None:
     os.environ["GOOGLE_API_KEY"] = api_key
     os.environ["GOOGLE_CX"] = cx
 
     client = httpx.AsyncClient(timeout=20.0)
-    svc = GoogleFpsSearchService(client)
+    # 批次收集使用 prewarm 額度等級：保留一部分每日額度給 API server 的使用者請求
+    svc = GoogleFpsSearchService(client, priority=PRIORITY_PREWARM)
 
     results: Dict[str, Any] = {"meta": {"engine_cx": cx}, "items": {}}
     count = 0
@@ -103,6 +109,10 @@ async def collect(api_key: str, cx: str, out_path: str, max_queries: int = 500)
                                     data = await svc.search_fps(game=game, gpu=gpu, cpu=cpu, resolution=res, settings=s, num=5)
                                 except Exception as e:
                                     data = {"avg_fps": None, "notes": f"error: {e}", "source": "GoogleSearchSnippet"}
+                                if data.get("budget_exhausted"):
+                                    # 額度不足：不記錄成「找不到」，直接結束並保存已收集的結果
+                                    print(data.get("notes"))
+                                    raise _BudgetStop()
 
                                 results["items"][key] = {
                                     "game": game,
@@ -120,6 +130,8 @@ async def collect(api_key: str, cx: str, out_path: str, max_queries: int = 500)
                                 }
                                 count += 1
 
+    except _BudgetStop:
+        pass
     finally:
         await client.aclose()
 
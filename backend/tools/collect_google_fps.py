@@ -13,6 +13,7 @@ from pathlib import Path
 # ensure backend/ is on sys.path so `app` package imports work when invoked from tools/
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
+from app.services.api_budget import PRIORITY_PREWARM
 from app.services.google_fps_search import GoogleFpsSearchService
 
 
@@ -40,6 +41,16 @@ OUTPUT_PATH = os.path.normpath(os.path.join(os.path.dirname(__file__), "..", "da
 async def fetch_one(svc: GoogleFpsSearchService, game: str, gpu: str, cpu: str, resolution: str, setting: str) -> Dict[str, Any]:
     try:
         data = await svc.search_fps(game=game, gpu=gpu, cpu=cpu, resolution=resolution, settings=setting, num=5)
+        if data.get("budget_exhausted"):
+            # 額度不足而沒有查詢：記成 error，與「查過但找不到」區分
+            return {
+                "game": game,
+                "gpu": gpu,
+                "cpu": cpu,
+                "resolution": resolution,
+                "settings": setting,
+                "error": data.get("notes"),
+            }
         return {
             "game": game,
             "gpu": gpu,
@@ -72,7 +83,8 @@ async def main() -> int:
 
     tasks: List[asyncio.Task] = []
     async with httpx.AsyncClient(timeout=20.0) as client:
-        svc = GoogleFpsSearchService(client)
+        # 批次收集使用 prewarm 額度等級：保留一部分每日額度給 API server 的使用者請求
+        svc = GoogleFpsSearchService(client, priority=PRIORITY_PREWARM)
         for game in GAMES:
             for gpu in GPUS:
                 for cpu in CPUS:
@@ -43,11 +43,11 @@ async def main():
                     "settings": settings,
                     "gpu": gpu,
                     "cpu": cpu,
-                    "avg_fps": d.get("avg_fps"),
-                    "p1_low": d.get("p1_low"),
-                    "p0_1_low": d.get("p0_1_low"),
-                    "source": d.get("source"),
-                    "notes": d.get("notes"),
+                    "avg_fps": d.avg_fps,
+                    "p1_low": d.p1_low,
+                    "p0_1_low": d.p0_1_low,
+                    "source": d.source,
+                    "notes": d.notes,
                 })
 
     # write CSV
@@ -48,7 +48,7 @@ async def main():
             if not d:
                 print(f"{gpu} | {cpu} | NO DATA")
             else:
-                print(f"{gpu} | {cpu} | avg_fps={d.get('avg_fps')} | p1_low={d.get('p1_low')} | p0_1_low={d.get('p0_1_low')} | source={d.get('source')} | notes={d.get('notes')}")
+                print(f"{gpu} | {cpu} | avg_fps={d.avg_fps} | p1_low={d.p1_low} | p0_1_low={d.p0_1_low} | source={d.source} | notes={d.notes}")
         print("")
 
 
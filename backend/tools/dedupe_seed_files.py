@@ -1,19 +1,13 @@
 #!/usr/bin/env python3
 from __future__ import annotations
 import json
-import re
+import sys
 from pathlib import Path
 
-def normalize_model_key(s: str) -> str:
-    if not s:
-        return ''
-    m = str(s)
-    m = re.sub(r'\(.*?\)', ' ', m)
-    m = m.replace('-', ' ').replace('_', ' ').replace('/', ' ')
-    m = re.sub(r'[^\w\u4e00-\u9fff\s]', ' ', m)
-    m = re.sub(r'^(intel|amd|nvidia|nvidia geforce|geforce|samsung|western digital|wd|kingston|crucial)\b', ' ', m, flags=re.IGNORECASE)
-    m = re.sub(r'\s+', ' ', m).strip().lower()
-    return m
+# 與 API / 爬蟲 / store 共用同一套型號 canonical id
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from app.services.hardware_identity import canonical_key as normalize_model_key  # noqa: E402
+
 
 def choose_canonical(entries):
     # prefer entry with non-empty brand, then longer model string
@@ -20,7 +20,7 @@ async def main():
     for game, res, settings, gpu, cpu in combos:
         d = await s._fetch_benchmark_combo(game, res, settings, gpu, cpu)
         print("----", game, gpu["model"], cpu["model"], "----")
-        print(json.dumps(d, ensure_ascii=False, indent=2))
+        print(json.dumps(d.to_response() if d else None, ensure_ascii=False, indent=2))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+只讓相依的 v1/v2 快取資料失效（取代整檔重寫的 clear_cache / migrate_predicted_caches）
+
+用法：
+    # 調整了 RTX 4070 的 override 分數：列出會受影響的預測資料（預設 dry-run）
+    python tools/invalidate_dependents.py --gpu "RTX 4070"
+    # 實際刪除（下次查詢時依現行模型重新產生）
+    python tools/invalidate_dependents.py --gpu "RTX 4070" --cpu "Ryzen 7 7800X3D" --write
+    # 依 override 檔 / MODEL_VERSION 與上次套用的差異自動判斷（與 API 啟動時的同步相同）
+    python tools/invalidate_dependents.py --sync --write
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.db import benchmark_store, benchmark_store_v2  # noqa: E402
+from app.services.dependency_tracker import dependency_tracker  # noqa: E402
+
+
+async def main_async(args: argparse.Namespace) -> int:
+    dry_run = not args.write
+    if args.sync:
+        result = await dependency_tracker.sync(dry_run=dry_run)
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+    else:
+        if not (args.gpu or args.cpu or args.game or args.stale_model_version):
+            print("請至少指定 --gpu / --cpu / --game / --stale-model-version 其中之一，或使用 --sync")
+            return 2
+        stale = None
+        if args.stale_model_version:
+            from app.scrapers.benchmark_scraper import BenchmarkScraper
+
+            stale = BenchmarkScraper.MODEL_VERSION
+        t0 = time.perf_counter()
+        counts = await dependency_tracker.invalidate(
+            gpus=args.gpu,
+            cpus=args.cpu,
+            games=args.game,
+            stale_model_version=stale,
+            predicted_only=not args.include_real,
+            dry_run=dry_run,
+        )
+        print(f"{'would remove' if dry_run else 'removed'}: v1={counts['v1']} v2={counts['v2']} ({time.perf_counter() - t0:.2f}s)")
+
+    print(f"index v1: {await benchmark_store.index_stats()}")
+    print(f"index v2: {await benchmark_store_v2.index_stats()}")
+    print("mode:", "DRY-RUN" if dry_run else "WRITE")
+    return 0
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--gpu", action="append", default=[], help="GPU 型號（可重複；以包含比對，與 override 規則相同）")
+    ap.add_argument("--cpu", action="append", default=[], help="CPU 型號（可重複；只影響 v1）")
+    ap.add_argument("--game", action="append", default=[], help="遊戲名稱（可重複；完整比對）")
+    ap.add_argument("--stale-model-version", action="store_true", help="另外刪除 model_version 不是現行版本的預測資料")
+    ap.add_argument("--include-real", action="store_true", help="連同非預測（真實/網路）資料一起刪除")
+    ap.add_argument("--sync", action="store_true", help="依 override 檔 / MODEL_VERSION 與上次套用的差異判斷")
+    ap.add_argument("--write", action="store_true", help="實際寫回（預設 dry-run）")
+    args = ap.parse_args()
+    return asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
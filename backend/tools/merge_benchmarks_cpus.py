@@ -1,24 +1,14 @@
 #!/usr/bin/env python3
 from __future__ import annotations
 import json
-import re
+import sys
 from pathlib import Path
 
-def normalize_cpu(k: str) -> str:
-    s = k.lower()
-    s = re.sub(r'^(intel\\s+core\\s+|intel\\s+|amd\\s+)', '', s)
-    s = re.sub(r'\\s+', ' ', s).strip()
-    return s
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
-def choose_canonical(keys):
-    # prefer keys containing vendor, then longest
-    def score(k):
-        s = 0
-        if 'intel' in k.lower(): s += 2
-        if 'amd' in k.lower(): s += 2
-        s += len(k)
-        return s
-    return sorted(keys, key=score, reverse=True)[0]
+# canonical key（"||" 分隔、全小寫、GPU/CPU 為 hardware_identity 的 canonical id）已把
+# "Intel Core i9-13900K" / "i9-13900K" 等 CPU 寫法合併；舊的 "|" 格式 key 也一併轉換
+from app.db.benchmark_store import _try_canonicalize_existing_key  # noqa: E402
 
 def merge_values(vals):
     # vals: list of dicts. prefer non-null avg_fps, prefer Predicted Model with latest model_version
@@ -49,32 +39,18 @@ def main():
     data = json.loads(cache_path.read_text(encoding="utf-8"))
     groups = {}
     for k, v in list(data.items()):
-        parts = k.split("|")
-        if len(parts) != 5:
-            groups.setdefault(k, []).append((k, v))
-            continue
-        game, res, settings, gpu, cpu = parts
-        nk = normalize_cpu(cpu)
-        group_key = "|".join([game.strip(), res.strip(), settings.strip(), nk])
-        groups.setdefault(group_key, []).append((k, v))
+        ck = _try_canonicalize_existing_key(k) or k
+        groups.setdefault(ck, []).append((k, v))
 
     new_data = {}
     changed = 0
-    for gk, items in groups.items():
+    for ck, items in groups.items():
         if len(items) == 1:
-            k, v = items[0]
-            new_data[k] = v
+            new_data[ck] = items[0][1]
+            if ck != items[0][0]:
+                changed += 1
         else:
-            # merge: pick canonical cpu display name
-            old_keys = [it[0] for it in items]
-            parts = old_keys[0].split("|")
-            game, res, settings, gpu = parts[0], parts[1], parts[2], parts[3]
-            cpu_candidates = [k.split("|")[4] for k in old_keys]
-            canonical = choose_canonical(cpu_candidates)
-            new_key = "|".join([game, res, settings, gpu, canonical])
-            vals = [it[1] for it in items]
-            merged = merge_values(vals)
-            new_data[new_key] = merged
+            new_data[ck] = merge_values([it[1] for it in items])
             changed += len(items)
 
     # write backup and replace
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+v1 快取（benchmarks_cache.json）canonical key 遷移報告
+
+列出舊格式 key（大小寫敏感、"|" 分隔、GPU/CPU 寫法不同）在轉成 canonical key 後會合併的重複資料。
+API 載入 v1 快取時會自動做同樣的合併（有 avg_fps 的優先），這個工具只用來檢視，或加 --write 直接寫回。
+
+用法：
+    python tools/report_cache_duplicates.py              # 報告（預設 dry-run）
+    python tools/report_cache_duplicates.py --top 20     # 另外列出重複最多的 canonical key
+    python tools/report_cache_duplicates.py --write      # 以 canonical key 寫回（先備份為 .bak）
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import shutil
+import sys
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.db.benchmark_store import _try_canonicalize_existing_key, canonicalize_items  # noqa: E402
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--path", default=str(Path(__file__).resolve().parents[1] / "data" / "benchmarks_cache.json"))
+    ap.add_argument("--top", type=int, default=0, help="列出重複最多的前 N 個 canonical key")
+    ap.add_argument("--write", action="store_true", help="以 canonical key 寫回（預設 dry-run）")
+    args = ap.parse_args()
+
+    path = Path(args.path)
+    if not path.exists():
+        print("file not found:", path)
+        return 1
+    raw = json.loads(path.read_text(encoding="utf-8") or "{}")
+    items = raw if isinstance(raw, dict) else {}
+
+    canon, collapsed = canonicalize_items(items)
+    groups = Counter(_try_canonicalize_existing_key(k) or str(k) for k, v in items.items() if isinstance(v, dict))
+    legacy = sum(1 for k in items if "||" not in str(k))
+    dup_groups = {k: n for k, n in groups.items() if n > 1}
+
+    print(f"rows: {len(items)} -> {len(canon)} (collapsed {collapsed} duplicate rows in {len(dup_groups)} keys)")
+    print(f"legacy-format keys: {legacy}")
+    if args.top:
+        for key, n in sorted(dup_groups.items(), key=lambda kv: (-kv[1], kv[0]))[: args.top]:
+            print(f"  {n} x {key}")
+
+    if args.write:
+        shutil.copyfile(path, path.with_suffix(".json.bak"))
+        tmp = path.with_suffix(".json.tmp")
+        tmp.write_text(json.dumps(canon, ensure_ascii=False, indent=2), encoding="utf-8")
+        tmp.replace(path)
+        print("wrote", path)
+    print("mode:", "WRITE" if args.write else "DRY-RUN")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
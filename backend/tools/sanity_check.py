@@ -20,7 +20,7 @@ async def main():
     ]
     for game, res, st, gpu, cpu in tests:
         d = await s._fetch_benchmark_combo(game, res, st, {"category": "gpu", "model": gpu}, {"category": "cpu", "model": cpu})
-        print(f"{game} | {gpu} | {cpu} | avg_fps={d.get('avg_fps')} | source={d.get('source')}")
+        print(f"{game} | {gpu} | {cpu} | avg_fps={d.avg_fps} | source={d.source}")
 
 
 if __name__ == "__main__":
@@ -30,8 +30,8 @@ async def main() -> None:
         gpu={"category": "gpu", "model": gpu},
         cpu={"category": "cpu", "model": "Intel i9-13900K"},
     )
-    print("out_avg:", (out or {}).get("avg_fps"), "out_p1:", (out or {}).get("p1_low"))
-    print("usage_in_notes:", ("GPU:" in ((out or {}).get("notes") or "")))
+    print("out_avg:", out.avg_fps if out else None, "out_p1:", out.p1_low if out else None)
+    print("usage:", (out.gpu_usage, out.cpu_usage, out.memory_usage) if out else None)
 
     v1 = await benchmark_store_v2.get(game, res, st, gpu)
     print("after_mv:", (v1 or {}).get("model_version"), "v2_avg:", (v1 or {}).get("avg_fps"))
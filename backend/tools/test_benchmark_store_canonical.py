@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+v1 快取（benchmark_store）canonical key 與重複資料合併測試
+
+- 舊格式 key（"|" 分隔、大小寫敏感、GPU/CPU 寫法不同）→ canonical key（"||" 分隔、全小寫、canonical id）
+- canonicalize_items 合併重複：有 avg_fps 的優先，其次真實（非預測）資料，都一樣時保留先出現者
+
+只在記憶體中操作，不讀寫 data/benchmarks_cache.json。
+
+用法：
+    python -m pytest tools/test_benchmark_store_canonical.py -q
+    python tools/test_benchmark_store_canonical.py
+"""
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.db.benchmark_store import (  # noqa: E402
+    _canon_key,
+    _prefer_new,
+    _try_canonicalize_existing_key,
+    canonicalize_items,
+)
+
+REAL = {"avg_fps": 144.0, "source": "Google CSE"}
+PREDICTED = {"avg_fps": 150.0, "source": "Predicted Model"}
+PREDICTED_LEGACY = {"avg_fps": 150.0, "source": "Local Benchmark Cache", "raw_snippet": "基於真實基準預測 ..."}
+NO_FPS = {"avg_fps": None, "source": "Google CSE"}
+
+
+def test_legacy_key_formats():
+    expected = _canon_key("Counter-Strike 2", "1440p", "Ultra", "RTX 4070 Ti", "i9-13900K")
+    assert expected == "counter-strike 2||1440p||ultra||rtx 4070 ti||i9 13900k"
+    assert _try_canonicalize_existing_key("Counter-Strike 2|1440p|Ultra|RTX 4070 Ti|i9-13900K") == expected
+    assert _try_canonicalize_existing_key(
+        "counter-strike 2||1440P||ULTRA||NVIDIA GeForce RTX 4070 Ti||Intel Core i9-13900K"
+    ) == expected
+    assert _try_canonicalize_existing_key(expected) == expected
+
+
+def test_unparseable_keys():
+    assert _try_canonicalize_existing_key("") is None
+    assert _try_canonicalize_existing_key("a|b|c") is None
+    assert _try_canonicalize_existing_key("a||b||c||d") is None
+
+
+def test_prefer_new_ranking():
+    # 有 avg_fps 的優先
+    assert _prefer_new(NO_FPS, PREDICTED)
+    assert not _prefer_new(PREDICTED, NO_FPS)
+    # 同樣有 avg_fps：真實資料優先（含舊版被標成 Local Benchmark Cache 的預測資料）
+    assert _prefer_new(PREDICTED, REAL)
+    assert _prefer_new(PREDICTED_LEGACY, REAL)
+    assert not _prefer_new(REAL, PREDICTED)
+    # 同等級：保留先出現者
+    assert not _prefer_new(REAL, dict(REAL))
+    # 非 dict 的舊值一律被取代
+    assert _prefer_new(None, NO_FPS)
+
+
+def test_canonicalize_items_merges_duplicates():
+    items = {
+        "Counter-Strike 2|1440p|Ultra|RTX 4070 Ti|i9-13900K": PREDICTED,
+        "counter-strike 2||1440p||ultra||NVIDIA GeForce RTX 4070 Ti||Intel Core i9-13900K": REAL,
+        "COUNTER-STRIKE 2|1440P|ULTRA|RTX4070Ti|i9 13900K": NO_FPS,
+        "Cyberpunk 2077|1080p|High|RTX 4070 Ti|i9-13900K": PREDICTED,
+        "not-a-key": REAL,
+        "ignored": "not a dict",
+    }
+    canon, collapsed = canonicalize_items(items)
+    key = "counter-strike 2||1440p||ultra||rtx 4070 ti||i9 13900k"
+    assert collapsed == 2
+    assert canon[key] is REAL
+    assert canon["cyberpunk 2077||1080p||high||rtx 4070 ti||i9 13900k"] is PREDICTED
+    # 無法解析的 key 原樣保留；非 dict 的值丟棄
+    assert canon["not-a-key"] is REAL
+    assert "ignored" not in canon
+    assert len(canon) == 3
+
+
+def test_canonicalize_items_is_idempotent():
+    canon, _ = canonicalize_items({"Counter-Strike 2|1440p|Ultra|RTX 4070 Ti|i9-13900K": REAL})
+    again, collapsed = canonicalize_items(canon)
+    assert again == canon
+    assert collapsed == 0
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            fn()
+            print(f"ok  {name}")
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+CacheCodec 編碼/解碼測試
+
+- 每種可用的（序列化 × 壓縮）組合都能 round-trip；未安裝的 msgpack / zstandard 退回 json / zlib
+- 未壓縮的 JSON 不加 header（舊版 process 可讀）；沒有 header 的舊 JSON 值仍可讀
+- 切換設定後，以其他設定寫入的值仍可讀（解碼只看 header）
+
+用法：
+    python -m pytest tools/test_cache_codec.py -q
+    python tools/test_cache_codec.py
+"""
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.cache.codec import MSGPACK_AVAILABLE, ZSTD_AVAILABLE, CacheCodec, CacheCodecError  # noqa: E402
+
+SERIALIZERS = ("json", "msgpack", "pickle")
+COMPRESSIONS = ("none", "zlib", "zstd")
+
+SMALL = {"avg_fps": 144.5, "p1_low": 98.0, "source": "Google CSE", "notes": "RTX 4070 Ti / i9-13900K"}
+LARGE = {
+    "items": [
+        {"title": f"Counter-Strike 2 benchmark {i}", "snippet": "avg 300 fps, 1% low 210 fps " * 8, "rank": i}
+        for i in range(40)
+    ],
+    "searchInformation": {"totalResults": "1234"},
+}
+
+
+def _codecs():
+    for serializer in SERIALIZERS:
+        for compression in COMPRESSIONS:
+            yield CacheCodec(serializer=serializer, compression=compression, min_compress_bytes=256)
+
+
+def test_round_trip_all_combinations():
+    for codec in _codecs():
+        for value in (SMALL, LARGE, [1, 2, 3], "文字", 0, None):
+            assert codec.decode(codec.encode(value)) == value, codec.describe()
+
+
+def test_missing_packages_fall_back():
+    codec = CacheCodec(serializer="msgpack", compression="zstd")
+    assert codec.serializer == ("msgpack" if MSGPACK_AVAILABLE else "json")
+    assert codec.compression == ("zstd" if ZSTD_AVAILABLE else "zlib")
+    unknown = CacheCodec(serializer="yaml", compression="lz4")
+    assert (unknown.serializer, unknown.compression) == ("json", "zlib")
+
+
+def test_plain_json_has_no_header():
+    codec = CacheCodec(serializer="json", compression="zlib", min_compress_bytes=1024)
+    data = codec.encode(SMALL)
+    assert data == json.dumps(SMALL).encode("ascii")
+    assert codec.decode(json.dumps(SMALL)) == SMALL
+
+
+def test_compression_applied_above_threshold():
+    codec = CacheCodec(serializer="json", compression="zlib", min_compress_bytes=256)
+    data = codec.encode(LARGE)
+    assert data[0] >= 0x80
+    assert len(data) < len(json.dumps(LARGE))
+
+
+def test_decode_across_settings():
+    writers = list(_codecs())
+    reader = CacheCodec(serializer="json", compression="none")
+    for writer in writers:
+        assert reader.decode(writer.encode(LARGE)) == LARGE, writer.describe()
+
+
+def test_unknown_header_version():
+    codec = CacheCodec()
+    try:
+        codec.decode(bytes((0x80 | (1 << 5),)) + b"{}")
+    except CacheCodecError:
+        pass
+    else:
+        raise AssertionError("未知的格式版本應該拋出 CacheCodecError")
+
+
+def test_empty_values():
+    codec = CacheCodec()
+    assert codec.decode(None) is None
+    assert codec.decode(b"") is None
+    assert codec.decode("") is None
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            fn()
+            print(f"ok  {name}")
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+硬體目錄分頁（cursor）測試
+
+- 依 next_cursor 翻頁可取得全部項目，不重複
+- 翻頁之間索引重建（seed 前面插入/移除項目）時，從上一頁最後一筆之後繼續，不重複也不漏掉
+- 內容相同的重建版本不變；格式錯誤的 cursor 拋出 ValueError
+
+使用暫存的 seed / 快照檔，不讀寫 data/ 下的檔案。
+
+用法：
+    python -m pytest tools/test_catalog_paging.py -q
+    python tools/test_catalog_paging.py
+"""
+from __future__ import annotations
+
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+from typing import List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.services.hardware_catalog import HardwareCatalog  # noqa: E402
+
+GPUS = [f"RTX {n}" for n in (5090, 5080, 5070, 4090, 4080, 4070, 3080, 3070, 3060)]
+
+
+def _write_seed(path: str, models: List[str]) -> None:
+    items = [{"category": "gpu", "model": m, "brand": "NVIDIA", "generation": "Test"} for m in models]
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"items": items}, f)
+    # 確保 mtime 改變（檔案系統的 mtime 精度可能不足以區分連續寫入）
+    st = os.stat(path)
+    bump = getattr(_write_seed, "bump", 0) + 10
+    _write_seed.bump = bump
+    os.utime(path, (st.st_atime, st.st_mtime + bump))
+
+
+def _make_catalog(tmp: str, models: List[str]) -> HardwareCatalog:
+    seed_path = os.path.join(tmp, "seed.json")
+    _write_seed(seed_path, models)
+    return HardwareCatalog(seed_path=seed_path, snapshot_path=os.path.join(tmp, "snapshot.json"))
+
+
+def _models(page) -> List[str]:
+    return [it["model"] for it in page.items]
+
+
+def _read_all(catalog: HardwareCatalog, limit: int, cursor: Optional[str] = None) -> List[str]:
+    out: List[str] = []
+    while True:
+        page = catalog.query_page(category="gpu", limit=limit, cursor=cursor)
+        out.extend(_models(page))
+        cursor = page.next_cursor
+        if not cursor:
+            return out
+
+
+def test_paging_covers_all_items():
+    with tempfile.TemporaryDirectory() as tmp:
+        catalog = _make_catalog(tmp, GPUS)
+        models = _read_all(catalog, limit=4)
+        assert sorted(models) == sorted(GPUS)
+        assert len(models) == len(set(models))
+        assert catalog.query_page(category="gpu").total == len(GPUS)
+
+
+def test_cursor_survives_rebuild():
+    with tempfile.TemporaryDirectory() as tmp:
+        catalog = _make_catalog(tmp, GPUS)
+        first = catalog.query_page(category="gpu", limit=3)
+        seen = _models(first)
+        version = first.index.version
+        assert first.next_cursor
+
+        # 已看過的項目被移除、前面插入新項目：純 offset 會重複或漏掉
+        removed = seen[0]
+        inserted = ["RTX 5060", "RTX 5060 Ti"]
+        _write_seed(os.path.join(tmp, "seed.json"), inserted + [m for m in GPUS if m != removed])
+
+        rest = _read_all(catalog, limit=3, cursor=first.next_cursor)
+        assert catalog.get().version != version
+        remaining = [m for m in GPUS if m not in seen]
+        assert sorted(rest) == sorted(remaining)
+        assert not set(rest) & set(seen)
+
+
+def test_same_content_keeps_version():
+    with tempfile.TemporaryDirectory() as tmp:
+        catalog = _make_catalog(tmp, GPUS)
+        first = catalog.query_page(category="gpu", limit=5)
+        # 另一個 worker / 重啟後以同一份 seed 建立的索引：版本相同，cursor 直接沿用
+        other = HardwareCatalog(seed_path=catalog.seed_path, snapshot_path=catalog.snapshot_path)
+        second = other.query_page(category="gpu", limit=5, cursor=first.next_cursor)
+        assert second.index.version == first.index.version
+        assert sorted(_models(first) + _models(second)) == sorted(GPUS)
+
+
+def test_invalid_cursor():
+    with tempfile.TemporaryDirectory() as tmp:
+        catalog = _make_catalog(tmp, GPUS)
+        for bad in ("not-base64!", "e30"):  # "e30" = "{}"（缺 offset）
+            try:
+                catalog.query_page(category="gpu", limit=3, cursor=bad)
+            except ValueError:
+                continue
+            raise AssertionError(f"cursor {bad!r} 應該拋出 ValueError")
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            fn()
+            print(f"ok  {name}")
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+hardware_identity 別名解析測試
+
+- 廠牌字/大小寫/連寫的不同寫法 → 同一個 canonical id
+- seed 中只屬於單一型號的型號碼自動成為別名；同時出現在多個型號的型號碼不當別名
+- 別名表（gpu / cpu 區塊）優先；檔案修改後自動重新載入
+
+使用暫存的 seed / 別名檔，不讀寫 data/ 下的檔案。
+
+用法：
+    python -m pytest tools/test_hardware_identity.py -q
+    python tools/test_hardware_identity.py
+"""
+from __future__ import annotations
+
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.services.hardware_identity import HardwareIdentity, canonical_key  # noqa: E402
+
+SEED = {
+    "items": [
+        {"category": "gpu", "model": "RTX 4070 Ti SUPER"},
+        {"category": "gpu", "model": "RTX 4070 Ti"},
+        {"category": "gpu", "model": "RX 7900 XT"},
+        {"category": "cpu", "model": "Ryzen 7 7800X3D"},
+        {"category": "cpu", "model": "Ryzen 9 7900"},
+        {"category": "cpu", "model": "Intel Core i9-13900K"},
+    ]
+}
+ALIASES = {"gpu": {"4070TiS": "RTX 4070 Ti SUPER"}, "cpu": {"R7 7800X3D": "Ryzen 7 7800X3D"}}
+
+
+def _write_json(path: str, data: dict) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+
+
+def _make_identity(tmp: str, aliases: dict = ALIASES) -> HardwareIdentity:
+    seed_path = os.path.join(tmp, "seed.json")
+    aliases_path = os.path.join(tmp, "aliases.json")
+    _write_json(seed_path, SEED)
+    _write_json(aliases_path, aliases)
+    return HardwareIdentity(aliases_path=aliases_path, seed_path=seed_path)
+
+
+def test_canonical_key_spellings():
+    assert canonical_key("NVIDIA GeForce RTX 4070 Ti") == "rtx 4070 ti"
+    assert canonical_key("RTX4070Ti") == "rtx 4070 ti"
+    assert canonical_key("i9-13900K") == "i9 13900k"
+    assert canonical_key("Intel Core i9-13900K") == "i9 13900k"
+    assert canonical_key("") == ""
+
+
+def test_seed_model_codes_become_aliases():
+    with tempfile.TemporaryDirectory() as tmp:
+        ident = _make_identity(tmp)
+        assert ident.resolve("7800X3D") == "ryzen 7 7800x3d"
+        assert ident.same("AMD Ryzen 7 7800X3D", "Ryzen 7 7800X3D")
+        # "7900" 同時屬於 rx 7900 xt 與 ryzen 9 7900：不當別名
+        assert ident.resolve("7900") == "7900"
+        assert ident.display_name("amd ryzen 7 7800x3d") == "Ryzen 7 7800X3D"
+        assert ident.display_name("unknown gpu") == "unknown gpu"
+
+
+def test_manual_aliases():
+    with tempfile.TemporaryDirectory() as tmp:
+        ident = _make_identity(tmp)
+        target = ident.resolve("RTX 4070 Ti SUPER")
+        assert ident.resolve("4070TiS") == target
+        assert ident.resolve("NVIDIA GeForce RTX 4070 Ti Super") == target
+        assert ident.resolve("R7 7800X3D") == ident.resolve("Ryzen 7 7800X3D")
+        assert not ident.same("RTX 4070 Ti", "RTX 4070 Ti SUPER")
+        assert not ident.same("", "")
+
+
+def test_alias_file_reload():
+    with tempfile.TemporaryDirectory() as tmp:
+        ident = _make_identity(tmp, aliases={})
+        assert ident.resolve("4070TiS") == "4070tis"
+        generation = ident.current_generation()
+
+        aliases_path = os.path.join(tmp, "aliases.json")
+        _write_json(aliases_path, ALIASES)
+        st = os.stat(aliases_path)
+        os.utime(aliases_path, (st.st_atime, st.st_mtime + 5))
+
+        assert ident.current_generation() == generation + 1
+        assert ident.resolve("4070TiS") == ident.resolve("RTX 4070 Ti SUPER")
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            fn()
+            print(f"ok  {name}")
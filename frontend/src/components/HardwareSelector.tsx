@@ -36,6 +36,8 @@ function HardwareSelector({ selectedHardware, onSelect, hardwareType, selectedRa
   const [customGeneration, setCustomGeneration] = useState<string>('')
   const [customYear, setCustomYear] = useState<string>('')
   const [customVram, setCustomVram] = useState<string>('')
+  // 後端搜尋索引的建議（容許錯字/連寫，例如 7800x3d、4070ti s）
+  const [suggestions, setSuggestions] = useState<string[]>([])
 
   const isStorage = hardwareType === 'storage'
 
@@ -49,7 +51,31 @@ function HardwareSelector({ selectedHardware, onSelect, hardwareType, selectedRa
   useEffect(() => {
     // 當使用者輸入 searchTerm 時立即使用本地或後端資料做即時過濾與顯示
     filterHardware()
-  }, [searchTerm, categoryFilter, hardwareList])
+  }, [searchTerm, categoryFilter, hardwareList, suggestions])
+  useEffect(() => {
+    // 自動完成：停止輸入 150ms 後向後端索引查詢建議
+    const q = searchTerm.trim()
+    if (!q) {
+      setSuggestions([])
+      return
+    }
+    const controller = new AbortController()
+    const timer = setTimeout(async () => {
+      try {
+        const url = `${API_BASE_URL}/api/hardware/suggest?q=${encodeURIComponent(q)}&category=${hardwareType}&limit=8`
+        const response = await fetch(url, { signal: controller.signal })
+        if (!response.ok) return
+        const data = await response.json()
+        setSuggestions((data.items || []).map((it: any) => it.model).filter(Boolean))
+      } catch {
+        // 建議失敗不影響本地過濾
+      }
+    }, 150)
+    return () => {
+      clearTimeout(timer)
+      controller.abort()
+    }
+  }, [searchTerm, hardwareType])
   useEffect(() => {
     filterHardware()
   }, [brandFilter, seriesFilter, storageCapacityFilter, sortBy])
@@ -599,11 +625,15 @@ function HardwareSelector({ selectedHardware, onSelect, hardwareType, selectedRa
 
     if (searchTerm) {
       const term = searchTerm.toLowerCase()
-      filtered = filtered.filter(h =>
+      const matched = filtered.filter(h =>
         h.model.toLowerCase().includes(term) ||
         h.brand.toLowerCase().includes(term) ||
         (h.generation && h.generation.toLowerCase().includes(term))
       )
+      // 子字串找不到（錯字、連寫）時改用後端建議的型號
+      filtered = matched.length > 0 || suggestions.length === 0
+        ? matched
+        : filtered.filter(h => suggestions.includes(h.model))
     }
 
     // storage capacity filter
@@ -716,6 +746,11 @@ function HardwareSelector({ selectedHardware, onSelect, hardwareType, selectedRa
 
   return (
     <div className="hardware-selector">
+      <datalist id={`hardware-suggest-${hardwareType}`}>
+        {suggestions.map((m) => (
+          <option key={m} value={m} />
+        ))}
+      </datalist>
       <div className="selector-header">
         <h2>選擇{getSelectorTitle()}</h2>
       </div>
@@ -800,6 +835,7 @@ function HardwareSelector({ selectedHardware, onSelect, hardwareType, selectedRa
                   value={searchTerm}
                   onChange={(e) => setSearchTerm(e.target.value)}
                   className="filter-input"
+                  list={`hardware-suggest-${hardwareType}`}
                 />
               </div>
             ) : (
@@ -892,6 +928,7 @@ function HardwareSelector({ selectedHardware, onSelect, hardwareType, selectedRa
                   value={searchTerm}
                   onChange={(e) => setSearchTerm(e.target.value)}
                   className="filter-input"
+                  list={`hardware-suggest-${hardwareType}`}
                 />
               </>
             )}